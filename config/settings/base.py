@@ -288,6 +288,9 @@ AWS_S3_FILE_OVERWRITE = False
 AWS_S3_REGION_NAME = "eu-west-3"
 AWS_S3_ENDPOINT_URL = f"https://{os.getenv('CELLAR_ADDON_HOST')}/"
 
+# Unix socket of the ClamAV daemon scanning the uploaded files.
+CLAMD_SOCKET = os.getenv("CLAMD_SOCKET", "/run/clamav/clamd.ctl")
+
 MIGRATE_RESUME_MAX_RUNTIME_MINUTES = int(os.getenv("MIGRATE_RESUME_MAX_RUNTIME_MINUTES", "60"))
 
 DORA_AWS_S3_ENDPOINT_URL = os.getenv("DORA_AWS_S3_ENDPOINT_URL")
@@ -25,8 +25,8 @@ class SuspiciousFilter(admin.SimpleListFilter):
 @admin.register(Scan)
 class ScanAdmin(ItouModelAdmin):
     list_display = ["file_id", "suspicious", "infected", "clamav_signature", "clamav_completed_at"]
-    readonly_fields = ["clamav_completed_at", "clamav_signature"]
-    fields = ["clamav_completed_at", "clamav_signature", "infected", "comment"]
+    readonly_fields = ["clamav_completed_at", "clamav_failed_at", "clamav_signature"]
+    fields = ["clamav_completed_at", "clamav_failed_at", "clamav_signature", "infected", "comment"]
     list_filter = [SuspiciousFilter, "infected", "clamav_completed_at"]
     search_fields = ["file__id", "clamav_signature"]
 
@@ -0,0 +1,49 @@
+import socket
+import struct
+
+from django.conf import settings
+
+
+# clamd rejects chunks larger than its StreamMaxLength, keep them small.
+CHUNK_SIZE = 64 * 1024
+
+
+class ClamdError(Exception):
+    pass
+
+
+def instream(content, *, timeout=60):
+    """
+    Scan `content` with the clamd INSTREAM command.
+
+    Return the signature of the virus found, None when the content is clean.
+    https://docs.clamav.net/manual/Usage/Scanning.html#instream
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(settings.CLAMD_SOCKET)
+        try:
+            sock.sendall(b"zINSTREAM\0")
+            for start in range(0, len(content), CHUNK_SIZE):
+                chunk = content[start : start + CHUNK_SIZE]
+                sock.sendall(struct.pack("!L", len(chunk)) + chunk)
+            sock.sendall(struct.pack("!L", 0))
+        except (BrokenPipeError, ConnectionResetError):
+            # clamd closes the connection when the stream exceeds its limits, its reply tells why.
+            pass
+        reply = b""
+        while not reply.endswith(b"\0"):
+            data = sock.recv(4096)
+            if not data:
+                break
+            reply += data
+
+    # stream: OK
+    # stream: Eicar-Signature FOUND
+    # INSTREAM size limit exceeded. ERROR
+    reply = reply.rstrip(b"\0").decode()
+    if reply == "stream: OK":
+        return None
+    if reply.startswith("stream: ") and reply.endswith(" FOUND"):
+        return reply.removeprefix("stream: ").removesuffix(" FOUND")
+    raise ClamdError(reply)
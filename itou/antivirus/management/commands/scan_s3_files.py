@@ -1,9 +1,6 @@
+import collections
 import concurrent.futures
-import os
-import shutil
-import stat
-import subprocess
-import tempfile
+import itertools
 
 from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
 from dateutil.relativedelta import relativedelta
@@ -13,6 +10,7 @@ from django.db import transaction
 from django.db.models import F
 from django.utils import timezone
 
+from itou.antivirus import clamd
 from itou.antivirus.models import Scan
 from itou.files.models import File
 from itou.utils.command import BaseCommand
@@ -21,118 +19,127 @@ from itou.utils.storage.s3 import s3_client
 
 class Command(BaseCommand):
     help = "Run ClamAV antivirus scan on files hosted in an S3 like bucket."
-    # Takes less than 10 seconds to run on a recent machine. Since crons can be
-    # interrupted, prefer frequent and quick iterations.
-    BATCH_SIZE = 200
+    # Since crons can be interrupted, prefer frequent and quick iterations.
+    BATCH_SIZE = 1000
+    # Files are locked until the results of their mini-batch are committed.
+    MINI_BATCH_SIZE = 50
+    # More workers result in warnings:
+    #
+    # Connection pool is full, discarding connection:
+    # cellar-c2.services.clever-cloud.com. Connection pool size: 10
+    #
+    # https://urllib3.readthedocs.io/en/latest/advanced-usage.html#customizing-pool-behavior
+    # indicates the default pool size is indeed 10.
+    DOWNLOAD_WORKERS = 10
+    # Maximum number of files downloaded ahead of the scan, bounds the memory used.
+    DOWNLOAD_QUEUE_SIZE = 20
+    # Files that could not be downloaded or scanned are retried after this delay.
+    FAILURE_RETRY_DELAY = relativedelta(days=1)
 
     ATOMIC_HANDLE = False
     AUTO_TRIGGER_CONTEXT = False
 
     def handle(self, *args, **options):
         now = timezone.now()
-        files = File.objects.exclude(scan__clamav_completed_at__gt=now - relativedelta(months=1)).order_by(
-            F("scan__clamav_completed_at").asc(nulls_first=True)
-        )[: self.BATCH_SIZE]
-        # Indicate these files are being processed to concurrent scans.
-        files = files.select_for_update(of=["self"], skip_locked=True, no_key=True)
-        with tempfile.TemporaryDirectory() as workdir:
+        client = s3_client()
+        # Files which could not be scanned are not retried during this run.
+        attempted = set()
+        nb_scanned = 0
+        while len(attempted) < self.BATCH_SIZE:
             with transaction.atomic():
-                filepath_s3key = self.download_files(files, workdir)
-
-                shutil.chown(workdir, group="clamav")
-                os.chmod(workdir, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP)
-                for filepath in filepath_s3key:
-                    shutil.chown(filepath, group="clamav")
-                    os.chmod(filepath, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
-
-                result = self.scan(workdir)
-                viruses_keys = self.process_report(result, filepath_s3key) if result is not None else set()
-
-                Scan.objects.bulk_create(
-                    [
-                        Scan(
-                            file=file,
-                            clamav_completed_at=now,
-                            # On conflict, the virus field is not updated. Assume legitimate files.
-                            infected=file.key in viruses_keys,
-                        )
-                        for file in files
-                    ],
-                    update_conflicts=True,
-                    update_fields=["clamav_completed_at"],
-                    unique_fields=["file_id"],
+                files = list(
+                    File.objects.exclude(scan__clamav_completed_at__gt=now - relativedelta(months=1))
+                    .exclude(scan__clamav_failed_at__gt=now - self.FAILURE_RETRY_DELAY)
+                    .exclude(pk__in=attempted)
+                    .order_by(F("scan__clamav_completed_at").asc(nulls_first=True))
+                    # Indicate these files are being processed to concurrent scans.
+                    .select_for_update(of=["self"], skip_locked=True, no_key=True)[
+                        : min(self.MINI_BATCH_SIZE, self.BATCH_SIZE - len(attempted))
+                    ]
                 )
-        self.logger.info("Scanned %d files", len(files))
+                if not files:
+                    break
+                attempted.update(file.pk for file in files)
+                results, failed_files = self.scan_files(client, files)
+                self.save_results(results, now)
+                self.save_failures(failed_files, now)
+            nb_scanned += len(results)
+        self.logger.info("Scanned %d files", nb_scanned)
 
-    def download_files(self, files, workdir):
-        client = s3_client()
+    def download(self, client, key):
+        for _ in range(5):
+            try:
+                return client.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)["Body"].read()
+            except client.exceptions.NoSuchKey:
+                return None
+            except (BotoConnectionError, HTTPClientError):
+                pass
+        return None
 
-        def download_file_descriptor_with_retry(key, fd):
-            with os.fdopen(fd, "wb") as fileobj:
-                for _ in range(5):
-                    try:
-                        client.download_fileobj(settings.AWS_STORAGE_BUCKET_NAME, key, fileobj)
-                    except (BotoConnectionError, HTTPClientError):
-                        pass
-                    else:
-                        break
+    def scan_files(self, client, files):
+        """
+        Stream the files to clamd as soon as they are downloaded.
 
-        filepath_s3key = {}
-        # More workers result in warnings:
-        #
-        # Connection pool is full, discarding connection:
-        # cellar-c2.services.clever-cloud.com. Connection pool size: 10
-        #
-        # https://urllib3.readthedocs.io/en/latest/advanced-usage.html#customizing-pool-behavior
-        # indicates the default pool size is indeed 10.
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            batch_futures = []
-            for file in files:
-                fd, path = tempfile.mkstemp(dir=workdir)
-                batch_futures.append(executor.submit(download_file_descriptor_with_retry, file.key, fd))
-                filepath_s3key[path] = file.key
-            _done, not_done = concurrent.futures.wait(batch_futures, timeout=3600)
-        if not_done:
-            raise CommandError("Could not download files to scan.")
-        return filepath_s3key
+        Return the signature of the virus found (None for clean files) by file,
+        and the files that could not be downloaded or scanned.
+        """
+        results = {}
+        failed_files = []
+        to_download = iter(files)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.DOWNLOAD_WORKERS) as executor:
+            downloads = collections.deque(
+                (file, executor.submit(self.download, client, file.key))
+                for file in itertools.islice(to_download, self.DOWNLOAD_QUEUE_SIZE)
+            )
+            while downloads:
+                file, future = downloads.popleft()
+                for next_file in itertools.islice(to_download, 1):
+                    downloads.append((next_file, executor.submit(self.download, client, next_file.key)))
+                content = future.result(timeout=3600)
+                if content is None:
+                    self.logger.error("Could not download file=%s", file.key)
+                    failed_files.append(file)
+                    continue
+                try:
+                    results[file] = clamd.instream(content)
+                except clamd.ClamdError as e:
+                    self.logger.error("Could not scan file=%s: %s", file.key, e)
+                    failed_files.append(file)
+                except OSError as e:
+                    raise CommandError("Could not reach clamd.") from e
+        return results, failed_files
 
     @staticmethod
-    def scan(path):
-        result = subprocess.run(
-            ["clamdscan", "--no-summary", "--infected", path],
-            capture_output=True,
-            text=True,
+    def save_results(results, now):
+        Scan.objects.bulk_create(
+            [
+                Scan(
+                    file=file,
+                    clamav_completed_at=now,
+                    # On conflict, the virus field is not updated. Assume legitimate files.
+                    infected=signature is not None,
+                    clamav_signature=signature or "",
+                )
+                for file, signature in results.items()
+            ],
+            update_conflicts=True,
+            update_fields=["clamav_completed_at", "clamav_failed_at"],
+            unique_fields=["file_id"],
         )
-        match result.returncode:
-            case 0:
-                return None
-            case 1:
-                return result.stdout
-            case _:
-                raise CommandError(result.stderr)
-
-    @staticmethod
-    def process_report(report, filepath_s3key):
-        viruses = {}
-        for line in report.splitlines():
-            local_path, details = line.split(":", maxsplit=1)
-            signature, _found = details.strip().split(" ", maxsplit=1)
-            s3key = filepath_s3key[local_path]
-            viruses[s3key] = signature
 
-        viruses_keys = set(viruses)
+        viruses = {file.pk: signature for file, signature in results.items() if signature is not None}
         scans = []
-        for scan in Scan.objects.select_related("file").filter(file__key__in=viruses):
-            scan.clamav_signature = viruses.pop(scan.file.key)
+        for scan in Scan.objects.filter(file_id__in=viruses):
+            scan.clamav_signature = viruses[scan.file_id]
             scans.append(scan)
         Scan.objects.bulk_update(scans, fields=["clamav_signature"])
-        new_infected_files = File.objects.filter(key__in=viruses.keys(), scan__isnull=True)
+
+    @staticmethod
+    def save_failures(failed_files, now):
+        # Keep the previous scan results, the file is retried after a delay.
         Scan.objects.bulk_create(
-            Scan(
-                file_id=id,
-                clamav_signature=signature,
-                infected=True,
-            )
-            for id, signature in [(file.id, viruses[file.key]) for file in new_infected_files]
+            [Scan(file=file, clamav_signature="", clamav_failed_at=now) for file in failed_files],
+            update_conflicts=True,
+            update_fields=["clamav_failed_at"],
+            unique_fields=["file_id"],
         )
-        return viruses_keys
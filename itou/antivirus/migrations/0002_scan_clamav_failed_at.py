@@ -0,0 +1,17 @@
+# Generated by Django 6.0.8 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("antivirus", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scan",
+            name="clamav_failed_at",
+            field=models.DateTimeField(null=True, verbose_name="échec de l’analyse ClamAV le"),
+        ),
+    ]
@@ -8,6 +8,7 @@ class Scan(models.Model):
     file = models.OneToOneField(File, on_delete=models.CASCADE)
     clamav_signature = models.TextField()
     clamav_completed_at = models.DateTimeField(null=True, verbose_name="analyse ClamAV le")
+    clamav_failed_at = models.DateTimeField(null=True, verbose_name="échec de l’analyse ClamAV le")
     infected = models.BooleanField(null=True, verbose_name="fichier infecté")
     comment = models.TextField(blank=True, verbose_name="commentaire")
 
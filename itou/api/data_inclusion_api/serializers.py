@@ -7,6 +7,7 @@ from itou.companies.enums import CompanyKind, CompanySource
 from itou.companies.models import Company
 from itou.prescribers.enums import PrescriberOrganizationKind
 from itou.prescribers.models import PrescriberOrganization
+from itou.utils.urls import get_absolute_url
 
 
 class BaseStructureSerializer(serializers.ModelSerializer):
@@ -54,7 +55,10 @@ class BaseStructureSerializer(serializers.ModelSerializer):
     def get_lien_source(self, obj) -> str:
         card_url = obj.get_card_url()
         if card_url:
-            return self.context["request"].build_absolute_uri(card_url)
+            # Snapshots are serialized outside of a request.
+            if request := self.context.get("request"):
+                return request.build_absolute_uri(card_url)
+            return get_absolute_url(card_url)
         return None
 
 
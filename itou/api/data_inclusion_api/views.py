@@ -1,10 +1,12 @@
-from drf_spectacular.utils import PolymorphicProxySerializer, extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, PolymorphicProxySerializer, extend_schema
 from rest_framework import exceptions, generics
 from rest_framework.permissions import BasePermission
 
 from itou.api.auth import ServiceAccount, ServiceTokenAuthentication
 from itou.api.data_inclusion_api import enums, serializers
 from itou.api.models import ServiceToken
+from itou.api.snapshots import SnapshotView
 from itou.companies.models import Company
 from itou.nexus.enums import Service
 from itou.prescribers.models import PrescriberOrganization
@@ -12,6 +14,24 @@ from itou.utils.auth import LoginNotRequiredMixin
 from itou.utils.readonly import ReadonlyViewMixin
 
 
+SERIALIZER_CLASSES = {
+    enums.StructureTypeStr.ORGA: serializers.PrescriberOrgStructureSerializer,
+    enums.StructureTypeStr.SIAE: serializers.CompanySerializer,
+}
+
+
+def get_structures_queryset(structure_type):
+    qs = {
+        enums.StructureTypeStr.ORGA: PrescriberOrganization.objects.all(),
+        enums.StructureTypeStr.SIAE: Company.objects.active(),
+    }[structure_type]
+    return qs.order_by("created_at", "pk")
+
+
+def snapshot_name(structure_type):
+    return f"data-inclusion-{structure_type}"
+
+
 class DataInclusionPermission(BasePermission):
     def has_permission(self, request, view):
         return (
@@ -61,14 +81,33 @@ class DataInclusionStructureView(LoginNotRequiredMixin, ReadonlyViewMixin, gener
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        qs = {
-            enums.StructureTypeStr.ORGA: PrescriberOrganization.objects.all(),
-            enums.StructureTypeStr.SIAE: Company.objects.active(),
-        }[self.request.query_params.get("type")]
-        return qs.order_by("created_at", "pk")
+        return get_structures_queryset(self.request.query_params.get("type"))
 
     def get_serializer_class(self):
-        return {
-            enums.StructureTypeStr.ORGA: serializers.PrescriberOrgStructureSerializer,
-            enums.StructureTypeStr.SIAE: serializers.CompanySerializer,
-        }[self.request.query_params.get("type")]
+        return SERIALIZER_CLASSES[self.request.query_params.get("type")]
+
+
+@extend_schema(
+    parameters=[OpenApiParameter("type", enum=list(enums.StructureTypeStr), required=True)],
+    responses={(200, "application/gzip"): OpenApiTypes.BINARY},
+)
+class DataInclusionStructureSnapshotView(SnapshotView):
+    """
+    # Export complet au format data.inclusion
+
+    Toutes les structures retournées par l’API au format data⋅inclusion, dans un fichier
+    NDJSON (une structure par ligne) compressé avec gzip. L’export est mis à jour chaque heure.
+
+    Les en-têtes `ETag` et `Last-Modified` permettent d’éviter de télécharger à nouveau un
+    export inchangé, avec les en-têtes `If-None-Match` ou `If-Modified-Since`.
+    """
+
+    authentication_classes = [ServiceTokenAuthentication]
+
+    permission_classes = [DataInclusionPermission]
+
+    def get_snapshot_name(self):
+        unsafe_type_str = self.request.query_params.get("type")
+        if unsafe_type_str not in list(enums.StructureTypeStr):
+            raise exceptions.ValidationError("La valeur du paramètre `type` doit être `siae` ou `orga`.")
+        return snapshot_name(unsafe_type_str)
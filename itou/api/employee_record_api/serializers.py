@@ -242,6 +242,16 @@ class EmployeeRecordAPISerializer(serializers.Serializer):
     numeroAnnexe = serializers.CharField(source="financial_annex.number", allow_null=True)
 
 
+class EmployeeRecordChangeAPISerializer(EmployeeRecordAPISerializer):
+    """
+    Identify the records and their status in the change feed, to update the copies of the clients.
+    """
+
+    id = serializers.IntegerField()
+    statut = serializers.CharField(source="status")
+    dateModification = serializers.DateTimeField(source="updated_at")
+
+
 class EmployeeRecordUpdateNotificationAPISerializer(serializers.Serializer):
     numLigne = serializers.IntegerField(source="asp_batch_line_number")
     typeMouvement = serializers.CharField(source="ASP_MOVEMENT_TYPE")
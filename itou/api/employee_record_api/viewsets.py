@@ -1,16 +1,20 @@
+import datetime
 import logging
 
-from django.db.models.functions import TruncDate
-from rest_framework import mixins, viewsets
+from django.utils import timezone
+from rest_framework import exceptions, mixins, viewsets
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import action
 from rest_framework.throttling import UserRateThrottle
 
 from itou.api import AUTH_TOKEN_EXPLANATION_TEXT
 from itou.api.employee_record_api.perms import EmployeeRecordAPIPermission
 from itou.api.employee_record_api.serializers import (
     EmployeeRecordAPISerializer,
+    EmployeeRecordChangeAPISerializer,
     EmployeeRecordUpdateNotificationAPISerializer,
 )
+from itou.api.pagination import ChangeFeedPagination
 from itou.employee_record.models import EmployeeRecord, EmployeeRecordUpdateNotification, Status
 from itou.utils.auth import LoginNotRequiredMixin
 from itou.utils.readonly import ReadonlyViewMixin
@@ -59,10 +63,13 @@ class AbstractEmployeeRecordViewSet(
         return queryset.filter(**{f"{self.company_lookup}__in": companies}).order_by("-created_at", "-updated_at")
 
 
-def _annotate_convert_created_at(queryset):
-    # Add a new `creation_date` field: convert `created_at` to a local date with
-    # `TruncDate` which computes the date after timezone conversion
-    return queryset.annotate(creation_date=TruncDate("created_at"))
+def _start_of_local_day(param_name, value):
+    # Compare `created_at` with the bounds of the local day rather than truncating it, so the index can be used.
+    try:
+        day = datetime.date.fromisoformat(value)
+    except ValueError:
+        raise exceptions.ValidationError({param_name: "Date invalide, le format attendu est AAAA-MM-JJ."})
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=timezone.get_current_timezone())
 
 
 class EmployeeRecordViewSet(AbstractEmployeeRecordViewSet):
@@ -83,21 +90,32 @@ class EmployeeRecordViewSet(AbstractEmployeeRecordViewSet):
         # Query params are chainable
 
         # if no status given, return employee records in PROCESSED state
-        if status := params.getlist("status", [Status.PROCESSED]):
+        # (the change feed returns every status, to follow the transitions)
+        default_status = [] if self.action == "changes" else [Status.PROCESSED]
+        if status := params.getlist("status", default_status):
             status_filter = [s.upper() for s in status]
             result = result.filter(status__in=status_filter)
 
         if created := params.get("created"):
-            result = _annotate_convert_created_at(result).filter(creation_date=created)
+            start = _start_of_local_day("created", created)
+            result = result.filter(created_at__gte=start, created_at__lt=start + datetime.timedelta(days=1))
 
         if since := params.get("since"):
-            result = _annotate_convert_created_at(result).filter(creation_date__gte=since)
+            result = result.filter(created_at__gte=_start_of_local_day("since", since))
 
         return result
 
     def get_queryset(self):
         return self._filter_by_query_params(self.request, super().get_queryset())
 
+    @action(detail=False, pagination_class=ChangeFeedPagination, serializer_class=EmployeeRecordChangeAPISerializer)
+    def changes(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        if self.paginator.is_not_modified():
+            return self.paginator.get_not_modified_response()
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 # Doc section is in French for Swagger / OAS auto doc generation
 EmployeeRecordViewSet.__doc__ = f"""\
@@ -151,6 +169,20 @@ Permet de récupérer les fiches salarié créées à la date donnée en paramè
 ## `since` : depuis une certaine date
 Permet de récupérer les fiches salarié créées depuis date donnée en paramètre (au format `AAAA-MM-JJ`).
 
+# Synchronisation incrémentale
+
+L’URL `/api/v1/employee-records/changes/` retourne les fiches salarié créées ou modifiées,
+y compris leurs changements de statut (champ `statut`), de la plus anciennement à la plus
+récemment modifiée, quel que soit leur statut (le paramètre `status` reste utilisable).
+
+La réponse contient un `cursor` à fournir dans le paramètre `cursor` de l’appel suivant :
+seules les fiches créées ou modifiées depuis sont alors retournées. Tant que `has_more` vaut `true`,
+d’autres modifications sont disponibles immédiatement. Les modifications de la dernière minute,
+ou en cours d’enregistrement, sont retournées lors d’un appel ultérieur.
+
+Chaque réponse comporte un en-tête `ETag` : le renvoyer dans l’en-tête `If-None-Match` d’un
+appel identique permet d’obtenir une réponse `304` sans contenu lorsque rien n’a changé.
+
 # Limitations
 
 L’interrogation de cette API est limitée à 60 appels par minute.
@@ -132,3 +132,47 @@ job_application_search_response_invalid_example = OpenApiExample(
         "date_naissance": ["Ce champ est obligatoire."],
     },
 )
+
+job_application_bulk_search_request_example = OpenApiExample(
+    "Exemple de recherche groupée de candidatures (requête)",
+    request_only=True,
+    value={
+        "recherches": [
+            job_application_search_request_example.value,
+            {
+                "nir": "199127524528683",
+                "nom": "DUPONT",
+                "prenom": "LÉOPOLD",
+                "date_naissance": "1999-12-03",
+            },
+        ],
+    },
+)
+
+job_application_bulk_search_response_valid_example = OpenApiExample(
+    "Exemple de recherche groupée de candidatures (réponse)",
+    response_only=True,
+    status_codes=[200],
+    value=[
+        {
+            "nir": "269054958815780",
+            "candidatures": job_application_search_response_valid_example.value["results"],
+        },
+        {
+            "nir": "199127524528683",
+            "candidatures": [],
+        },
+    ],
+)
+
+job_application_bulk_search_response_invalid_example = OpenApiExample(
+    "Exemple de recherche groupée de candidatures invalide (réponse)",
+    response_only=True,
+    status_codes=[400],
+    value={
+        "recherches": [
+            {},
+            {"date_naissance": ["Ce champ est obligatoire."]},
+        ],
+    },
+)
@@ -279,3 +279,27 @@ class JobApplicationSearchRequestSerializer(serializers.Serializer):
     nom = serializers.CharField(write_only=True, label="Nom de famille du candidat")
     prenom = serializers.CharField(write_only=True, label="Prénom du candidat")
     date_naissance = serializers.DateField(write_only=True, label="Date de naissance du candidat (ISO 8601)")
+
+
+class JobApplicationBulkSearchRequestSerializer(serializers.Serializer):
+    # Each searched person counts as a call of the search API: a bigger payload would never fit in the quota.
+    MAX_SEARCHES = 100
+
+    recherches = JobApplicationSearchRequestSerializer(
+        many=True,
+        min_length=1,
+        max_length=MAX_SEARCHES,
+        write_only=True,
+        label="Candidats recherchés",
+    )
+
+    def validate_recherches(self, searches):
+        nirs = [search["nir"] for search in searches]
+        if len(set(nirs)) != len(nirs):
+            raise serializers.ValidationError("Un même numéro de sécurité sociale ne peut être recherché qu’une fois.")
+        return searches
+
+
+class JobApplicationBulkSearchResponseSerializer(serializers.Serializer):
+    nir = serializers.CharField(label="Numéro de sécurité sociale du candidat recherché")
+    candidatures = JobApplicationSearchResponseSerializer(many=True, label="Candidatures du candidat recherché")
@@ -12,3 +12,34 @@ class JobApplicationSearchThrottle(throttling.SimpleRateThrottle):
             "scope": self.scope,
             "ident": request.auth.department,
         }
+
+
+class JobApplicationBulkSearchThrottle(JobApplicationSearchThrottle):
+    """
+    Share the quota of the search API, each searched person counting as a call.
+    """
+
+    def get_weight(self, request):
+        searches = request.data.get("recherches") if isinstance(request.data, dict) else None
+        if isinstance(searches, list) and searches:
+            return len(searches)
+        return 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.history = self.cache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+        weight = self.get_weight(request)
+        if len(self.history) + weight > self.num_requests:
+            return self.throttle_failure()
+        self.history[:0] = [self.now] * weight
+        self.cache.set(self.key, self.history, self.duration)
+        return True
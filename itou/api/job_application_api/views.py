@@ -1,22 +1,28 @@
+import collections
+
 from dateutil.relativedelta import relativedelta
-from django.db.models import F, OuterRef, Prefetch, Subquery
+from django.db.models import F, OuterRef, Prefetch, Q, Subquery
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view, inline_serializer
 from rest_framework import fields, generics, mixins
+from rest_framework.response import Response
 
 from itou.api.auth import DepartmentTokenAuthentication
 from itou.api.job_application_api import schema
 from itou.api.job_application_api.perms import JobApplicationSearchAPIPermission
 from itou.api.job_application_api.serializers import (
+    JobApplicationBulkSearchRequestSerializer,
+    JobApplicationBulkSearchResponseSerializer,
     JobApplicationSearchRequestSerializer,
     JobApplicationSearchResponseSerializer,
 )
-from itou.api.job_application_api.throttling import JobApplicationSearchThrottle
+from itou.api.job_application_api.throttling import JobApplicationBulkSearchThrottle, JobApplicationSearchThrottle
 from itou.companies.models import JobDescription
 from itou.job_applications.models import JobApplication, JobApplicationTransitionLog
 from itou.utils.auth import LoginNotRequiredMixin
+from itou.utils.db import or_queries
 from itou.utils.readonly import ReadonlyViewMixin
 
 
@@ -144,3 +150,94 @@ class JobApplicationSearchView(
             job_seeker__first_name__trigram_similar=validated_data["prenom"],
             last_modification_at__gte=three_months_ago,
         )
+
+
+job_application_bulk_search_view_description = f"""
+# API de recherche groupée de candidatures
+
+Cette API effectue en un seul appel la recherche de candidatures de plusieurs candidats,
+selon les mêmes critères que l’API de recherche de candidatures :
+
+- Numéro de sécurité sociale du candidat
+- Nom du candidat
+- Prénom du candidat
+- Date de naissance du candidat
+
+Les candidatures sont retournées pour chaque candidat recherché, dans l’ordre de la requête.
+
+Cette API est à l’usage exclusif des conseils départementaux.
+
+# Permissions
+
+L’utilisation de cette API nécessite un token d’autorisation spécifique à chaque conseil départemental.
+
+# Limitations
+
+Une requête peut contenir jusqu’à {JobApplicationBulkSearchRequestSerializer.MAX_SEARCHES} candidats,
+chaque numéro de sécurité sociale ne pouvant être recherché qu’une fois.
+
+Chaque candidat recherché compte comme un appel de l’API de recherche de candidatures,
+dont la limite de 120 appels par minute et par conseil départemental est partagée.
+
+Elle ne retourne que les candidatures dont le dernier changement date de moins de 3 mois.
+"""
+
+
+@extend_schema_view(
+    post=extend_schema(
+        operation_id="candidatures_recherche_groupee",
+        request=JobApplicationBulkSearchRequestSerializer,
+        responses={
+            200: JobApplicationBulkSearchResponseSerializer(many=True),
+            400: inline_serializer(
+                name="JobApplicationBulkSearchRequestInvalidResponse",
+                fields={
+                    "recherches": fields.JSONField(label="Erreurs liées aux candidats recherchés", required=False),
+                },
+            ),
+        },
+        description=job_application_bulk_search_view_description,
+        examples=[
+            schema.job_application_bulk_search_request_example,
+            schema.job_application_bulk_search_response_valid_example,
+            schema.job_application_bulk_search_response_invalid_example,
+        ],
+    )
+)
+class JobApplicationBulkSearchView(LoginNotRequiredMixin, ReadonlyViewMixin, generics.GenericAPIView):
+    authentication_classes = (DepartmentTokenAuthentication,)
+    permission_classes = (JobApplicationSearchAPIPermission,)
+    serializer_class = JobApplicationBulkSearchResponseSerializer
+    throttle_classes = [JobApplicationBulkSearchThrottle]
+    queryset = JobApplicationSearchView.queryset
+
+    def post(self, request, *args, **kwargs):
+        request_serializer = JobApplicationBulkSearchRequestSerializer(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        searches = request_serializer.validated_data["recherches"]
+
+        three_months_ago = timezone.now() - relativedelta(months=3)
+        job_applications = self.get_queryset().filter(
+            or_queries(
+                [
+                    Q(
+                        job_seeker__jobseeker_profile__nir=search["nir"],
+                        job_seeker__jobseeker_profile__birthdate=search["date_naissance"],
+                        job_seeker__last_name__trigram_similar=search["nom"],
+                        job_seeker__first_name__trigram_similar=search["prenom"],
+                    )
+                    for search in searches
+                ]
+            ),
+            last_modification_at__gte=three_months_ago,
+        )
+        # NIRs are unique in the request: they identify the search matched by each job application.
+        job_applications_by_nir = collections.defaultdict(list)
+        for job_application in job_applications:
+            job_applications_by_nir[job_application.job_seeker.jobseeker_profile.nir].append(job_application)
+
+        serializer = self.get_serializer(
+            [{"nir": search["nir"], "candidatures": job_applications_by_nir[search["nir"]]} for search in searches],
+            many=True,
+        )
+        return Response(serializer.data)
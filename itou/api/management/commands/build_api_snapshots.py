@@ -0,0 +1,31 @@
+from itou.api.data_inclusion_api import enums as data_inclusion_enums
+from itou.api.data_inclusion_api.views import (
+    SERIALIZER_CLASSES as DATA_INCLUSION_SERIALIZER_CLASSES,
+    get_structures_queryset,
+    snapshot_name as data_inclusion_snapshot_name,
+)
+from itou.api.marche_api.serializers import MarcheCompanySerializer
+from itou.api.marche_api.views import SNAPSHOT_NAME as MARCHE_SNAPSHOT_NAME, get_companies_queryset
+from itou.api.snapshots import build_snapshot
+from itou.utils.command import BaseCommand
+
+
+def get_datasets():
+    for structure_type in data_inclusion_enums.StructureTypeStr:
+        yield (
+            data_inclusion_snapshot_name(structure_type),
+            get_structures_queryset(structure_type),
+            DATA_INCLUSION_SERIALIZER_CLASSES[structure_type],
+        )
+    yield MARCHE_SNAPSHOT_NAME, get_companies_queryset(), MarcheCompanySerializer
+
+
+class Command(BaseCommand):
+    help = "Build the compressed exports served to the partners of the bulk APIs."
+
+    ATOMIC_HANDLE = False
+
+    def handle(self, *args, **options):
+        for name, queryset, serializer_class in get_datasets():
+            _latest, updated = build_snapshot(name, queryset, serializer_class)
+            self.logger.info("Snapshot %s %s", name, "updated" if updated else "unchanged")
@@ -1,10 +1,13 @@
 from django.db.models import Prefetch
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
 from itou.api.auth import ServiceAccount, ServiceTokenAuthentication
 from itou.api.marche_api.serializers import MarcheCompanySerializer
 from itou.api.models import ServiceToken
+from itou.api.snapshots import SnapshotView
 from itou.companies.enums import COMPANY_KIND_RESERVED
 from itou.companies.models import Company, CompanyMembership
 from itou.nexus.enums import Service
@@ -12,6 +15,26 @@ from itou.utils.auth import LoginNotRequiredMixin
 from itou.utils.readonly import ReadonlyViewMixin
 
 
+SNAPSHOT_NAME = "marche"
+
+
+def get_companies_queryset():
+    return (
+        Company.objects.exclude(kind=COMPANY_KIND_RESERVED)
+        .select_related("convention")
+        .prefetch_related(
+            Prefetch(
+                "members",
+                queryset=(
+                    CompanyMembership.objects.filter(is_admin=True).select_related("user").order_by("-joined_at")[:1]
+                ),
+                to_attr="admin",
+            )
+        )
+        .order_by("id")
+    )
+
+
 class MarchePermission(IsAuthenticated):
     def has_permission(self, request, view) -> bool:
         if not super().has_permission(request, view):
@@ -33,19 +56,21 @@ class MarcheCompanyView(LoginNotRequiredMixin, ReadonlyViewMixin, generics.ListA
     serializer_class = MarcheCompanySerializer
 
     def get_queryset(self):
-        return (
-            Company.objects.exclude(kind=COMPANY_KIND_RESERVED)
-            .select_related("convention")
-            .prefetch_related(
-                Prefetch(
-                    "members",
-                    queryset=(
-                        CompanyMembership.objects.filter(is_admin=True)
-                        .select_related("user")
-                        .order_by("-joined_at")[:1]
-                    ),
-                    to_attr="admin",
-                )
-            )
-            .order_by("id")
-        )
+        return get_companies_queryset()
+
+
+@extend_schema(responses={(200, "application/gzip"): OpenApiTypes.BINARY})
+class MarcheCompanySnapshotView(SnapshotView):
+    """
+    Export complet de l’API pour le Marché de l'inclusion
+
+    Toutes les entreprises retournées par l’API, dans un fichier NDJSON (une entreprise par ligne)
+    compressé avec gzip. L’export est mis à jour chaque heure, les en-têtes `ETag` et
+    `Last-Modified` permettent d’éviter de télécharger à nouveau un export inchangé.
+    """
+
+    authentication_classes = [ServiceTokenAuthentication]
+    permission_classes = [MarchePermission]
+
+    def get_snapshot_name(self):
+        return SNAPSHOT_NAME
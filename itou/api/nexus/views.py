@@ -13,7 +13,7 @@ from itou.api.nexus.serializers import (
     SyncCompletedSerializer,
     UserSerializer,
 )
-from itou.nexus import utils as nexus_utils
+from itou.nexus import cache as nexus_cache, utils as nexus_utils
 from itou.nexus.models import NexusMembership, NexusStructure, NexusUser
 
 
@@ -74,6 +74,15 @@ class UsersView(NexusApiObjectsMixin, generics.GenericAPIView):
     build_obj = staticmethod(nexus_utils.build_user)
     sync_objs = staticmethod(nexus_utils.sync_users)
 
+    def perform_delete(self, serializer):
+        source_ids = [data["source_id"] for data in serializer.validated_data]
+        emails = list(
+            NexusUser.include_old.filter(source=self.source, source_id__in=source_ids).values_list("email", flat=True)
+        )
+        deleted = super().perform_delete(serializer)
+        nexus_cache.invalidate_email_dropdown_statuses(*emails)
+        return deleted
+
 
 @extend_schema(exclude=True)
 class MembershipsView(NexusApiObjectsMixin, generics.GenericAPIView):
@@ -119,5 +128,6 @@ class DropDownStatusView(NexusApiMixin, generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         serializer = EmailSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        payload = nexus_utils.dropdown_status(email=serializer.validated_data["email"])
+        email = serializer.validated_data["email"]
+        payload = nexus_utils.dropdown_status_many([email])[email]
         return Response(payload, status=status.HTTP_200_OK)
@@ -1,4 +1,16 @@
-from rest_framework import pagination
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import exceptions, pagination, status
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class PageNumberPagination(pagination.PageNumberPagination):
@@ -10,3 +22,117 @@ class PageNumberPagination(pagination.PageNumberPagination):
     """
 
     page_size_query_param = "page_size"
+
+
+class ChangeFeedPagination(pagination.BasePagination):
+    """
+    Return the records created or modified since an opaque cursor, oldest change first.
+
+    Pages are read by seeking on `(updated_at, pk)` instead of using an OFFSET, and each page
+    gives the cursor of the next call: clients synchronize incrementally by always passing
+    the last cursor they got. An unchanged page has the same ETag, `If-None-Match` gives a 304.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 100
+    # Margin for the clock drift between the application and the database, and for the records
+    # timestamped just before their transaction writes to the database.
+    settle_delay = datetime.timedelta(minutes=1)
+
+    def decode_cursor(self, request):
+        if not (encoded := request.query_params.get(self.cursor_query_param)):
+            return None
+        try:
+            updated_at, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return datetime.datetime.fromisoformat(updated_at), int(pk)
+        except (binascii.Error, TypeError, ValueError):
+            raise exceptions.ValidationError({self.cursor_query_param: "Curseur invalide."})
+
+    def encode_cursor(self, updated_at, pk):
+        return base64.urlsafe_b64encode(json.dumps([updated_at.isoformat(), pk]).encode()).decode()
+
+    def get_horizon(self):
+        """
+        Records are saved with a timestamp taken before their transaction is committed: stop before
+        the start of the oldest transaction still writing to the database (e.g. the per-file transactions
+        of the ASP transfer commands), so that the cursor never moves past records not visible yet.
+        """
+        with connection.cursor() as cursor:
+            # All the writers connect with the same role, their sessions are visible.
+            cursor.execute(
+                "SELECT MIN(xact_start) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND backend_xid IS NOT NULL"
+            )
+            [oldest_write_start] = cursor.fetchone()
+        horizon = timezone.now()
+        if oldest_write_start is not None:
+            horizon = min(horizon, oldest_write_start)
+        return horizon - self.settle_delay
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.cursor = request.query_params.get(self.cursor_query_param)
+        queryset = queryset.filter(updated_at__lt=self.get_horizon())
+        if cursor := self.decode_cursor(request):
+            updated_at, pk = cursor
+            queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk))
+        page = list(queryset.order_by("updated_at", "pk")[: self.page_size + 1])
+        self.has_more = len(page) > self.page_size
+        page = page[: self.page_size]
+        if page:
+            self.cursor = self.encode_cursor(page[-1].updated_at, page[-1].pk)
+        keys = ",".join(f"{obj.pk}@{obj.updated_at.isoformat()}" for obj in page)
+        self.etag = quote_etag(hashlib.sha256(f"{self.cursor}:{keys}".encode()).hexdigest())
+        return page
+
+    def is_not_modified(self):
+        return self.etag in parse_etags(self.request.headers.get("If-None-Match", ""))
+
+    def get_not_modified_response(self):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": self.etag})
+
+    def get_next_link(self):
+        if self.cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "cursor": self.cursor,
+                "next": self.get_next_link(),
+                "has_more": self.has_more,
+                "results": data,
+            },
+            headers={"ETag": self.etag},
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["cursor", "next", "has_more", "results"],
+            "properties": {
+                "cursor": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Curseur à fournir lors de l’appel suivant.",
+                },
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "has_more": {
+                    "type": "boolean",
+                    "description": "D’autres modifications sont disponibles sans attendre.",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Curseur retourné par l’appel précédent.",
+                "schema": {"type": "string"},
+            }
+        ]
@@ -1,6 +1,8 @@
+import decimal
 import logging
 
 from django.db.models import Exists, OuterRef, Prefetch, Q
+from django_filters import utils as filters_utils
 from django_filters.filters import CharFilter, ChoiceFilter, NumberFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet
 from drf_spectacular.types import OpenApiTypes
@@ -8,11 +10,13 @@ from drf_spectacular.utils import OpenApiExample, OpenApiParameter, extend_schem
 from rest_framework import viewsets
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
 
 from itou.api.auth import DepartmentTokenAuthentication
 from itou.api.siae_api.serializers import SiaeSerializer
 from itou.cities.models import City
 from itou.common_apps.address.departments import DEPARTMENTS
+from itou.companies.cache import get_or_set_search_results
 from itou.companies.models import Company, JobDescription
 from itou.utils.auth import LoginNotRequiredMixin
 from itou.utils.readonly import ReadonlyViewMixin
@@ -159,5 +163,31 @@ class SiaeViewSet(LoginNotRequiredMixin, ReadonlyViewMixin, viewsets.mixins.List
         ],
     )
     def list(self, request):
-        # we need this despite the default behavior because of the documentation annotations
-        return super().list(request)
+        # Integrators repeat the same searches over and over: cache the responses along with the
+        # search results, they are invalidated when a company or a job description is saved.
+        filterset = self.filterset_class(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise filters_utils.translate_validation(filterset.errors)
+        params = {
+            name: float(value) if isinstance(value, decimal.Decimal) else value
+            for name, value in filterset.form.cleaned_data.items()
+        }
+        params |= {
+            "page": request.query_params.get(self.paginator.page_query_param, "1"),
+            "page_size": self.paginator.get_page_size(request),
+            # Pagination links are absolute.
+            "host": request.get_host(),
+        }
+
+        computed = False
+        uncached_list = super().list
+
+        def compute():
+            nonlocal computed
+            computed = True
+            return uncached_list(request).data
+
+        data = get_or_set_search_results("api-siaes", params, compute)
+        cache_status = "miss" if computed else "hit"
+        logger.info("SIAE API cache %s", cache_status, extra={"siae_api_cache": cache_status})
+        return Response(data)
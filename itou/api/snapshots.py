@@ -0,0 +1,144 @@
+import datetime
+import gzip
+import hashlib
+import itertools
+import json
+import tempfile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from rest_framework import exceptions, views
+from rest_framework.utils.encoders import JSONEncoder
+
+from itou.utils.auth import LoginNotRequiredMixin
+from itou.utils.export import EXPORT_CHUNK_SIZE, iter_in_chunks
+from itou.utils.readonly import ReadonlyViewMixin
+from itou.utils.storage.s3 import SNAPSHOTS_PREFIX, s3_client
+
+
+# Partners poll the snapshots: spare a storage request per call.
+LATEST_SNAPSHOT_CACHE_TIMEOUT = 5 * 60
+
+
+def _latest_key(name):
+    return f"{SNAPSHOTS_PREFIX}/{name}/latest.json"
+
+
+def _cache_key(name):
+    return f"api-snapshot-{name}"
+
+
+def _read_latest(client, name):
+    try:
+        obj = client.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=_latest_key(name))
+    except client.exceptions.NoSuchKey:
+        return None
+    return json.loads(obj["Body"].read())
+
+
+def get_latest_snapshot(name):
+    """
+    Return the metadata of the latest snapshot of the dataset, None if it was never built.
+    """
+    cache = caches["failsafe"]
+    latest = cache.get(_cache_key(name))
+    if latest is None:
+        latest = _read_latest(s3_client(), name)
+        if latest is not None:
+            cache.set(_cache_key(name), latest, LATEST_SNAPSHOT_CACHE_TIMEOUT)
+    return latest
+
+
+def build_snapshot(name, queryset, serializer_class):
+    """
+    Serialize the queryset as gzipped NDJSON (one JSON object per line) in the bucket,
+    and make it the latest snapshot of the dataset.
+
+    A new version is only stored when the content changed, so that the ETag and the
+    Last-Modified of the snapshot follow the changes of the data. The previous version
+    is kept for the downloads in progress, older ones are deleted.
+
+    Return the metadata of the latest snapshot and whether it was updated.
+    """
+    client = s3_client()
+    created_at = timezone.now()
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile() as file:
+        with gzip.GzipFile(fileobj=file, mode="wb", mtime=0) as gzip_file:
+            rows = iter_in_chunks(queryset)
+            while chunk := list(itertools.islice(rows, EXPORT_CHUNK_SIZE)):
+                for data in serializer_class(chunk, many=True).data:
+                    line = json.dumps(data, cls=JSONEncoder, ensure_ascii=False).encode() + b"\n"
+                    digest.update(line)
+                    gzip_file.write(line)
+
+        latest = _read_latest(client, name)
+        etag = digest.hexdigest()
+        if latest is not None and latest["etag"] == etag:
+            return latest, False
+
+        file.seek(0)
+        key = f"{SNAPSHOTS_PREFIX}/{name}/{created_at:%Y%m%dT%H%M%S%f}.ndjson.gz"
+        client.upload_fileobj(
+            file,
+            settings.AWS_STORAGE_BUCKET_NAME,
+            key,
+            ExtraArgs={"ContentType": "application/gzip"},
+        )
+
+    new_latest = {
+        "key": key,
+        "previous_key": latest["key"] if latest else None,
+        "etag": etag,
+        "created_at": created_at.isoformat(),
+    }
+    client.put_object(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=_latest_key(name),
+        Body=json.dumps(new_latest).encode(),
+        ContentType="application/json",
+    )
+    caches["failsafe"].set(_cache_key(name), new_latest, LATEST_SNAPSHOT_CACHE_TIMEOUT)
+    if latest and latest["previous_key"]:
+        client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=latest["previous_key"])
+    return new_latest, True
+
+
+class SnapshotView(LoginNotRequiredMixin, ReadonlyViewMixin, views.APIView):
+    """
+    Serve the latest snapshot of a dataset, with an ETag and a Last-Modified
+    for conditional requests.
+    """
+
+    def get_snapshot_name(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        name = self.get_snapshot_name()
+        latest = get_latest_snapshot(name)
+        if latest is None:
+            raise exceptions.NotFound("Aucun export n’est encore disponible.")
+
+        etag = quote_etag(latest["etag"])
+        last_modified = int(datetime.datetime.fromisoformat(latest["created_at"]).timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            client = s3_client()
+            try:
+                obj = client.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=latest["key"])
+            except client.exceptions.NoSuchKey:
+                # The cached pointer is outdated, read it again from the bucket on the next call.
+                caches["failsafe"].delete(_cache_key(name))
+                raise exceptions.NotFound("Aucun export n’est encore disponible.")
+            response = StreamingHttpResponse(obj["Body"].iter_chunks(), content_type="application/gzip")
+            response["Content-Length"] = obj["ContentLength"]
+            response["Content-Disposition"] = content_disposition_header(
+                as_attachment=True, filename=f"{name}.ndjson.gz"
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -4,11 +4,11 @@ from drf_spectacular.views import SpectacularAPIView
 from rest_framework import routers
 
 from itou.api.applicants_api.views import ApplicantsView
-from itou.api.data_inclusion_api.views import DataInclusionStructureView
+from itou.api.data_inclusion_api.views import DataInclusionStructureSnapshotView, DataInclusionStructureView
 from itou.api.employee_record_api.viewsets import EmployeeRecordUpdateNotificationViewSet, EmployeeRecordViewSet
 from itou.api.geiq.views import GeiqJobApplicationListView
-from itou.api.job_application_api.views import JobApplicationSearchView
-from itou.api.marche_api.views import MarcheCompanyView
+from itou.api.job_application_api.views import JobApplicationBulkSearchView, JobApplicationSearchView
+from itou.api.marche_api.views import MarcheCompanySnapshotView, MarcheCompanyView
 from itou.api.nexus.views import (
     DropDownStatusView,
     MembershipsView,
@@ -57,8 +57,15 @@ urlpatterns = [
     ),
     path("candidats/", ApplicantsView.as_view(), name="applicants-list"),
     path("candidatures/recherche/", JobApplicationSearchView.as_view(), name="job-applications-search"),
+    path(
+        "candidatures/recherche-groupee/",
+        JobApplicationBulkSearchView.as_view(),
+        name="job-applications-bulk-search",
+    ),
     path("data-inclusion/", DataInclusionStructureView.as_view(), name="structures-list"),
+    path("data-inclusion/export/", DataInclusionStructureSnapshotView.as_view(), name="structures-snapshot"),
     path("marche/", MarcheCompanyView.as_view(), name="marche-company-list"),
+    path("marche/export/", MarcheCompanySnapshotView.as_view(), name="marche-company-snapshot"),
     path("nexus/users", UsersView.as_view(), name="nexus-users"),
     path("nexus/structures", StructuresView.as_view(), name="nexus-structures"),
     path("nexus/memberships", MembershipsView.as_view(), name="nexus-memberships"),
@@ -32,12 +32,15 @@ class Command(BaseCommand):
         self.logger.info(f"{len(queryset)} prolongation request{pluralize(queryset)} can be reminded")
 
         prolongation_reminded = 0
+        notifications = []
         for prolongation_request in queryset:
-            ProlongationRequestCreatedReminderForProfessionalNotification(
-                prolongation_request.assigned_to,
-                prolongation_request.prescriber_organization,
-                prolongation_request=prolongation_request,
-            ).send()
+            notifications.append(
+                ProlongationRequestCreatedReminderForProfessionalNotification(
+                    prolongation_request.assigned_to,
+                    prolongation_request.prescriber_organization,
+                    prolongation_request=prolongation_request,
+                )
+            )
             colleagues_to_notify = [
                 membership.user
                 for membership in PrescriberMembership.objects.filter(
@@ -50,15 +53,18 @@ class Command(BaseCommand):
                 .order_by("-is_admin", F("user__last_login").desc(nulls_last=True), "-joined_at", "-pk")[:10]
             ]
             for colleague in colleagues_to_notify:
-                ProlongationRequestCreatedReminderForProfessionalNotification(
-                    colleague,
-                    prolongation_request.prescriber_organization,
-                    prolongation_request=prolongation_request,
-                ).send()
+                notifications.append(
+                    ProlongationRequestCreatedReminderForProfessionalNotification(
+                        colleague,
+                        prolongation_request.prescriber_organization,
+                        prolongation_request=prolongation_request,
+                    )
+                )
 
             prolongation_request.reminder_sent_at = timezone.now()
             prolongation_request.save(update_fields=["reminder_sent_at", "updated_at"])
             prolongation_reminded += 1
+        ProlongationRequestCreatedReminderForProfessionalNotification.send_many(notifications)
         self.logger.info(f"{prolongation_reminded}/{len(queryset)} prolongation request{pluralize(queryset)} reminded")
 
     @dry_runnable
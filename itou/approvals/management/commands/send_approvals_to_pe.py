@@ -1,13 +1,16 @@
 import collections
-from time import sleep
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+from django.db import connection
 from django.db.models import Q
 from django.utils import timezone
 
 from itou.approvals import models as approvals_models
 from itou.job_applications.enums import JobApplicationState
 from itou.utils.apis import enums as api_enums
-from itou.utils.apis.pole_emploi import pole_emploi_partenaire_api_client
+from itou.utils.apis.pole_emploi import RateLimiter, pole_emploi_partenaire_api_client
 from itou.utils.command import BaseCommand
 
 
@@ -26,8 +29,62 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--wet-run", dest="wet_run", action="store_true")
         parser.add_argument("--delay", action="store", dest="delay", default=0, type=int, choices=range(0, 5))
+        parser.add_argument(
+            "--workers",
+            action="store",
+            dest="workers",
+            default=1,
+            type=int,
+            help="Send the approvals concurrently until the queue is empty (ignores --delay).",
+        )
+        parser.add_argument(
+            "--rate",
+            action="store",
+            dest="rate",
+            default=1.0,
+            type=float,
+            help="Maximum number of requests per second to the API, shared by the workers.",
+        )
+        parser.add_argument(
+            "--max-duration",
+            action="store",
+            dest="max_duration",
+            default=4 * 60,
+            type=int,
+            help="Stop sending new batches of approvals after this number of seconds.",
+        )
 
-    def handle(self, *, wet_run, delay, **options):
+    def notify(self, approval, *, client):
+        try:
+            self.logger.info(
+                "%s=%s start_at=%s pe_state=%s",
+                approval._meta.model_name,
+                approval,
+                approval.start_at,
+                approval.pe_notification_status,
+            )
+            return approval.notify_pole_emploi(client=client)
+        finally:
+            # Each worker thread opens its own database connection.
+            connection.close()
+
+    def drain(self, queryset, *, client, workers, deadline):
+        """
+        Send the approvals of the queryset by batches until it is empty or the deadline is reached.
+        Approvals are attempted once per run, even when they end up in SHOULD_RETRY.
+        """
+        results = []
+        attempted = set()
+        while time.monotonic() < deadline:
+            batch = list(queryset.exclude(pk__in=attempted)[:MAX_APPROVALS_PER_RUN])
+            if not batch:
+                break
+            attempted.update(approval.pk for approval in batch)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results.extend(executor.map(partial(self.notify, client=client), batch))
+        return results
+
+    def handle(self, *, wet_run, delay, workers, rate, max_duration, **options):
         today = timezone.localdate()
         results = []
 
@@ -66,6 +123,31 @@ class Command(BaseCommand):
                 api_enums.PEApiNotificationStatus.SHOULD_RETRY,
             ],
         ).order_by("-start_at")
+        cancelled_queryset = approvals_models.CancelledApproval.objects.filter(
+            pe_notification_status__in=[
+                api_enums.PEApiNotificationStatus.READY,
+                api_enums.PEApiNotificationStatus.SHOULD_RETRY,
+            ],
+        ).order_by("-start_at")
+
+        if wet_run and workers > 1:
+            started_at = time.monotonic()
+            with pole_emploi_partenaire_api_client() as client:
+                # The workers share the client, hence its token and its rate limit.
+                client.rate_limiter = RateLimiter(rate)
+                for qs in [queryset.select_related("user__jobseeker_profile"), cancelled_queryset]:
+                    results.extend(self.drain(qs, client=client, workers=workers, deadline=started_at + max_duration))
+            duration = time.monotonic() - started_at
+            self.logger.info(
+                "Sent %s approvals in %.1fs (%.2f/s) with workers=%s, final rate=%.2f/s",
+                len(results),
+                duration,
+                len(results) / duration if duration else 0,
+                workers,
+                client.rate_limiter.rate,
+            )
+            self.log_results(results, duration=duration)
+            return
 
         nb_approvals = queryset.count()
         self.logger.info("approvals needing to be sent count=%s, batch count=%s", nb_approvals, MAX_APPROVALS_PER_RUN)
@@ -81,16 +163,10 @@ class Command(BaseCommand):
                 )
                 if wet_run:
                     results.append(approval.notify_pole_emploi(client=client))
-                    sleep(delay)
+                    time.sleep(delay)
 
         # Send READY CancelledApprovals
         batch_left = MAX_APPROVALS_PER_RUN - nb_approvals_to_send
-        cancelled_queryset = approvals_models.CancelledApproval.objects.filter(
-            pe_notification_status__in=[
-                api_enums.PEApiNotificationStatus.READY,
-                api_enums.PEApiNotificationStatus.SHOULD_RETRY,
-            ],
-        ).order_by("-start_at")
         self.logger.info(
             "cancelled approvals needing to be sent count=%s, batch count=%s",
             cancelled_queryset.count(),
@@ -106,12 +182,23 @@ class Command(BaseCommand):
                 )
                 if wet_run:
                     results.append(cancelled_approval.notify_pole_emploi(client=client))
-                    sleep(delay)
+                    time.sleep(delay)
+
+        self.log_results(results)
 
+    def log_results(self, results, duration=None):
         status_counter = collections.Counter(results)
         for status, nb in status_counter.items():
-            self.logger.info("Sent %s approvals with new pe_notification_status=%s", nb, status)
-            if nb == MAX_APPROVALS_PER_RUN and status in (
+            if duration is None:
+                self.logger.info("Sent %s approvals with new pe_notification_status=%s", nb, status)
+            else:
+                self.logger.info(
+                    "Sent %s approvals with new pe_notification_status=%s (%.2f/s)",
+                    nb,
+                    status,
+                    nb / duration if duration else 0,
+                )
+            if nb == len(results) >= MAX_APPROVALS_PER_RUN and status in (
                 api_enums.PEApiNotificationStatus.ERROR,
                 api_enums.PEApiNotificationStatus.SHOULD_RETRY,
             ):
@@ -1,10 +1,10 @@
 from allauth.account.models import EmailAddress
 from django.contrib.auth.hashers import make_password
-from django.db.models import Exists, OuterRef, Prefetch
+from django.db.models import Exists, F, OuterRef, Value
 from django.utils import timezone
 
 from itou.archive.models import AnonymizedProfessional
-from itou.archive.utils import get_year_month_or_none
+from itou.archive.utils import count_related_subquery, insert_anonymized, year_month
 from itou.companies.models import CompanyMembership
 from itou.institutions.models import InstitutionMembership
 from itou.otp.models import ItouStaticDevice, ItouTOTPDevice
@@ -14,55 +14,41 @@ from itou.users.models import JobSeekerAssignment, User
 from itou.utils.admin import bulk_add_support_remark_to_objs
 
 
-def annotate_and_prefetch_for_anonymization(users_qs):
-    has_membership_in_authorized_organization_sqs = PrescriberMembership.include_inactive.filter(
-        user_id=OuterRef("id"), organization__authorization_status=PrescriberAuthorizationStatus.VALIDATED
-    )
-    return users_qs.annotate(
-        has_membership_in_authorized_organization=Exists(has_membership_in_authorized_organization_sqs)
-    ).prefetch_related(
-        Prefetch(
-            "companymembership_set",
-            to_attr="prefetched_companymemberships",
-            queryset=CompanyMembership.include_inactive.all(),
-        ),
-        Prefetch(
-            "prescribermembership_set",
-            to_attr="prefetched_prescribermemberships",
-            queryset=PrescriberMembership.include_inactive.all(),
-        ),
-        Prefetch(
-            "institutionmembership_set",
-            to_attr="prefetched_institutionmemberships",
-            queryset=InstitutionMembership.include_inactive.all(),
-        ),
-    )
+def anonymized_professional_fields():
+    membership_models = [CompanyMembership, InstitutionMembership, PrescriberMembership]
 
+    def count_memberships(**filters):
+        return sum(
+            (
+                count_related_subquery(model, "user", "pk", extra_filters=filters, manager=model.include_inactive)
+                for model in membership_models
+            ),
+            start=Value(0),
+        )
 
-def _make_anonymized_professional(user):
-    memberships = [
-        *user.prefetched_companymemberships,
-        *user.prefetched_institutionmemberships,
-        *user.prefetched_prescribermemberships,
-    ]
-    return AnonymizedProfessional(
-        date_joined=get_year_month_or_none(user.date_joined),
-        first_login=get_year_month_or_none(user.first_login),
-        last_login=get_year_month_or_none(user.last_login),
-        department=user.department,
-        title=user.title,
-        kind=user.kind,
-        number_of_memberships=len(memberships),
-        number_of_active_memberships=sum(m.is_active for m in memberships),
-        number_of_memberships_as_administrator=sum(m.is_admin for m in memberships),
-        had_memberships_in_authorized_organization=user.has_membership_in_authorized_organization,
-        identity_provider=user.identity_provider,
-    )
+    return {
+        "date_joined": year_month("date_joined"),
+        "first_login": year_month("first_login"),
+        "last_login": year_month("last_login"),
+        "department": F("department"),
+        "title": F("title"),
+        "kind": F("kind"),
+        "number_of_memberships": count_memberships(),
+        "number_of_active_memberships": count_memberships(is_active=True),
+        "number_of_memberships_as_administrator": count_memberships(is_admin=True),
+        "had_memberships_in_authorized_organization": Exists(
+            PrescriberMembership.include_inactive.filter(
+                user_id=OuterRef("id"), organization__authorization_status=PrescriberAuthorizationStatus.VALIDATED
+            )
+        ),
+        "identity_provider": F("identity_provider"),
+    }
 
 
 def anonymize_and_delete_professionals(users):
-    AnonymizedProfessional.objects.bulk_create([_make_anonymized_professional(user) for user in users])
-    User.objects.filter(id__in=[user.id for user in users]).delete()
+    user_ids = [user.id for user in users]
+    insert_anonymized(AnonymizedProfessional, User.objects.filter(id__in=user_ids), anonymized_professional_fields())
+    User.objects.filter(id__in=user_ids).delete()
 
 
 def anonymize_professionals_without_deletion(users):
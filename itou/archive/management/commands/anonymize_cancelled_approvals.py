@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import ExtractYear
 from django.utils import timezone
 from itoutils.django.commands import dry_runnable
 from sentry_sdk.crons import monitor
@@ -6,20 +8,21 @@ from sentry_sdk.crons import monitor
 from itou.approvals.models import CancelledApproval
 from itou.archive.constants import EXPIRATION_PERIOD
 from itou.archive.models import AnonymizedCancelledApproval
+from itou.archive.utils import insert_anonymized, is_not_blank, nir_part
 from itou.utils.command import BaseCommand
 
 
-def anonymized_cancelled_approval(obj):
-    return AnonymizedCancelledApproval(
-        had_pole_emploi_id=bool(obj.user_id_national_pe),
-        had_nir=bool(obj.user_nir),
-        nir_sex=obj.user_nir[0] if obj.user_nir else None,
-        nir_year=obj.user_nir[1:3] if obj.user_nir else None,
-        birth_year=obj.user_birthdate.year if obj.user_birthdate else None,
-        origin_company_kind=obj.origin_siae_kind,
-        origin_sender_kind=obj.origin_sender_kind,
-        origin_prescriber_organization_kind=obj.origin_prescriber_organization_kind,
-    )
+def anonymized_cancelled_approval_fields():
+    return {
+        "had_pole_emploi_id": is_not_blank("user_id_national_pe"),
+        "had_nir": is_not_blank("user_nir"),
+        "nir_sex": nir_part("user_nir", 1, 1),
+        "nir_year": nir_part("user_nir", 2, 2),
+        "birth_year": ExtractYear("user_birthdate"),
+        "origin_company_kind": F("origin_siae_kind"),
+        "origin_sender_kind": F("origin_sender_kind"),
+        "origin_prescriber_organization_kind": F("origin_prescriber_organization_kind"),
+    }
 
 
 class Command(BaseCommand):
@@ -55,16 +58,17 @@ class Command(BaseCommand):
         expired_since = timezone.now() - EXPIRATION_PERIOD
         self.logger.info("Anonymizing cancelled approvals after expiration period, expired since: %s", expired_since)
 
-        cancelled_approval_to_anonymize = list(
-            CancelledApproval.objects.filter(end_at__lte=expired_since)
-            .order_by("end_at", "id")
-            .select_for_update(of=["self"], skip_locked=True)
+        cancelled_approvals_to_anonymize = CancelledApproval.objects.filter(
+            id__in=list(
+                CancelledApproval.objects.filter(end_at__lte=expired_since)
+                .order_by("end_at", "id")
+                .select_for_update(of=["self"], skip_locked=True)
+                .values_list("id", flat=True)
+            )
         )
-        archived_cancelled_approval = [anonymized_cancelled_approval(obj) for obj in cancelled_approval_to_anonymize]
-
-        AnonymizedCancelledApproval.objects.bulk_create(archived_cancelled_approval)
-        CancelledApproval.objects.filter(id__in=[obj.id for obj in cancelled_approval_to_anonymize]).delete()
-
-        self.logger.info(
-            "Anonymized cancelled approvals after grace period, count: %d", len(archived_cancelled_approval)
+        count = insert_anonymized(
+            AnonymizedCancelledApproval, cancelled_approvals_to_anonymize, anonymized_cancelled_approval_fields()
         )
+        cancelled_approvals_to_anonymize.delete()
+
+        self.logger.info("Anonymized cancelled approvals after grace period, count: %d", count)
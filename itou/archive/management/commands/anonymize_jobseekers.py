@@ -1,6 +1,7 @@
 from django.conf import settings
-from django.contrib.postgres.aggregates import ArrayAgg
-from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Case, F, Func, JSONField, Max, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat, ExtractDay, ExtractYear
 from django.utils import timezone
 from itoutils.django.commands import dry_runnable
 from sentry_sdk.crons import monitor
@@ -17,13 +18,18 @@ from itou.archive.models import (
 from itou.archive.tasks import async_delete_contact
 from itou.archive.utils import (
     count_related_subquery,
-    get_year_month_or_none,
     inactive_jobseekers_without_recent_related_objects,
+    insert_anonymized,
+    is_not_blank,
+    is_not_null,
+    nir_part,
+    year_month,
 )
 from itou.companies.enums import CompanyKind
 from itou.companies.models import JobDescription
 from itou.eligibility.models.geiq import GEIQEligibilityDiagnosis
 from itou.eligibility.models.iae import EligibilityDiagnosis
+from itou.emails.tasks import batched_email_delivery
 from itou.employee_record.models import EmployeeRecord
 from itou.files.models import File
 from itou.gps.models import FollowUpGroup
@@ -34,123 +40,202 @@ from itou.users.notifications import ArchiveUser
 from itou.utils.command import BaseCommand
 
 
-BATCH_SIZE = 200
+BATCH_SIZE = 1000
+
+
+def anonymized_jobseeker_fields():
+    return {
+        "date_joined": year_month("date_joined"),
+        "first_login": year_month("first_login"),
+        "last_login": year_month("last_login"),
+        "user_signup_kind": F("created_by__kind"),
+        "department": F("department"),
+        "title": F("title"),
+        "identity_provider": F("identity_provider"),
+        "had_pole_emploi_id": is_not_blank("jobseeker_profile__pole_emploi_id"),
+        "had_nir": is_not_blank("jobseeker_profile__nir"),
+        "lack_of_nir_reason": F("jobseeker_profile__lack_of_nir_reason"),
+        "nir_sex": nir_part("jobseeker_profile__nir", 1, 1),
+        "nir_year": nir_part("jobseeker_profile__nir", 2, 2),
+        "birth_year": ExtractYear("jobseeker_profile__birthdate"),
+        "count_accepted_applications": count_related_subquery(
+            JobApplication, "job_seeker", "pk", extra_filters={"state": JobApplicationState.ACCEPTED}
+        ),
+        "count_IAE_applications": count_related_subquery(
+            JobApplication, "job_seeker", "pk", extra_filters={"to_company__kind__in": CompanyKind.siae_kinds()}
+        ),
+        "count_total_applications": count_related_subquery(JobApplication, "job_seeker", "pk"),
+        "count_approvals": count_related_subquery(Approval, "user", "pk"),
+        "first_approval_start_at": year_month(
+            Subquery(
+                Approval.objects.filter(user=OuterRef("pk"))
+                .values("user")
+                .annotate(first_approval_start_at=Min("start_at"))
+                .values("first_approval_start_at")
+            )
+        ),
+        "last_approval_end_at": year_month(
+            Subquery(
+                Approval.objects.filter(user=OuterRef("pk"))
+                .values("user")
+                .annotate(last_approval_end_at=Max("end_at"))
+                .values("last_approval_end_at")
+            )
+        ),
+        "count_eligibility_diagnoses": (
+            count_related_subquery(EligibilityDiagnosis, "job_seeker", "id")
+            + count_related_subquery(GEIQEligibilityDiagnosis, "job_seeker", "id")
+        ),
+    }
 
 
-def anonymized_jobseeker(user):
-    return AnonymizedJobSeeker(
-        date_joined=get_year_month_or_none(user.date_joined),
-        first_login=get_year_month_or_none(user.first_login),
-        last_login=get_year_month_or_none(user.last_login),
-        user_signup_kind=getattr(user.created_by, "kind", None),
-        department=user.department,
-        title=user.title,
-        identity_provider=user.identity_provider,
-        had_pole_emploi_id=bool(user.jobseeker_profile.pole_emploi_id),
-        had_nir=bool(user.jobseeker_profile.nir),
-        lack_of_nir_reason=user.jobseeker_profile.lack_of_nir_reason,
-        nir_sex=user.jobseeker_profile.nir[0] if user.jobseeker_profile.nir else None,
-        nir_year=user.jobseeker_profile.nir[1:3] if user.jobseeker_profile.nir else None,
-        birth_year=user.jobseeker_profile.birthdate.year if user.jobseeker_profile.birthdate else None,
-        count_accepted_applications=user.count_accepted_applications,
-        count_IAE_applications=user.count_IAE_applications,
-        count_total_applications=user.count_total_applications,
-        count_approvals=user.count_approvals,
-        first_approval_start_at=get_year_month_or_none(user.first_approval_start_at),
-        last_approval_end_at=get_year_month_or_none(user.last_approval_end_at),
-        count_eligibility_diagnoses=user.count_eligibility_diagnoses_iae + user.count_eligibility_diagnoses_geiq,
+def anonymized_jobapplication_fields():
+    last_transition_at_subquery = (
+        JobApplicationTransitionLog.objects.filter(job_application__id=OuterRef("id"))
+        .values("job_application")
+        .annotate(last_transition_at=Max("timestamp"))
+        .values("last_transition_at")
     )
-
-
-def anonymized_jobapplication(obj):
-    return AnonymizedApplication(
-        job_seeker_birth_year=(
-            obj.job_seeker.jobseeker_profile.birthdate.year if obj.job_seeker.jobseeker_profile.birthdate else None
-        ),
-        job_seeker_department_same_as_company_department=obj.job_seeker.department == obj.to_company.department,
-        sender_kind=obj.sender_kind,
-        sender_company_kind=obj.sender_company.kind if obj.sender_company else None,
-        sender_prescriber_organization_kind=(
-            obj.sender_prescriber_organization.kind if obj.sender_prescriber_organization else None
+    return {
+        "job_seeker_birth_year": ExtractYear("job_seeker__jobseeker_profile__birthdate"),
+        "job_seeker_department_same_as_company_department": Case(
+            When(job_seeker__department=F("to_company__department"), then=Value(True)), default=Value(False)
         ),
-        sender_prescriber_organization_authorization_status=(
-            obj.sender_prescriber_organization.authorization_status if obj.sender_prescriber_organization else None
+        "sender_kind": F("sender_kind"),
+        "sender_company_kind": F("sender_company__kind"),
+        "sender_prescriber_organization_kind": F("sender_prescriber_organization__kind"),
+        "sender_prescriber_organization_authorization_status": F(
+            "sender_prescriber_organization__authorization_status"
         ),
-        company_kind=obj.to_company.kind,
-        company_department=obj.to_company.department,
-        company_naf=obj.to_company.naf,
-        company_has_convention=obj.to_company.convention is not None,
-        applied_at=get_year_month_or_none(obj.created_at),
-        processed_at=get_year_month_or_none(obj.processed_at),
-        last_transition_at=(
-            get_year_month_or_none(obj.last_transition_at)
-            if obj.last_transition_at
-            else get_year_month_or_none(obj.created_at)
+        "company_kind": F("to_company__kind"),
+        "company_department": F("to_company__department"),
+        "company_naf": F("to_company__naf"),
+        "company_has_convention": is_not_null("to_company__convention"),
+        "applied_at": year_month("created_at"),
+        "processed_at": year_month("processed_at"),
+        "last_transition_at": year_month(Coalesce(Subquery(last_transition_at_subquery), "created_at")),
+        "had_resume": is_not_null("resume"),
+        "origin": F("origin"),
+        "state": F("state"),
+        "refusal_reason": F("refusal_reason"),
+        "had_been_transferred": is_not_null("transferred_at"),
+        "number_of_jobs_applied_for": count_related_subquery(JobDescription, "jobapplication", "pk"),
+        "had_diagoriente_invitation": is_not_null("diagoriente_invite_sent_at"),
+        # str() of the ROME.
+        "hiring_rome": Case(
+            When(
+                hired_job__isnull=False,
+                then=Concat(
+                    "hired_job__appellation__rome__name",
+                    Value(" ("),
+                    "hired_job__appellation__rome__code",
+                    Value(")"),
+                ),
+            ),
+            default=None,
         ),
-        had_resume=bool(obj.resume_id),
-        origin=obj.origin,
-        state=obj.state,
-        refusal_reason=obj.refusal_reason,
-        had_been_transferred=obj.transferred_at is not None,
-        number_of_jobs_applied_for=obj.number_of_jobs_applied_for,
-        had_diagoriente_invitation=obj.diagoriente_invite_sent_at is not None,
-        hiring_rome=obj.hired_job.appellation.rome if obj.hired_job else None,
-        hiring_contract_type=obj.hired_job.contract_type if obj.hired_job else None,
-        hiring_start_date=get_year_month_or_none(obj.hiring_start_at),
-        had_approval=bool(obj.approval_id),
-    )
+        "hiring_contract_type": F("hired_job__contract_type"),
+        "hiring_start_date": year_month("hiring_start_at"),
+        "had_approval": is_not_null("approval"),
+    }
 
 
-def anonymized_approval(obj):
-    return AnonymizedApproval(
-        origin=obj.origin,
-        origin_company_kind=obj.origin_siae_kind,
-        origin_sender_kind=obj.origin_sender_kind,
-        origin_prescriber_organization_kind=obj.origin_prescriber_organization_kind,
-        start_at=get_year_month_or_none(obj.start_at),
-        end_at=get_year_month_or_none(obj.end_at),
-        had_eligibility_diagnosis=bool(obj.eligibility_diagnosis_id),
-        number_of_prolongations=obj.number_of_prolongations,
-        duration_of_prolongations=obj.duration_of_prolongations.days if obj.duration_of_prolongations else 0,
-        number_of_suspensions=obj.number_of_suspensions,
-        duration_of_suspensions=obj.duration_of_suspensions.days if obj.duration_of_suspensions else 0,
-        number_of_job_applications=obj.number_of_job_applications,
-        number_of_accepted_job_applications=obj.number_of_accepted_job_applications,
-    )
+def anonymized_approval_fields():
+    def duration_in_days(model):
+        return Coalesce(
+            ExtractDay(
+                Subquery(
+                    model.objects.filter(approval=OuterRef("pk"))
+                    .values("approval")
+                    .annotate(duration=Sum(F("end_at") - F("start_at")))
+                    .values("duration")
+                )
+            ),
+            0,
+        )
+
+    return {
+        "origin": F("origin"),
+        "origin_company_kind": F("origin_siae_kind"),
+        "origin_sender_kind": F("origin_sender_kind"),
+        "origin_prescriber_organization_kind": F("origin_prescriber_organization_kind"),
+        "start_at": year_month("start_at"),
+        "end_at": year_month("end_at"),
+        "had_eligibility_diagnosis": is_not_null("eligibility_diagnosis"),
+        "number_of_prolongations": count_related_subquery(Prolongation, "approval", "pk"),
+        "duration_of_prolongations": duration_in_days(Prolongation),
+        "number_of_suspensions": count_related_subquery(Suspension, "approval", "pk"),
+        "duration_of_suspensions": duration_in_days(Suspension),
+        "number_of_job_applications": count_related_subquery(JobApplication, "approval", "pk"),
+        "number_of_accepted_job_applications": count_related_subquery(
+            JobApplication, "approval", "pk", extra_filters={"state": JobApplicationState.ACCEPTED}
+        ),
+    }
 
 
-def anonymized_eligibility_diagnosis(obj):
-    data = {
-        "created_at": get_year_month_or_none(obj.created_at),
-        "expired_at": get_year_month_or_none(obj.expires_at),
-        "job_seeker_birth_year": (
-            obj.job_seeker.jobseeker_profile.birthdate.year if obj.job_seeker.jobseeker_profile.birthdate else None
+def anonymized_eligibility_diagnosis_fields(model):
+    selected_criteria_model = model.administrative_criteria.through
+    job_application_fk = "eligibility_diagnosis" if model is EligibilityDiagnosis else "geiq_eligibility_diagnosis"
+    fields = {
+        "created_at": year_month("created_at"),
+        "expired_at": year_month("expires_at"),
+        "job_seeker_birth_year": ExtractYear("job_seeker__jobseeker_profile__birthdate"),
+        "job_seeker_department": F("job_seeker__department"),
+        "author_kind": F("author_kind"),
+        "author_prescriber_organization_kind": F("author_prescriber_organization__kind"),
+        "number_of_administrative_criteria": count_related_subquery(
+            selected_criteria_model, "eligibility_diagnosis", "pk"
+        ),
+        "number_of_administrative_criteria_level_1": count_related_subquery(
+            selected_criteria_model, "eligibility_diagnosis", "pk", extra_filters={"administrative_criteria__level": 1}
+        ),
+        "number_of_administrative_criteria_level_2": count_related_subquery(
+            selected_criteria_model, "eligibility_diagnosis", "pk", extra_filters={"administrative_criteria__level": 2}
+        ),
+        "number_of_certified_administrative_criteria": count_related_subquery(
+            selected_criteria_model,
+            "eligibility_diagnosis",
+            "pk",
+            extra_filters={"certification_period__isempty": False},
         ),
-        "job_seeker_department": obj.job_seeker.department,
-        "author_kind": obj.author_kind,
-        "author_prescriber_organization_kind": (
-            obj.author_prescriber_organization.kind if obj.author_prescriber_organization else None
+        "selected_administrative_criteria": Func(
+            ArraySubquery(
+                selected_criteria_model.objects.filter(eligibility_diagnosis=OuterRef("pk"))
+                .order_by("administrative_criteria__kind")
+                .values("administrative_criteria__kind")
+            ),
+            function="to_jsonb",
+            output_field=JSONField(),
+        ),
+        "number_of_job_applications": count_related_subquery(JobApplication, job_application_fk, "id"),
+        "number_of_accepted_job_applications": count_related_subquery(
+            JobApplication, job_application_fk, "id", extra_filters={"state": JobApplicationState.ACCEPTED}
         ),
-        "number_of_administrative_criteria": obj.number_of_administrative_criteria,
-        "number_of_administrative_criteria_level_1": obj.number_of_administrative_criteria_level_1,
-        "number_of_administrative_criteria_level_2": obj.number_of_administrative_criteria_level_2,
-        "number_of_certified_administrative_criteria": obj.number_of_certified_administrative_criteria,
-        "selected_administrative_criteria": obj.selected_administrative_criteria_list,
-        "number_of_job_applications": obj.number_of_job_applications,
-        "number_of_accepted_job_applications": obj.number_of_accepted_job_applications,
     }
-    if isinstance(obj, EligibilityDiagnosis):
-        data.update(
+    if model is EligibilityDiagnosis:
+        fields.update(
             {
-                "author_siae_kind": obj.author_siae.kind if obj.author_siae else None,
-                "number_of_approvals": obj.number_of_approvals,
-                "first_approval_start_at": get_year_month_or_none(obj.first_approval_start_at),
-                "last_approval_end_at": get_year_month_or_none(obj.last_approval_end_at),
+                "author_siae_kind": F("author_siae__kind"),
+                "number_of_approvals": count_related_subquery(Approval, "eligibility_diagnosis", "id"),
+                "first_approval_start_at": year_month(
+                    Subquery(
+                        Approval.objects.filter(eligibility_diagnosis=OuterRef("pk"))
+                        .values("eligibility_diagnosis")
+                        .annotate(first_approval_start_at=Min("start_at"))
+                        .values("first_approval_start_at")
+                    )
+                ),
+                "last_approval_end_at": year_month(
+                    Subquery(
+                        Approval.objects.filter(eligibility_diagnosis=OuterRef("pk"))
+                        .values("eligibility_diagnosis")
+                        .annotate(last_approval_end_at=Max("end_at"))
+                        .values("last_approval_end_at")
+                    )
+                ),
             }
         )
-        return AnonymizedSIAEEligibilityDiagnosis(**data)
-
-    return AnonymizedGEIQEligibilityDiagnosis(**data)
+    return fields
 
 
 class Command(BaseCommand):
@@ -191,194 +276,51 @@ class Command(BaseCommand):
         grace_period_since = now - GRACE_PERIOD
         self.logger.info("Anonymizing job seekers after grace period, notified before: %s", grace_period_since)
 
-        # jobseekers
         users_to_archive = list(
-            User.objects.filter(kind=UserKind.JOB_SEEKER, upcoming_deletion_notified_at__lte=grace_period_since)
-            .annotate(
-                count_accepted_applications=Count(
-                    "job_applications__id", filter=Q(job_applications__state=JobApplicationState.ACCEPTED)
-                ),
-                count_IAE_applications=Count(
-                    "job_applications__id", filter=Q(job_applications__to_company__kind__in=CompanyKind.siae_kinds())
-                ),
-                count_total_applications=Count("job_applications__id"),
-                count_approvals=count_related_subquery(Approval, "user", "pk"),
-                first_approval_start_at=Subquery(
-                    Approval.objects.filter(user=OuterRef("pk"))
-                    .values("user")
-                    .annotate(first_approval_start_at=Min("start_at"))
-                    .values("first_approval_start_at")
-                ),
-                last_approval_end_at=Subquery(
-                    Approval.objects.filter(user=OuterRef("pk"))
-                    .values("user")
-                    .annotate(last_approval_end_at=Max("end_at"))
-                    .values("last_approval_end_at")
-                ),
-                count_eligibility_diagnoses_iae=count_related_subquery(EligibilityDiagnosis, "job_seeker", "id"),
-                count_eligibility_diagnoses_geiq=count_related_subquery(GEIQEligibilityDiagnosis, "job_seeker", "id"),
-            )
-            .order_by("upcoming_deletion_notified_at")[: self.batch_size]
-        )
-
-        anonymized_jobseekers = [anonymized_jobseeker(user) for user in users_to_archive]
-
-        # job applications
-        number_of_jobs_applied_for_count = count_related_subquery(
-            JobDescription,
-            "jobapplication",
-            "pk",
-        )
-        last_transition_at_subquery = (
-            JobApplicationTransitionLog.objects.filter(job_application__id=OuterRef("id"))
-            .values("job_application")
-            .annotate(last_transition_at=Max("timestamp"))
-            .values("last_transition_at")
-        )
-        jobapplications_to_archive = (
-            JobApplication.objects.filter(job_seeker__in=users_to_archive)
-            .annotate(
-                number_of_jobs_applied_for=number_of_jobs_applied_for_count,
-                last_transition_at=Subquery(last_transition_at_subquery),
-            )
-            .select_related(
-                "job_seeker",
-                "sender",
-                "sender_company",
-                "sender_prescriber_organization",
-                "to_company",
-                "hired_job",
-                "hired_job__appellation",
-            )
-        )
-        anonymized_jobapplications = [
-            anonymized_jobapplication(job_application) for job_application in jobapplications_to_archive
-        ]
-
-        # approvals
-        duration_of_prolongations_subquery = (
-            Prolongation.objects.filter(approval=OuterRef("pk"))
-            .values("approval")
-            .annotate(duration_of_prolongations=Sum(F("end_at") - F("start_at")))
-            .values("duration_of_prolongations")
+            User.objects.filter(
+                kind=UserKind.JOB_SEEKER, upcoming_deletion_notified_at__lte=grace_period_since
+            ).order_by("upcoming_deletion_notified_at")[: self.batch_size]
         )
-        duration_of_suspensions_subquery = (
-            Suspension.objects.filter(approval=OuterRef("pk"))
-            .values("approval")
-            .annotate(duration_of_suspensions=Sum(F("end_at") - F("start_at")))
-            .values("duration_of_suspensions")
-        )
-
-        approvals_to_archive = Approval.objects.filter(user__in=users_to_archive).annotate(
-            number_of_prolongations=count_related_subquery(Prolongation, "approval", "pk"),
-            duration_of_prolongations=Subquery(duration_of_prolongations_subquery),
-            number_of_suspensions=count_related_subquery(Suspension, "approval", "pk"),
-            duration_of_suspensions=Subquery(duration_of_suspensions_subquery),
-            number_of_job_applications=count_related_subquery(JobApplication, "approval", "pk"),
-            number_of_accepted_job_applications=count_related_subquery(
-                JobApplication, "approval", "pk", extra_filters={"state": JobApplicationState.ACCEPTED}
+        user_ids = [user.pk for user in users_to_archive]
+
+        with batched_email_delivery():
+            for user in users_to_archive:
+                ArchiveUser(
+                    user,
+                ).send()
+
+        # The anonymized rows are computed by the database, before deleting their source.
+        counts = {
+            "jobseekers": insert_anonymized(
+                AnonymizedJobSeeker, User.objects.filter(pk__in=user_ids), anonymized_jobseeker_fields()
             ),
-        )
-
-        anonymized_approvals = [anonymized_approval(approval) for approval in approvals_to_archive]
-
-        # eligibility diagnoses
-        # common subqueries
-        common_eligibility_diag_annotations = dict(
-            number_of_administrative_criteria=Count("selected_administrative_criteria"),
-            number_of_administrative_criteria_level_1=Count(
-                "selected_administrative_criteria",
-                filter=Q(selected_administrative_criteria__administrative_criteria__level=1),
+            "job applications": insert_anonymized(
+                AnonymizedApplication,
+                JobApplication.objects.filter(job_seeker_id__in=user_ids),
+                anonymized_jobapplication_fields(),
             ),
-            number_of_administrative_criteria_level_2=Count(
-                "selected_administrative_criteria",
-                filter=Q(selected_administrative_criteria__administrative_criteria__level=2),
+            "approvals": insert_anonymized(
+                AnonymizedApproval, Approval.objects.filter(user_id__in=user_ids), anonymized_approval_fields()
             ),
-            number_of_certified_administrative_criteria=Count(
-                "selected_administrative_criteria",
-                filter=Q(selected_administrative_criteria__certification_period__isempty=False),
+            "IAE eligibility diagnoses": insert_anonymized(
+                AnonymizedSIAEEligibilityDiagnosis,
+                EligibilityDiagnosis.objects.filter(job_seeker_id__in=user_ids),
+                anonymized_eligibility_diagnosis_fields(EligibilityDiagnosis),
             ),
-            selected_administrative_criteria_list=ArrayAgg(
-                "administrative_criteria__kind", order_by=["administrative_criteria__kind"]
+            "GEIQ eligibility diagnoses": insert_anonymized(
+                AnonymizedGEIQEligibilityDiagnosis,
+                GEIQEligibilityDiagnosis.objects.filter(job_seeker_id__in=user_ids),
+                anonymized_eligibility_diagnosis_fields(GEIQEligibilityDiagnosis),
             ),
-        )
-        # IAE subqueries
-        first_approval_start_at_subquery = (
-            Approval.objects.filter(eligibility_diagnosis=OuterRef("pk"))
-            .values("eligibility_diagnosis")
-            .annotate(first_approval_start_at=Min("start_at"))
-            .values("first_approval_start_at")
-        )
-        last_approval_end_at_subquery = (
-            Approval.objects.filter(eligibility_diagnosis=OuterRef("pk"))
-            .values("eligibility_diagnosis")
-            .annotate(last_approval_end_at=Max("end_at"))
-            .values("last_approval_end_at")
-        )
-
-        siae_eligibility_diagnoses_to_archive = (
-            EligibilityDiagnosis.objects.filter(job_seeker__in=users_to_archive)
-            .annotate(
-                number_of_job_applications=count_related_subquery(JobApplication, "eligibility_diagnosis", "id"),
-                number_of_accepted_job_applications=count_related_subquery(
-                    JobApplication,
-                    "eligibility_diagnosis",
-                    "id",
-                    extra_filters={"state": JobApplicationState.ACCEPTED},
-                ),
-                number_of_approvals=count_related_subquery(Approval, "eligibility_diagnosis", "id"),
-                first_approval_start_at=Subquery(first_approval_start_at_subquery),
-                last_approval_end_at=Subquery(last_approval_end_at_subquery),
-                **common_eligibility_diag_annotations,
-            )
-            .select_related(
-                "author_siae", "job_seeker", "job_seeker__jobseeker_profile", "author_prescriber_organization"
-            )
-        )
-        anonymized_siae_eligibility_diagnoses = [
-            anonymized_eligibility_diagnosis(eligibility_diagnosis)
-            for eligibility_diagnosis in siae_eligibility_diagnoses_to_archive
-        ]
-
-        geiq_eligibility_diagnoses_to_archive = (
-            GEIQEligibilityDiagnosis.objects.filter(job_seeker__in=users_to_archive)
-            .annotate(
-                number_of_job_applications=count_related_subquery(JobApplication, "geiq_eligibility_diagnosis", "id"),
-                number_of_accepted_job_applications=count_related_subquery(
-                    JobApplication,
-                    "geiq_eligibility_diagnosis",
-                    "id",
-                    extra_filters={"state": JobApplicationState.ACCEPTED},
-                ),
-                **common_eligibility_diag_annotations,
-            )
-            .select_related(
-                "author_geiq", "job_seeker", "job_seeker__jobseeker_profile", "author_prescriber_organization"
-            )
-        )
-        anonymized_geiq_eligibility_diagnoses = [
-            anonymized_eligibility_diagnosis(eligibility_diagnosis)
-            for eligibility_diagnosis in geiq_eligibility_diagnoses_to_archive
-        ]
-
-        for user in users_to_archive:
-            ArchiveUser(
-                user,
-            ).send()
-
-        AnonymizedJobSeeker.objects.bulk_create(anonymized_jobseekers)
-        AnonymizedApplication.objects.bulk_create(anonymized_jobapplications)
-        AnonymizedApproval.objects.bulk_create(anonymized_approvals)
-        AnonymizedSIAEEligibilityDiagnosis.objects.bulk_create(anonymized_siae_eligibility_diagnoses)
-        AnonymizedGEIQEligibilityDiagnosis.objects.bulk_create(anonymized_geiq_eligibility_diagnoses)
-        self._delete_jobapplications_with_related_objects(jobapplications_to_archive)
-        approvals_to_archive.delete(enable_mass_delete=True)
-        siae_eligibility_diagnoses_to_archive.delete()
-        geiq_eligibility_diagnoses_to_archive.delete()
+        }
+        self._delete_jobapplications_with_related_objects(JobApplication.objects.filter(job_seeker_id__in=user_ids))
+        Approval.objects.filter(user_id__in=user_ids).delete(enable_mass_delete=True)
+        EligibilityDiagnosis.objects.filter(job_seeker_id__in=user_ids).delete()
+        GEIQEligibilityDiagnosis.objects.filter(job_seeker_id__in=user_ids).delete()
         self._delete_jobseekers_with_related_objects(users_to_archive)
 
-        self.logger.info("Anonymized jobseekers after grace period, count: %d", len(anonymized_jobseekers))
-        self.logger.info("Anonymized job applications after grace period, count: %d", len(anonymized_jobapplications))
+        for name, count in counts.items():
+            self.logger.info("Anonymized %s after grace period, count: %d", name, count)
 
     def _delete_jobseekers_with_related_objects(self, users):
         FollowUpGroup.objects.filter(beneficiary__in=users).delete()
@@ -4,14 +4,11 @@ from django.utils import timezone
 from itoutils.django.commands import dry_runnable
 from sentry_sdk.crons import monitor
 
-from itou.archive.anonymize import (
-    annotate_and_prefetch_for_anonymization,
-    anonymize_and_delete_professionals,
-    anonymize_professionals_without_deletion,
-)
+from itou.archive.anonymize import anonymize_and_delete_professionals, anonymize_professionals_without_deletion
 from itou.archive.constants import GRACE_PERIOD
 from itou.archive.tasks import async_delete_contact
 from itou.archive.utils import exclude_users_with_blocking_relations
+from itou.emails.tasks import batched_email_delivery
 from itou.users.models import User, UserKind
 from itou.users.notifications import ArchiveUser
 from itou.utils.command import BaseCommand
@@ -66,8 +63,9 @@ class Command(BaseCommand):
         # users to anonymize or delete that have an email set
         users_to_remove_from_contact = [user for user in users if user.email]
 
-        for user in users:
-            ArchiveUser(user).send()
+        with batched_email_delivery():
+            for user in users:
+                ArchiveUser(user).send()
 
         anonymize_and_delete_professionals(users_to_delete)
         anonymize_professionals_without_deletion(users_to_anonymize)
@@ -89,11 +87,7 @@ class Command(BaseCommand):
         )
 
     def get_users_to_anonymize_and_delete(self, users):
-        return list(
-            annotate_and_prefetch_for_anonymization(
-                exclude_users_with_blocking_relations(User.objects.filter(id__in=[user.id for user in users]))
-            )
-        )
+        return list(exclude_users_with_blocking_relations(User.objects.filter(id__in=[user.id for user in users])))
 
     def remove_from_contact(self, users):
         for user in users:
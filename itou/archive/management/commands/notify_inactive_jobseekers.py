@@ -4,6 +4,7 @@ from sentry_sdk.crons import monitor
 
 from itou.archive.constants import GRACE_PERIOD, INACTIVITY_PERIOD
 from itou.archive.utils import inactive_jobseekers_without_recent_related_objects
+from itou.emails.tasks import batched_email_delivery
 from itou.users.models import User
 from itou.users.notifications import InactiveUser
 from itou.utils.command import BaseCommand
@@ -41,8 +42,9 @@ class Command(BaseCommand):
             )
         )
 
-        for user in users:
-            InactiveUser(user, end_of_grace_period=now + GRACE_PERIOD, inactivity_since=inactive_since).send()
+        with batched_email_delivery():
+            for user in users:
+                InactiveUser(user, end_of_grace_period=now + GRACE_PERIOD, inactivity_since=inactive_since).send()
         User.objects.filter(id__in=[user.id for user in users]).update(upcoming_deletion_notified_at=now)
 
         self.logger.info("Notified inactive job seekers without recent activity: %s", len(users))
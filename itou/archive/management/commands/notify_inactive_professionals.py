@@ -2,6 +2,7 @@ from django.utils import timezone
 from sentry_sdk.crons import monitor
 
 from itou.archive.constants import GRACE_PERIOD, INACTIVITY_PERIOD
+from itou.emails.tasks import batched_email_delivery
 from itou.users.models import User, UserKind
 from itou.users.notifications import InactiveUser
 from itou.utils.command import BaseCommand
@@ -43,8 +44,9 @@ class Command(BaseCommand):
         )
 
         if self.wet_run:
-            for user in users:
-                InactiveUser(user, end_of_grace_period=now + GRACE_PERIOD, inactivity_since=inactive_since).send()
+            with batched_email_delivery():
+                for user in users:
+                    InactiveUser(user, end_of_grace_period=now + GRACE_PERIOD, inactivity_since=inactive_since).send()
             User.objects.filter(id__in=[user.id for user in users]).update(upcoming_deletion_notified_at=now)
 
         self.logger.info("Notified inactive professionals without recent activity: %s", len(users))
@@ -1,11 +1,12 @@
 import datetime
 
-from django.db import models
-from django.db.models import Count, Exists, OuterRef, Q
-from django.db.models.functions import Coalesce
+from django.db import connection, models
+from django.db.models import Case, Count, Exists, Func, OuterRef, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, NullIf, Substr, TruncMonth
 from django.utils import timezone
 
 from itou.approvals.models import Approval
+from itou.archive.models import current_year_month
 from itou.eligibility.models import EligibilityDiagnosis, GEIQEligibilityDiagnosis
 from itou.gps.models import FollowUpGroupMembership
 from itou.job_applications.models import JobApplication
@@ -57,13 +58,56 @@ def get_year_month_or_none(date=None):
     return date.replace(day=1)
 
 
-def count_related_subquery(model, fk_field, outer_ref_field, extra_filters=None):
+def year_month(expression):
+    """SQL counterpart of `get_year_month_or_none`."""
+    return TruncMonth(expression, output_field=models.DateField())
+
+
+def is_not_null(field):
+    return Case(When(**{f"{field}__isnull": False}, then=Value(True)), default=Value(False))
+
+
+def is_not_blank(field):
+    return Case(When(Q(**{f"{field}__isnull": False}) & ~Q(**{field: ""}), then=Value(True)), default=Value(False))
+
+
+def nir_part(field, start, length):
+    """Digits of the NIR as a number, None for an empty NIR."""
+    return Cast(NullIf(Substr(field, start, length), Value("")), models.PositiveSmallIntegerField())
+
+
+def count_related_subquery(model, fk_field, outer_ref_field, extra_filters=None, manager=None):
     filters = {fk_field: OuterRef(outer_ref_field)}
     if extra_filters:
         filters.update(extra_filters)
+    manager = manager or model.objects
     return Coalesce(
-        model.objects.filter(**filters).values(fk_field).annotate(count=Count(outer_ref_field)).values("count"), 0
+        manager.filter(**filters).values(fk_field).annotate(count=Count(outer_ref_field)).values("count"), 0
+    )
+
+
+def insert_anonymized(model, queryset, fields):
+    """
+    Insert an anonymized `model` row for each object of `queryset` with a single INSERT … SELECT,
+    `fields` maps the `model` fields to expressions on `queryset`.
+
+    Return the number of inserted rows.
+    """
+    # Prefixed to avoid conflicts with the fields of the selected model.
+    expressions = {
+        "insert_id": Func(function="gen_random_uuid", output_field=models.UUIDField()),
+        "insert_anonymized_at": Value(current_year_month(), output_field=models.DateField()),
+        **{f"insert_{name}": expression for name, expression in fields.items()},
+    }
+    select = queryset.order_by().values(**expressions)
+    sql, params = select.query.sql_with_params()
+    columns = ", ".join(
+        connection.ops.quote_name(model._meta.get_field(alias.removeprefix("insert_")).column)
+        for alias in select.query.annotation_select
     )
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) {sql}", params)
+        return cursor.rowcount
 
 
 def inactive_jobseekers_without_recent_related_objects(inactive_since, notified, batch_size=None):
@@ -1,7 +1,7 @@
 """
 Fuzzy match an INSEE City to the city name and postcodes of the AddressMixin.
 
-Pretty fast for 1_000 items iterated one by one: 8s.
+Cities sharing a post code with the items are loaded once and matched in memory.
 
 Very low "miss" rate : 0.51% of the cases (50 000 attempts)
 
@@ -17,7 +17,9 @@ that we can ask the users to fix it.
 from django.core.management.base import CommandError
 from itoutils.django.commands import dry_runnable
 
-from itou.common_apps.address.models import BAN_API_RELIANCE_SCORE, resolve_insee_city
+from itou.cities.models import City
+from itou.cities.utils import CityResolver
+from itou.common_apps.address.models import BAN_API_RELIANCE_SCORE
 from itou.companies.models import Company
 from itou.prescribers.models import PrescriberOrganization
 from itou.users.enums import UserKind
@@ -78,8 +80,16 @@ class Command(BaseCommand):
             # most recently updated geocoding first, then most recent object.
             .order_by("-geocoding_updated_at", "-pk")
         )
-        for item in qs[: self.ITEMS_PER_RUN]:
-            if insee_city := resolve_insee_city(item.city, item.post_code):
+        items = list(qs[: self.ITEMS_PER_RUN])
+        # Only load the cities sharing a post code with the items, and match them in memory.
+        resolver = CityResolver(
+            City.objects.filter(post_codes__overlap=list({item.post_code for item in items})).only(
+                "name", "post_codes", "code_insee"
+            )
+        )
+        for item in items:
+            # 30% of matching trigrams match seemed enough in our tests.
+            if insee_city := resolver.resolve(item.post_code, item.city, threshold=0.3):
                 item.insee_city = insee_city
                 updated_items.append(item)
             else:
@@ -0,0 +1,93 @@
+import re
+from collections import defaultdict
+
+from unidecode import unidecode
+
+from itou.cities.models import City
+
+
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_city_name(name):
+    """Same normalization as `City.normalized_name`: unaccented, lower case, dashes replaced by spaces."""
+    return unidecode(name or "").lower().replace("-", " ")
+
+
+def get_trigrams(text):
+    """Trigrams as computed by pg_trgm: words are padded with two leading spaces and a trailing one."""
+    trigrams = set()
+    for word in WORD_RE.findall(text):
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def trigram_similarity(trigrams, other_trigrams):
+    if not trigrams or not other_trigrams:
+        return 0.0
+    return len(trigrams & other_trigrams) / len(trigrams | other_trigrams)
+
+
+class CityResolver:
+    """
+    Resolve a (post code, city name) pair to a City without querying the database.
+
+    The indexes (post code -> normalized name -> city, and INSEE code -> city) are built once. An exact match on the
+    normalized name is a dict lookup, otherwise the city with the closest name (trigram
+    similarity, like `resolve_insee_city`) wins, the most specific one (fewest post codes)
+    breaking ties. Resolutions are memoised for the lifetime of the resolver.
+    """
+
+    def __init__(self, cities=None):
+        if cities is None:
+            cities = City.objects.only("name", "post_codes", "code_insee")
+        self.cities_by_post_code = defaultdict(dict)
+        self.cities_by_code_insee = {}
+        for city in cities:
+            self.cities_by_code_insee[city.code_insee] = city
+            normalized_name = normalize_city_name(city.name)
+            for post_code in city.post_codes:
+                self.cities_by_post_code[post_code].setdefault(normalized_name, city)
+        self._trigrams = {}
+        self._resolutions = {}
+
+    def _get_trigrams(self, normalized_name):
+        try:
+            return self._trigrams[normalized_name]
+        except KeyError:
+            trigrams = self._trigrams[normalized_name] = get_trigrams(normalized_name)
+            return trigrams
+
+    def _best_match(self, candidates, city_name):
+        normalized_name = normalize_city_name(city_name)
+        if city := candidates.get(normalized_name):
+            return city, 1.0
+        trigrams = self._get_trigrams(normalized_name)
+        similarity, _, city = max(
+            (
+                (trigram_similarity(trigrams, self._get_trigrams(name)), -len(city.post_codes), city)
+                for name, city in candidates.items()
+            ),
+            key=lambda match: match[:2],
+        )
+        return city, similarity
+
+    def resolve(self, post_code, city_name, *, threshold=None):
+        """
+        Without a threshold, a city is always returned when the post code is known.
+        Otherwise, a fuzzy match must have a similarity strictly greater than the threshold.
+        """
+        candidates = self.cities_by_post_code.get(post_code)
+        if not candidates:
+            return None
+        if threshold is None and len(candidates) == 1:
+            return next(iter(candidates.values()))
+        key = (post_code, city_name)
+        try:
+            city, similarity = self._resolutions[key]
+        except KeyError:
+            city, similarity = self._resolutions[key] = self._best_match(candidates, city_name)
+        if threshold is not None and similarity <= threshold:
+            return None
+        return city
@@ -0,0 +1,34 @@
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Bulk updates of memberships don't always invalidate the contexts, keep them short-lived.
+MEMBERSHIP_CONTEXT_TIMEOUT = 10 * 60
+
+
+def _membership_context_key(user_id):
+    return f"membership-context-{user_id}"
+
+
+def get_membership_context(user):
+    """
+    Return the active memberships of the user cached by the ItouCurrentOrganizationMiddleware,
+    None when they have to be retrieved from the database.
+    """
+    return caches["failsafe"].get(_membership_context_key(user.pk))
+
+
+def set_membership_context(user, context):
+    caches["failsafe"].set(_membership_context_key(user.pk), context, MEMBERSHIP_CONTEXT_TIMEOUT)
+
+
+def invalidate_user_membership_context(*user_ids):
+    keys = [_membership_context_key(user_id) for user_id in user_ids]
+    caches["failsafe"].delete_many(keys)
+    # A concurrent request may cache the memberships before the transaction is committed.
+    transaction.on_commit(lambda: caches["failsafe"].delete_many(keys))
+
+
+def invalidate_user_membership_context_on_login(sender, request, user, **kwargs):
+    # Logging in again always retrieves the memberships from the database.
+    invalidate_user_membership_context(user.pk)
@@ -8,6 +8,7 @@ from django.db.models import Prefetch, Q
 from django.forms import ValidationError
 from django.utils import timezone
 
+from itou.common_apps.organizations.cache import invalidate_user_membership_context
 from itou.users.enums import UserKind
 from itou.utils.emails import get_email_message
 
@@ -363,4 +364,11 @@ class MembershipAbstract(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        return super().save(*args, **kwargs)
+        result = super().save(*args, **kwargs)
+        invalidate_user_membership_context(self.user_id)
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_user_membership_context(self.user_id)
+        return result
@@ -1,3 +1,6 @@
+from django.contrib.contenttypes.models import ContentType
+
+from itou.communications.models import DisabledNotification
 from itou.companies.models import Company
 
 
@@ -5,6 +8,8 @@ class BaseNotification:
     REQUIRED = ["can_be_disabled", "name", "category"]
 
     can_be_disabled = True
+    # Whether the user disabled the notification, when loaded by a NotificationBatch
+    disabled_by_user = None
 
     def __init__(self, user, structure=None, forward_from_user=None, /, **kwargs):
         self.user = user
@@ -27,6 +32,8 @@ class BaseNotification:
         if not self.is_applicable():
             return False
         if self.is_manageable_by_user():
+            if self.disabled_by_user is not None:
+                return not self.disabled_by_user
             return not (
                 self.user.notification_settings.for_structure(self.structure)
                 .filter(disabled_notifications__notification_class=self.__class__.__name__)
@@ -44,3 +51,54 @@ class BaseNotification:
 
     def validate_context(self):
         return self.context
+
+
+def _settings_key(user, structure, notification_class):
+    if structure is None:
+        return (user.pk, None, None, notification_class.__name__)
+    return (user.pk, ContentType.objects.get_for_model(structure).pk, structure.pk, notification_class.__name__)
+
+
+class NotificationBatch:
+    """
+    Notifications sent to many users, loading the notification settings
+    of every recipient with a single query instead of one per notification.
+    """
+
+    def __init__(self, notifications):
+        self.notifications = list(notifications)
+
+    def __iter__(self):
+        return iter(self.notifications)
+
+    def load_disabled_notifications(self):
+        notifications = [
+            notification
+            for notification in self.notifications
+            if notification.disabled_by_user is None
+            and notification.user.is_active
+            and notification.is_manageable_by_user()
+        ]
+        if not notifications:
+            return
+        disabled = set(
+            DisabledNotification.objects.filter(
+                settings__user__in={notification.user.pk for notification in notifications},
+                notification_record__notification_class__in={
+                    notification.__class__.__name__ for notification in notifications
+                },
+            ).values_list(
+                "settings__user_id",
+                "settings__structure_type_id",
+                "settings__structure_pk",
+                "notification_record__notification_class",
+            )
+        )
+        for notification in notifications:
+            notification.disabled_by_user = (
+                _settings_key(notification.user, notification.structure, notification.__class__) in disabled
+            )
+
+    def to_send(self):
+        self.load_disabled_notifications()
+        return [notification for notification in self.notifications if notification.should_send()]
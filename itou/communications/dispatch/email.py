@@ -1,9 +1,10 @@
 import logging
+from collections import defaultdict
 
-from itou.communications.dispatch.base import BaseNotification
+from itou.communications.dispatch.base import BaseNotification, NotificationBatch
 from itou.companies.models import Company, CompanyMembership
 from itou.prescribers.models import PrescriberMembership, PrescriberOrganization
-from itou.utils.emails import get_email_message
+from itou.utils.emails import get_email_message, send_email_messages
 
 
 logger = logging.getLogger(__name__)
@@ -24,15 +25,18 @@ class EmailNotification(BaseNotification):
     def get_build_extra(self):
         return {}
 
-    def send(self):
-        if (
+    def must_check_membership(self):
+        return (
             # If it is already a forwarded notification, do not check if the user is still a member of the organization
             not self.forward_from_user
             # Don't use should_send() if the user left the org because we don't want to use his settings
             and self.is_applicable()
             and isinstance(self.structure, PrescriberOrganization | Company)  # no fallback for institutions for now
             and self.user.is_professional
-        ):
+        )
+
+    def send(self):
+        if self.must_check_membership():
             if isinstance(self.structure, PrescriberOrganization):
                 memberships = PrescriberMembership.objects.filter(organization=self.structure).select_related("user")
             elif isinstance(self.structure, Company):
@@ -45,3 +49,44 @@ class EmailNotification(BaseNotification):
                     self.__class__(admin, self.structure, self.user, **self.context).send()
         if self.should_send():
             self.build().send()
+
+    @staticmethod
+    def send_many(notifications):
+        """
+        Send the notifications with a constant number of queries: the memberships of
+        the structures and the notification settings of the recipients are loaded at once,
+        and the emails are handed to the email backend in a single call.
+        """
+        notifications = list(notifications)
+        to_check = [notification for notification in notifications if notification.must_check_membership()]
+        organization_pks = {n.structure.pk for n in to_check if isinstance(n.structure, PrescriberOrganization)}
+        company_pks = {n.structure.pk for n in to_check if isinstance(n.structure, Company)}
+        memberships = defaultdict(list)
+        if organization_pks:
+            for membership in PrescriberMembership.objects.filter(organization__in=organization_pks).select_related(
+                "user"
+            ):
+                memberships[PrescriberOrganization, membership.organization_id].append(membership)
+        if company_pks:
+            for membership in CompanyMembership.objects.filter(company__in=company_pks).select_related("user"):
+                memberships[Company, membership.company_id].append(membership)
+
+        forwarded_notifications = []
+        for notification in to_check:
+            structure_model = (
+                PrescriberOrganization if isinstance(notification.structure, PrescriberOrganization) else Company
+            )
+            structure_memberships = memberships[structure_model, notification.structure.pk]
+            if notification.user not in [m.user for m in structure_memberships]:
+                admins = [m.user for m in structure_memberships if m.is_admin]
+                logger.info("Send email copy to admin, admin_count=%d", len(admins))
+                for admin in admins:
+                    forwarded_notifications.append(
+                        notification.__class__(
+                            admin, notification.structure, notification.user, **notification.context
+                        )
+                    )
+
+        batch = NotificationBatch(notifications + forwarded_notifications)
+        if email_messages := [notification.build() for notification in batch.to_send()]:
+            send_email_messages(email_messages)
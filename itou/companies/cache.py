@@ -0,0 +1,35 @@
+import hashlib
+import json
+
+from django.core.cache import caches
+from django.db import transaction
+
+from itou.utils.cache import bump_cache_version, get_cache_version
+
+
+SEARCH_RESULTS_VERSION_KEY = "search-results-version"
+# Bulk updates of companies and job descriptions don't invalidate the search results,
+# keep them short-lived so that those updates quickly show up.
+SEARCH_RESULTS_TIMEOUT = 5 * 60
+
+
+def invalidate_search_results_cache():
+    bump_cache_version(SEARCH_RESULTS_VERSION_KEY)
+    # A concurrent search may cache the results before the transaction is committed.
+    transaction.on_commit(lambda: bump_cache_version(SEARCH_RESULTS_VERSION_KEY))
+
+
+def get_or_set_search_results(name, params, compute):
+    """
+    Return the search results identified by `name` and `params` (a JSON serializable dict),
+    calling `compute` to build them when they are not cached yet.
+    """
+    cache = caches["failsafe"]
+    version = get_cache_version(SEARCH_RESULTS_VERSION_KEY)
+    params_hash = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    cache_key = f"search-results-{version}-{name}-{params_hash}"
+    results = cache.get(cache_key)
+    if results is None:
+        results = compute()
+        cache.set(cache_key, results, SEARCH_RESULTS_TIMEOUT)
+    return results
@@ -16,7 +16,7 @@ from django.utils import timezone
 from itou.common_apps.address.models import AddressMixin
 from itou.companies.enums import POLE_EMPLOI_SIRET, CompanySource
 from itou.companies.models import Company
-from itou.metabase.tables.utils import hash_content
+from itou.metabase.tables.utils import hash_contents
 from itou.utils.apis.exceptions import GeocodingDataError
 from itou.utils.apis.geocoding import get_geocoding_data
 
@@ -240,9 +240,9 @@ def anonymize_fluxiae_df(df):
         df["salarie_annee_naissance"] = df.salarie_date_naissance.str[-4:].astype(int)
 
     if "salarie_agrement" in df.columns.tolist():
-        df["hash_numéro_pass_iae"] = df["salarie_agrement"].apply(lambda v: hash_content(None if pd.isna(v) else v))
+        df["hash_numéro_pass_iae"] = hash_contents(None if pd.isna(v) else v for v in df["salarie_agrement"])
     if "salarie_nir" in df.columns.tolist():
-        df["hash_nir"] = df["salarie_nir"].apply(lambda v: hash_content(None if pd.isna(v) else v))
+        df["hash_nir"] = hash_contents(None if pd.isna(v) else v for v in df["salarie_nir"])
 
     # Any column having any of these keywords inside its name will be dropped.
     # E.g. if `courriel` is a deletable keyword, then columns named `referent_courriel`,
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.db.models import Prefetch
 from django.utils import timezone
 
+from itou.companies.cache import invalidate_search_results_cache
 from itou.companies.models import CompanyMembership, JobDescription
 from itou.companies.notifications import OldJobDescriptionDeactivationNotification
 from itou.utils.command import BaseCommand
@@ -29,6 +30,7 @@ class Command(BaseCommand):
         deactivated_nb = JobDescription.objects.filter(
             pk__in=[old_job_desc.pk for old_job_desc in old_job_descriptions]
         ).update(is_active=False)
+        invalidate_search_results_cache()
         for old_job_description in old_job_descriptions:
             # Only send to active members (the default manager checks both the user and membership is_active statuses)
             for membership in old_job_description.company.memberships.all():
@@ -0,0 +1,56 @@
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from itoutils.django.commands import dry_runnable
+
+from itou.companies import models
+from itou.utils.command import BaseCommand
+
+
+class Command(BaseCommand):
+    help = """Detect and fix the drift of the companies search statistics maintained by triggers"""
+
+    ATOMIC_HANDLE = True
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wet-run", dest="wet_run", action="store_true")
+
+    @dry_runnable
+    def handle(self, **options):
+        count_active_job_descriptions = Subquery(
+            models.JobDescription.unfiltered_objects.filter(is_active=True, company=OuterRef("pk"))
+            .values("company")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        expected_stats = {
+            company_id: stats
+            for company_id, *stats in models.Company.unfiltered_objects.annotate(
+                expected_count_active_job_descriptions=Coalesce(count_active_job_descriptions, 0),
+                expected_has_active_members=Exists(models.CompanyMembership.objects.filter(company=OuterRef("pk"))),
+            ).values_list("pk", "expected_count_active_job_descriptions", "expected_has_active_members")
+        }
+        current_stats = {
+            company_id: stats
+            for company_id, *stats in models.CompanySearchStats.objects.values_list(
+                "company_id", "count_active_job_descriptions", "has_active_members"
+            )
+        }
+
+        # A missing row is read as no active job description and no active member.
+        drifted_company_ids = sorted(
+            company_id
+            for company_id, stats in expected_stats.items()
+            if current_stats.get(company_id, [0, False]) != stats
+        )
+        orphan_company_ids = sorted(current_stats.keys() - expected_stats.keys())
+
+        if drifted_company_ids:
+            with connection.cursor() as cursor:
+                cursor.execute(models.refresh_company_search_stats_sql("company.id = ANY(%s)"), [drifted_company_ids])
+        models.CompanySearchStats.objects.filter(company_id__in=orphan_company_ids).delete()
+        self.logger.info(
+            "Fixed search statistics of %d companies, removed %d orphans",
+            len(drifted_company_ids),
+            len(orphan_company_ids),
+        )
@@ -3,10 +3,11 @@ import time
 
 from itoutils.django.commands import dry_runnable
 
-from itou.cities.models import City
+from itou.cities.utils import CityResolver
+from itou.companies.cache import invalidate_search_results_cache
 from itou.companies.enums import POLE_EMPLOI_SIRET, ContractType, JobSource, JobSourceTag
 from itou.companies.models import Company, JobDescription
-from itou.jobs.models import Appellation
+from itou.jobs.utils import AppellationResolver
 from itou.utils.apis import pe_api_enums
 from itou.utils.apis.pole_emploi import pole_emploi_partenaire_api_client
 from itou.utils.command import BaseCommand
@@ -42,16 +43,23 @@ class NoZipCodeException(Exception):
     pass
 
 
-def pe_offer_to_job_description(data, logger):
+def pe_offer_to_job_description(data, logger, *, appellations=None, cities=None):
+    """
+    `appellations` and `cities` resolvers should be shared by the offers of a sync,
+    they are built for this offer only otherwise.
+    """
+    if appellations is None:
+        appellations = AppellationResolver()
+    if cities is None:
+        cities = CityResolver()
+
     source_id = data["id"]
     rome_code = data["romeCode"]
     appellation_label = data["appellationlibelle"]
-    appellation = Appellation.objects.filter(name=appellation_label, rome__code=rome_code).first()
+    appellation = appellations.resolve(rome_code, appellation_label)
     if appellation is None:
-        appellation = Appellation.objects.autocomplete(search_string=appellation_label, rome_code=rome_code).first()
-        if appellation is None:
-            logger.warning(f"no appellation match found ({rome_code=} {appellation_label=}) skipping {source_id=}")
-            return None
+        logger.warning(f"no appellation match found ({rome_code=} {appellation_label=}) skipping {source_id=}")
+        return None
 
     if "codePostal" not in data["lieuTravail"]:
         logger.warning(f"no zipcode in raw offer, skipping {source_id=}")
@@ -62,15 +70,13 @@ def pe_offer_to_job_description(data, logger):
         logger.warning(f"no job URL in raw offer, skipping {source_id=}")
         return None
 
-    try:
-        city = City.objects.get(code_insee=data["lieuTravail"]["commune"])
-    except City.DoesNotExist:
-        try:
-            # It may be the INSEE code of a "commune déléguée", which
-            # we do not store in City. Try the postal code as a
-            # fallback.
-            city = City.objects.get(post_codes__contains=[data["lieuTravail"]["codePostal"]])
-        except City.DoesNotExist:
+    city = cities.cities_by_code_insee.get(data["lieuTravail"]["commune"])
+    if city is None:
+        # It may be the INSEE code of a "commune déléguée", which
+        # we do not store in City. Try the postal code as a
+        # fallback, the label tells apart the cities sharing it.
+        city = cities.resolve(data["lieuTravail"]["codePostal"], data["lieuTravail"].get("libelle", ""))
+        if city is None:
             logger.error(
                 "Could not find city with insee_code=%s or postal_code=%s",
                 data["lieuTravail"]["commune"],
@@ -155,6 +161,8 @@ class Command(BaseCommand):
 
         # Start DB queries
         pe_siae = Company.unfiltered_objects.get(siret=POLE_EMPLOI_SIRET)
+        appellations = AppellationResolver()
+        cities = CityResolver()
         # get the weakest possible lock on these rows, as we don't want to block the entire system
         # but still avoid creating concurrent rows in the same time while we inspect their keys
         pe_offers = JobDescription.objects.filter(source_kind=JobSource.PE_API).select_for_update(
@@ -162,7 +170,7 @@ class Command(BaseCommand):
         )
         for item in yield_sync_diff(raw_offers, "id", pe_offers, "source_id", []):
             if item.kind in [DiffItemKind.ADDITION, DiffItemKind.EDITION]:
-                job = pe_offer_to_job_description(item.raw, self.logger)
+                job = pe_offer_to_job_description(item.raw, self.logger, appellations=appellations, cities=cities)
                 if job:
                     job.company = pe_siae
                     if item.kind == DiffItemKind.ADDITION:
@@ -200,3 +208,4 @@ class Command(BaseCommand):
             source_kind=JobSource.PE_API, source_id__in=offers_to_remove
         ).delete()
         self.logger.info("successfully deleted count=%d PE job offers", n_objs)
+        invalidate_search_results_cache()
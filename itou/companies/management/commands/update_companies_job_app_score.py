@@ -2,6 +2,7 @@ from django.db.models import F, Q
 from itoutils.django.commands import dry_runnable
 
 from itou.companies import models
+from itou.companies.cache import invalidate_search_results_cache
 from itou.utils.command import BaseCommand
 
 
@@ -20,4 +21,5 @@ class Command(BaseCommand):
             .exclude(Q(job_app_score=F("computed_job_app_score")))
             .update(job_app_score=F("computed_job_app_score"))
         )
+        invalidate_search_results_cache()
         self.logger.info("Updated %d companies", nb_updated)
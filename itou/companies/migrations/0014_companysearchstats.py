@@ -0,0 +1,93 @@
+# Generated by Django 6.0.8 on 2026-10-17 04:03
+
+import django.db.models.deletion
+import pgtrigger.compiler
+import pgtrigger.migrations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("companies", "0013_siaeconvention_convention_siret_signature_regex"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompanySearchStats",
+            fields=[
+                (
+                    "company",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_stats",
+                        serialize=False,
+                        to="companies.company",
+                    ),
+                ),
+                (
+                    "count_active_job_descriptions",
+                    models.PositiveIntegerField(default=0, verbose_name="nombre de fiches de poste actives"),
+                ),
+                ("has_active_members", models.BooleanField(default=False, verbose_name="a des membres actifs")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="date de modification")),
+            ],
+            options={
+                "verbose_name": "statistiques de recherche d'une entreprise",
+                "verbose_name_plural": "statistiques de recherche des entreprises",
+            },
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="companymembership",
+            trigger=pgtrigger.compiler.Trigger(
+                name="membership_search_stats",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n                    IF (TG_OP <> 'INSERT') THEN\n                        \n        INSERT INTO companies_companysearchstats (\n            company_id, count_active_job_descriptions, has_active_members, updated_at\n        )\n        SELECT\n            company.id,\n            (\n                SELECT COUNT(*) FROM companies_jobdescription\n                WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active\n            ),\n            EXISTS(\n                SELECT FROM companies_companymembership\n                INNER JOIN users_user ON users_user.id = companies_companymembership.user_id\n                WHERE companies_companymembership.company_id = company.id\n                AND companies_companymembership.is_active\n                AND users_user.is_active\n            ),\n            NOW()\n        FROM companies_company company\n        WHERE company.id = OLD.company_id\n        ON CONFLICT (company_id) DO UPDATE SET\n            count_active_job_descriptions = EXCLUDED.count_active_job_descriptions,\n            has_active_members = EXCLUDED.has_active_members,\n            updated_at = EXCLUDED.updated_at;\n    \n                    END IF;\n                    IF (TG_OP <> 'DELETE') THEN\n                        \n        INSERT INTO companies_companysearchstats (\n            company_id, count_active_job_descriptions, has_active_members, updated_at\n        )\n        SELECT\n            company.id,\n            (\n                SELECT COUNT(*) FROM companies_jobdescription\n                WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active\n            ),\n            EXISTS(\n                SELECT FROM companies_companymembership\n                INNER JOIN users_user ON users_user.id = companies_companymembership.user_id\n                WHERE companies_companymembership.company_id = company.id\n                AND companies_companymembership.is_active\n                AND users_user.is_active\n            ),\n            NOW()\n        FROM companies_company company\n        WHERE company.id = NEW.company_id\n        ON CONFLICT (company_id) DO UPDATE SET\n            count_active_job_descriptions = EXCLUDED.count_active_job_descriptions,\n            has_active_members = EXCLUDED.has_active_members,\n            updated_at = EXCLUDED.updated_at;\n    \n                    END IF;\n                    RETURN NULL;\n                ",  # noqa: E501
+                    hash="5af5a99f58bfec32967b57260ef7110fc57679e0",
+                    operation='INSERT OR UPDATE OF "is_active", "company_id" OR DELETE',
+                    pgid="pgtrigger_membership_search_stats_6b643",
+                    table="companies_companymembership",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="jobdescription",
+            trigger=pgtrigger.compiler.Trigger(
+                name="job_description_search_stats",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n                    IF (TG_OP <> 'INSERT') THEN\n                        \n        INSERT INTO companies_companysearchstats (\n            company_id, count_active_job_descriptions, has_active_members, updated_at\n        )\n        SELECT\n            company.id,\n            (\n                SELECT COUNT(*) FROM companies_jobdescription\n                WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active\n            ),\n            EXISTS(\n                SELECT FROM companies_companymembership\n                INNER JOIN users_user ON users_user.id = companies_companymembership.user_id\n                WHERE companies_companymembership.company_id = company.id\n                AND companies_companymembership.is_active\n                AND users_user.is_active\n            ),\n            NOW()\n        FROM companies_company company\n        WHERE company.id = OLD.company_id\n        ON CONFLICT (company_id) DO UPDATE SET\n            count_active_job_descriptions = EXCLUDED.count_active_job_descriptions,\n            has_active_members = EXCLUDED.has_active_members,\n            updated_at = EXCLUDED.updated_at;\n    \n                    END IF;\n                    IF (TG_OP <> 'DELETE') THEN\n                        \n        INSERT INTO companies_companysearchstats (\n            company_id, count_active_job_descriptions, has_active_members, updated_at\n        )\n        SELECT\n            company.id,\n            (\n                SELECT COUNT(*) FROM companies_jobdescription\n                WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active\n            ),\n            EXISTS(\n                SELECT FROM companies_companymembership\n                INNER JOIN users_user ON users_user.id = companies_companymembership.user_id\n                WHERE companies_companymembership.company_id = company.id\n                AND companies_companymembership.is_active\n                AND users_user.is_active\n            ),\n            NOW()\n        FROM companies_company company\n        WHERE company.id = NEW.company_id\n        ON CONFLICT (company_id) DO UPDATE SET\n            count_active_job_descriptions = EXCLUDED.count_active_job_descriptions,\n            has_active_members = EXCLUDED.has_active_members,\n            updated_at = EXCLUDED.updated_at;\n    \n                    END IF;\n                    RETURN NULL;\n                ",  # noqa: E501
+                    hash="6b25980061d53bfe7981df016d606ca11fa3e1d3",
+                    operation='INSERT OR UPDATE OF "is_active", "company_id" OR DELETE',
+                    pgid="pgtrigger_job_description_search_stats_18dae",
+                    table="companies_jobdescription",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO companies_companysearchstats (
+                company_id, count_active_job_descriptions, has_active_members, updated_at
+            )
+            SELECT
+                company.id,
+                (
+                    SELECT COUNT(*) FROM companies_jobdescription
+                    WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active
+                ),
+                EXISTS(
+                    SELECT FROM companies_companymembership
+                    INNER JOIN users_user ON users_user.id = companies_companymembership.user_id
+                    WHERE companies_companymembership.company_id = company.id
+                    AND companies_companymembership.is_active
+                    AND users_user.is_active
+                ),
+                NOW()
+            FROM companies_company company
+            """,
+            migrations.RunSQL.noop,
+            elidable=True,
+        ),
+    ]
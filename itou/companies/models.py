@@ -1,6 +1,7 @@
 import sys
 from datetime import timedelta
 
+import pgtrigger
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.gis.measure import D
@@ -22,6 +23,7 @@ from itou.common_apps.organizations.models import (
     OrganizationKind,
     OrganizationQuerySet,
 )
+from itou.companies.cache import invalidate_search_results_cache
 from itou.companies.enums import (
     COMPANY_KIND_RESERVED,
     POLE_EMPLOI_SIRET,
@@ -151,7 +153,11 @@ class CompanyQuerySet(OrganizationQuerySet):
         A company is considered hiring if it is not blocking job applications and has at least
         one active job description or accepts spontaneous job applications.
         """
-        return self.with_count_active_job_descriptions().annotate(
+        return self.with_count_active_job_descriptions()._annotate_is_hiring()
+
+    def _annotate_is_hiring(self):
+        # Expects a `count_active_job_descriptions` annotation.
+        return self.annotate(
             is_hiring=Case(
                 When(
                     Q(block_job_applications=False)
@@ -218,6 +224,17 @@ class CompanyQuerySet(OrganizationQuerySet):
         # See `self.with_count_recent_received_job_apps`.
         return self.annotate(has_active_members=Exists(CompanyMembership.objects.filter(company=OuterRef("pk"))))
 
+    def with_search_stats(self):
+        """
+        Same annotations as `with_is_hiring()` and `with_has_active_members()` but read from
+        `CompanySearchStats` instead of being computed for each company.
+        """
+        return (
+            self.annotate(count_active_job_descriptions=Coalesce("search_stats__count_active_job_descriptions", 0))
+            ._annotate_is_hiring()
+            .annotate(has_active_members=Coalesce("search_stats__has_active_members", False))
+        )
+
 
 class CompanyManager(models.Manager.from_queryset(CompanyQuerySet)):
     use_in_migrations = True
@@ -377,6 +394,15 @@ class Company(AddressMixin, OrganizationAbstract, AbstractFieldsHistoryModel):
             ("import_aci_convergence_phc", "Import ACI Convergence / PHC SIRETs"),
         ]
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_search_results_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_search_results_cache()
+        return result
+
     @property
     def accept_survey_url(self):
         """
@@ -674,6 +700,75 @@ class Company(AddressMixin, OrganizationAbstract, AbstractFieldsHistoryModel):
         return None  # This cannot happen since all the kinds are handled above
 
 
+def refresh_company_search_stats_sql(company_filter):
+    """
+    SQL upserting the `CompanySearchStats` of the companies matching `company_filter`,
+    a condition on the `company` alias, to be used in triggers.
+
+    Statistics are recomputed instead of being incremented: it is cheap for a handful
+    of companies and leaves no room for accumulated errors.
+    """
+    return f"""
+        INSERT INTO companies_companysearchstats (
+            company_id, count_active_job_descriptions, has_active_members, updated_at
+        )
+        SELECT
+            company.id,
+            (
+                SELECT COUNT(*) FROM companies_jobdescription
+                WHERE companies_jobdescription.company_id = company.id AND companies_jobdescription.is_active
+            ),
+            EXISTS(
+                SELECT FROM companies_companymembership
+                INNER JOIN users_user ON users_user.id = companies_companymembership.user_id
+                WHERE companies_companymembership.company_id = company.id
+                AND companies_companymembership.is_active
+                AND users_user.is_active
+            ),
+            NOW()
+        FROM companies_company company
+        WHERE {company_filter}
+        ON CONFLICT (company_id) DO UPDATE SET
+            count_active_job_descriptions = EXCLUDED.count_active_job_descriptions,
+            has_active_members = EXCLUDED.has_active_members,
+            updated_at = EXCLUDED.updated_at;
+    """
+
+
+class CompanySearchStats(models.Model):
+    """
+    Statistics used to sort the employer search results, denormalized to avoid computing
+    them for every company on each search.
+
+    Kept up to date by triggers on job descriptions and memberships (users are deactivated
+    along with their memberships). Companies without statistics have neither active job
+    descriptions nor active members. Drift is detected (and fixed) by the
+    `reconcile_company_search_stats` command.
+    """
+
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        # The job descriptions deleted along with a company refresh its statistics, possibly after
+        # they were deleted: don't fail on the orphan, it is removed by the reconciliation.
+        db_constraint=False,
+        primary_key=True,
+        related_name="search_stats",
+    )
+    count_active_job_descriptions = models.PositiveIntegerField(
+        verbose_name="nombre de fiches de poste actives", default=0
+    )
+    has_active_members = models.BooleanField(verbose_name="a des membres actifs", default=False)
+    updated_at = models.DateTimeField(verbose_name="date de modification", auto_now=True)
+
+    class Meta:
+        verbose_name = "statistiques de recherche d'une entreprise"
+        verbose_name_plural = "statistiques de recherche des entreprises"
+
+    def __str__(self):
+        return f"{self.company_id}"
+
+
 class CompanyMembership(MembershipAbstract):
     """Intermediary model between `User` and `Company`."""
 
@@ -690,6 +785,22 @@ class CompanyMembership(MembershipAbstract):
         constraints = [
             models.UniqueConstraint(fields=["user", "company"], name="user_company_unique"),
         ]
+        triggers = [
+            pgtrigger.Trigger(
+                name="membership_search_stats",
+                when=pgtrigger.After,
+                operation=pgtrigger.Insert | pgtrigger.UpdateOf("is_active", "company_id") | pgtrigger.Delete,
+                func=f"""
+                    IF (TG_OP <> 'INSERT') THEN
+                        {refresh_company_search_stats_sql("company.id = OLD.company_id")}
+                    END IF;
+                    IF (TG_OP <> 'DELETE') THEN
+                        {refresh_company_search_stats_sql("company.id = NEW.company_id")}
+                    END IF;
+                    RETURN NULL;
+                """,
+            ),
+        ]
 
     def get_organization(self):
         return self.company
@@ -855,6 +966,22 @@ class JobDescription(models.Model):
                 name="source_id_kind_unique_without_null_values",
             ),
         ]
+        triggers = [
+            pgtrigger.Trigger(
+                name="job_description_search_stats",
+                when=pgtrigger.After,
+                operation=pgtrigger.Insert | pgtrigger.UpdateOf("is_active", "company_id") | pgtrigger.Delete,
+                func=f"""
+                    IF (TG_OP <> 'INSERT') THEN
+                        {refresh_company_search_stats_sql("company.id = OLD.company_id")}
+                    END IF;
+                    IF (TG_OP <> 'DELETE') THEN
+                        {refresh_company_search_stats_sql("company.id = NEW.company_id")}
+                    END IF;
+                    RETURN NULL;
+                """,
+            ),
+        ]
 
     def __str__(self):
         return self.display_name
@@ -889,6 +1016,12 @@ class JobDescription(models.Model):
             if "update_fields" in kwargs:
                 kwargs["update_fields"].append("field_history")
         super().save(*args, **kwargs)
+        invalidate_search_results_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_search_results_cache()
+        return result
 
     @property
     def display_name(self):
@@ -5,6 +5,7 @@ from django.utils import timezone
 from psycopg.errors import UniqueViolation
 
 from itou.approvals import models as approvals_models
+from itou.common_apps.organizations.cache import invalidate_user_membership_context
 from itou.companies import enums, models
 from itou.companies.enums import CompanySource
 from itou.eligibility import models as eligibility_models
@@ -274,6 +275,8 @@ def transfer_company_data(
             job_applications_blocked_at=timezone.now(),
             is_searchable=False,
         )
-        models.CompanyMembership.objects.filter(company=from_company).update(is_active=False)
+        memberships = models.CompanyMembership.objects.filter(company=from_company)
+        invalidate_user_membership_context(*memberships.values_list("user_id", flat=True))
+        memberships.update(is_active=False)
         reporter.add(ReportSection.COMPANY_DEACTIVATION, _format_model(from_company))
     return reporter
@@ -1,4 +1,6 @@
+import contextlib
 import logging
+import threading
 from itertools import batched
 
 import sentry_sdk
@@ -65,6 +67,57 @@ _NB_RETRIES = int(
 )
 
 
+# Number of emails sent by a task over a single ESP connection, limits the duration of a task
+_EMAILS_PER_TASK = 100
+
+
+def _send_email(email, connection):
+    """
+    Send the email over the opened ESP connection, record the ESP response on
+    the (unsaved) email and return whether the email was accepted.
+    """
+    message = EmailMessage(
+        from_email=email.from_email,
+        reply_to=email.reply_to,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        subject=email.subject,
+        body=email.body_text,
+    )
+    try:
+        connection.send_messages([message])
+    except AnymailError as e:
+        if e.response is not None:
+            try:
+                email.esp_response = e.response.json()
+            except InvalidJSONError:
+                logger.exception(
+                    "Received invalid response from Mailjet, email_id=%d. Payload: %s",
+                    email.pk,
+                    e.response.text,
+                )
+        else:
+            logger.exception("Could not reach Email Service Provider.")
+        success = False
+    else:
+        try:
+            email.esp_response = message.anymail_status.esp_response.json()
+        except AttributeError:
+            # anymail_status is None in development and default test environments.
+            if settings.ASYNC_EMAIL_BACKEND in [
+                "django.core.mail.backends.console.EmailBackend",
+                "django.core.mail.backends.locmem.EmailBackend",
+            ]:
+                success = True
+            else:
+                raise
+        else:
+            [result] = email.esp_response["Messages"]
+            success = result["Status"] == "success"
+    return success
+
+
 @on_commit_task(retries=_NB_RETRIES, retry_delay=settings.SEND_EMAIL_DELAY_BETWEEN_RETRIES_IN_SECONDS, context=True)
 def _async_send_message(email_id, *, task=None):
     with transaction.atomic():
@@ -74,46 +127,8 @@ def _async_send_message(email_id, *, task=None):
             # Email deleted from django admin, stop trying to send it.
             logger.warning("Not sending email_id=%d, it does not exist in the database.", email_id)
             return
-        message = EmailMessage(
-            from_email=email.from_email,
-            reply_to=email.reply_to,
-            to=email.to,
-            cc=email.cc,
-            bcc=email.bcc,
-            subject=email.subject,
-            body=email.body_text,
-        )
-        try:
-            with get_connection(backend=settings.ASYNC_EMAIL_BACKEND) as connection:
-                connection.send_messages([message])
-        except AnymailError as e:
-            if e.response is not None:
-                try:
-                    email.esp_response = e.response.json()
-                except InvalidJSONError:
-                    logger.exception(
-                        "Received invalid response from Mailjet, email_id=%d. Payload: %s",
-                        email_id,
-                        e.response.text,
-                    )
-            else:
-                logger.exception("Could not reach Email Service Provider.")
-            success = False
-        else:
-            try:
-                email.esp_response = message.anymail_status.esp_response.json()
-            except AttributeError:
-                # anymail_status is None in development and default test environments.
-                if settings.ASYNC_EMAIL_BACKEND in [
-                    "django.core.mail.backends.console.EmailBackend",
-                    "django.core.mail.backends.locmem.EmailBackend",
-                ]:
-                    success = True
-                else:
-                    raise
-            else:
-                [result] = email.esp_response["Messages"]
-                success = result["Status"] == "success"
+        with get_connection(backend=settings.ASYNC_EMAIL_BACKEND) as connection:
+            success = _send_email(email, connection)
         email.save(update_fields=["esp_response"])
         # Commit the email status to the DB.
     if not success:
@@ -125,6 +140,76 @@ def _async_send_message(email_id, *, task=None):
     return 1
 
 
+@on_commit_task(retries=_NB_RETRIES, retry_delay=settings.SEND_EMAIL_DELAY_BETWEEN_RETRIES_IN_SECONDS)
+def _async_send_messages(email_ids):
+    """
+    Send a batch of emails over a single ESP connection.
+
+    The status of each email is committed as soon as it is sent, the emails already
+    holding an ESP response are skipped when the task is retried.
+    The failed emails are handed over to `_async_send_message`, so that each one
+    of them is retried on its own.
+    """
+    sent = 0
+    with get_connection(backend=settings.ASYNC_EMAIL_BACKEND) as connection:
+        for email_id in email_ids:
+            with transaction.atomic():
+                try:
+                    email = Email.objects.select_for_update(of=("self",), no_key=True).get(pk=email_id)
+                except Email.DoesNotExist:
+                    # Email deleted from django admin, stop trying to send it.
+                    logger.warning("Not sending email_id=%d, it does not exist in the database.", email_id)
+                    continue
+                if email.esp_response is not None:
+                    # Already sent by a previous attempt of the task.
+                    continue
+                try:
+                    success = _send_email(email, connection)
+                except Exception:
+                    logger.exception("Could not send email_id=%d in a batch.", email_id)
+                    success = False
+                else:
+                    email.save(update_fields=["esp_response"])
+                # Commit the email status to the DB.
+            if success:
+                sent += 1
+            else:
+                _async_send_message(email_id)
+    return sent
+
+
+def _enqueue_emails(email_ids):
+    if len(email_ids) == 1:
+        _async_send_message(*email_ids)
+    else:
+        # Send the emails in batches over a single connection, the failed ones are retried separately.
+        for email_ids_batch in batched(email_ids, _EMAILS_PER_TASK):
+            _async_send_messages(list(email_ids_batch))
+
+
+_batched_delivery = threading.local()
+
+
+@contextlib.contextmanager
+def batched_email_delivery():
+    """
+    Hold the emails sent in the block and send them in batches when it exits,
+    instead of sending each email in its own task.
+
+    Meant for the commands notifying many users one at a time.
+    """
+    if getattr(_batched_delivery, "email_ids", None) is not None:
+        # Already held by an outer block.
+        yield
+        return
+    _batched_delivery.email_ids = []
+    try:
+        yield
+    finally:
+        email_ids, _batched_delivery.email_ids = _batched_delivery.email_ids, None
+        _enqueue_emails(email_ids)
+
+
 class AsyncEmailBackend(BaseEmailBackend):
     """Custom async email backend wrapper
 
@@ -144,16 +229,17 @@ class AsyncEmailBackend(BaseEmailBackend):
             return
         if not connection.in_atomic_block:
             raise ProgrammingError("Sending email requires an active database transaction.")
-        emails_count = 0
+        email_ids = []
         for message in email_messages:
             for mjemail in sanitize_mailjet_recipients(message):
-                # Send each email in a separate task, so that Huey retry mecanism only
-                # retries the failed email.
                 email = Email.from_email_message(mjemail)
                 email.save()
                 if not [*mjemail.to, *mjemail.cc, *mjemail.bcc]:
                     logger.error(f"Email {email.pk} has no recipients, ignoring.", stack_info=True)
                     continue
-                emails_count += 1
-                _async_send_message(email.pk)
-        return emails_count
+                email_ids.append(email.pk)
+        if getattr(_batched_delivery, "email_ids", None) is not None:
+            _batched_delivery.email_ids.extend(email_ids)
+        else:
+            _enqueue_emails(email_ids)
+        return len(email_ids)
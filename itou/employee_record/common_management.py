@@ -4,6 +4,7 @@ from itertools import batched
 
 import paramiko
 from django.db import transaction
+from django.utils import timezone
 from rest_framework.parsers import JSONParser
 from rest_framework.renderers import JSONRenderer
 
@@ -105,6 +106,34 @@ class EmployeeRecordTransferCommand(BaseCommand):
     def _parse_feedback_file(self, feedback_file: str, batch: dict, dry_run: bool) -> int:
         raise NotImplementedError()
 
+    def check_movement_type(self, batch: dict, movement_type: str):
+        # UPDATE notifications are sent in specific files and are not mixed
+        # with "standard" employee records (CREATION).
+        for raw_element in batch["lignesTelechargement"]:
+            if raw_element.get("typeMouvement") != movement_type:
+                raise IgnoreFile(f"Received 'typeMouvement' is not {movement_type}")
+
+    def get_batch_elements(self, queryset, batch_filename: str, batch: dict) -> dict:
+        """
+        Fetch the employee records or notifications of a feedback file in one query, by line number.
+        """
+        line_numbers = [raw_element["numLigne"] for raw_element in batch["lignesTelechargement"]]
+        return {
+            element.asp_batch_line_number: element
+            for element in queryset.filter(asp_batch_file=batch_filename, asp_batch_line_number__in=line_numbers)
+        }
+
+    def save_feedback(self, model, elements: list, fields: list[str]):
+        """
+        Save in one query the employee records or notifications whose status was changed
+        by a feedback file, their transitions having been performed with `save=False`.
+        """
+        now = timezone.now()
+        for element in elements:
+            # bulk_update() ignores `auto_now`.
+            element.updated_at = now
+        model.objects.bulk_update(elements, ["status", *fields, "updated_at"])
+
     def download_json_file(self, sftp: paramiko.SFTPClient, dry_run: bool):
         self.logger.info("Starting DOWNLOAD of feedback files")
 
@@ -1,16 +1,23 @@
 import paramiko
 from django.conf import settings
 from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 from rest_framework.parsers import JSONParser
 from sentry_sdk.crons import monitor
 
-from itou.approvals.models import Approval
-from itou.employee_record.common_management import EmployeeRecordTransferCommand, IgnoreFile
+from itou.approvals.models import Approval, Prolongation, Suspension
+from itou.employee_record.common_management import EmployeeRecordTransferCommand
 from itou.employee_record.enums import MovementType, NotificationStatus, Status
 from itou.employee_record.exceptions import SerializationError
 from itou.employee_record.mocks.fake_serializers import TestEmployeeRecordBatchSerializer
-from itou.employee_record.models import EmployeeRecord, EmployeeRecordBatch, EmployeeRecordUpdateNotification
+from itou.employee_record.models import (
+    EmployeeRecord,
+    EmployeeRecordBatch,
+    EmployeeRecordTransition,
+    EmployeeRecordTransitionLog,
+    EmployeeRecordUpdateNotification,
+)
 from itou.employee_record.serializers import EmployeeRecordBatchSerializer
 from itou.job_applications.enums import JobApplicationState
 from itou.utils import asp as asp_utils
@@ -70,20 +77,21 @@ class Command(EmployeeRecordTransferCommand):
         - Update metadata for processed employee records.
         """
         batch_filename = EmployeeRecordBatch.batch_filename_from_feedback(feedback_file)
+        self.check_movement_type(batch, MovementType.CREATION)
+        employee_records = self.get_batch_elements(EmployeeRecord.objects.full_fetch(), batch_filename, batch)
 
-        for idx, raw_employee_record in enumerate(batch["lignesTelechargement"], 1):
-            # UPDATE notifications are sent in specific files and are not mixed
-            # with "standard" employee records (CREATION).
-            if raw_employee_record.get("typeMouvement") != MovementType.CREATION:
-                raise IgnoreFile(f"Received 'typeMouvement' is not {MovementType.CREATION}")
-
+        # Transitions are saved in bulk once the whole file is parsed.
+        updated_employee_records = []
+        transition_logs = []
+        duplicated_employee_records = []
+        for raw_employee_record in batch["lignesTelechargement"]:
             line_number = raw_employee_record["numLigne"]
             processing_code = raw_employee_record["codeTraitement"]
             processing_label = raw_employee_record["libelleTraitement"]
             self.logger.info(f"Record: {line_number=}, {processing_code=}, {processing_label=}")
 
             # Now we must find the matching FS
-            employee_record = EmployeeRecord.objects.full_fetch().find_by_batch(batch_filename, line_number).first()
+            employee_record = employee_records.get(line_number)
             if not employee_record:
                 self.logger.info(
                     f"Skipping, could not get existing employee record: {batch_filename=}, {line_number=}"
@@ -98,43 +106,89 @@ class Command(EmployeeRecordTransferCommand):
                 continue
 
             if processing_code == EmployeeRecord.ASP_PROCESSING_SUCCESS_CODE:  # Processed by ASP
-                if not dry_run:
-                    employee_record.process(code=processing_code, label=processing_label, archive=raw_employee_record)
-                else:
+                if dry_run:
                     self.logger.info(f"DRY-RUN: Accepted {employee_record=}, {processing_code=}, {processing_label=}")
-            else:  # Rejected by ASP
-                if not dry_run:
-                    # One special case added for support concerns:
-                    # 3436 processing code are automatically converted as PROCESSED
-                    if processing_code == EmployeeRecord.ASP_DUPLICATE_ERROR_CODE:
-                        employee_record.process(
-                            code=processing_code,
-                            label=processing_label,
-                            archive=raw_employee_record,
-                            as_duplicate=True,
-                        )
-
-                        # If the ASP mark the employee record as duplicate,
-                        # and there is a suspension or a prolongation for the associated approval,
-                        # then we create a notification to be sure the ASP has the correct end date.
-                        try:
-                            approval = Approval.objects.get(number=employee_record.approval_number)
-                        except Approval.DoesNotExist:
-                            pass  # No point to send a notification about an approval if it doesn't exist
-                        else:
-                            if approval.suspension_set.exists() or approval.prolongation_set.exists():
-                                # Mimic the SQL trigger function "create_employee_record_notification()"
-                                EmployeeRecordUpdateNotification.objects.update_or_create(
-                                    status=NotificationStatus.NEW,
-                                    employee_record=employee_record,
-                                    defaults={"updated_at": timezone.now},
-                                )
-
-                        continue
-
-                    employee_record.reject(code=processing_code, label=processing_label, archive=raw_employee_record)
-                else:
-                    self.logger.info(f"DRY-RUN: Rejected {employee_record=}, {processing_code=}, {processing_label=}")
+                    continue
+                employee_record.process(
+                    code=processing_code,
+                    label=processing_label,
+                    archive=raw_employee_record,
+                    save=False,
+                    log=False,
+                )
+                transition = EmployeeRecordTransition.PROCESS
+            elif dry_run:  # Rejected by ASP
+                self.logger.info(f"DRY-RUN: Rejected {employee_record=}, {processing_code=}, {processing_label=}")
+                continue
+            elif processing_code == EmployeeRecord.ASP_DUPLICATE_ERROR_CODE:
+                # One special case added for support concerns:
+                # 3436 processing code are automatically converted as PROCESSED
+                employee_record.process(
+                    code=processing_code,
+                    label=processing_label,
+                    archive=raw_employee_record,
+                    as_duplicate=True,
+                    save=False,
+                    log=False,
+                )
+                transition = EmployeeRecordTransition.PROCESS
+                duplicated_employee_records.append(employee_record)
+            else:
+                employee_record.reject(
+                    code=processing_code,
+                    label=processing_label,
+                    archive=raw_employee_record,
+                    save=False,
+                    log=False,
+                )
+                transition = EmployeeRecordTransition.REJECT
+
+            updated_employee_records.append(employee_record)
+            transition_logs.append(
+                EmployeeRecordTransitionLog(
+                    employee_record=employee_record,
+                    transition=transition,
+                    from_state=Status.SENT,
+                    to_state=employee_record.status.name,
+                    asp_processing_code=processing_code,
+                    asp_processing_label=processing_label,
+                    archived_json=raw_employee_record,
+                )
+            )
+
+        self.save_feedback(
+            EmployeeRecord,
+            updated_employee_records,
+            [
+                "asp_processing_code",
+                "asp_processing_label",
+                "archived_json",
+                "processed_at",
+                "processed_as_duplicate",
+            ],
+        )
+        EmployeeRecordTransitionLog.objects.bulk_create(transition_logs)
+
+        if duplicated_employee_records:
+            # If the ASP mark the employee record as duplicate,
+            # and there is a suspension or a prolongation for the associated approval,
+            # then we create a notification to be sure the ASP has the correct end date.
+            # No point to send a notification about an approval if it doesn't exist.
+            extended_approval_numbers = set(
+                Approval.objects.filter(
+                    Exists(Suspension.objects.filter(approval=OuterRef("pk")))
+                    | Exists(Prolongation.objects.filter(approval=OuterRef("pk"))),
+                    number__in={employee_record.approval_number for employee_record in duplicated_employee_records},
+                ).values_list("number", flat=True)
+            )
+            for employee_record in duplicated_employee_records:
+                if employee_record.approval_number in extended_approval_numbers:
+                    # Mimic the SQL trigger function "create_employee_record_notification()"
+                    EmployeeRecordUpdateNotification.objects.update_or_create(
+                        status=NotificationStatus.NEW,
+                        employee_record=employee_record,
+                        defaults={"updated_at": timezone.now},
+                    )
 
     @monitor(
         monitor_slug="transfer-employee-records-download",
@@ -4,7 +4,7 @@ from django.db import transaction
 from rest_framework.parsers import JSONParser
 from sentry_sdk.crons import monitor
 
-from itou.employee_record.common_management import EmployeeRecordTransferCommand, IgnoreFile
+from itou.employee_record.common_management import EmployeeRecordTransferCommand
 from itou.employee_record.enums import MovementType, NotificationStatus
 from itou.employee_record.exceptions import SerializationError
 from itou.employee_record.mocks.fake_serializers import TestEmployeeRecordUpdateNotificationBatchSerializer
@@ -75,19 +75,18 @@ class Command(EmployeeRecordTransferCommand):
         - Update metadata for processed employee record notifications.
         """
         batch_filename = EmployeeRecordBatch.batch_filename_from_feedback(feedback_file)
+        self.check_movement_type(batch, MovementType.UPDATE)
+        notifications = self.get_batch_elements(EmployeeRecordUpdateNotification.objects, batch_filename, batch)
 
-        for idx, employee_record in enumerate(batch["lignesTelechargement"], 1):
-            # UPDATE notifications are sent in specific files and are not mixed
-            # with "standard" employee records (CREATION).
-            if employee_record.get("typeMouvement") != MovementType.UPDATE:
-                raise IgnoreFile(f"Received 'typeMouvement' is not {MovementType.UPDATE}")
-
+        # Transitions are saved in bulk once the whole file is parsed.
+        updated_notifications = []
+        for employee_record in batch["lignesTelechargement"]:
             line_number = employee_record["numLigne"]
             processing_code = employee_record["codeTraitement"]
             processing_label = employee_record["libelleTraitement"]
 
             # Pre-check done, now find notification by file name and line number
-            notification = EmployeeRecordUpdateNotification.objects.find_by_batch(batch_filename, line_number).first()
+            notification = notifications.get(line_number)
             if not notification:
                 self.logger.info(
                     f"Skipping, could not get existing employee record notification: {batch_filename=}, {line_number=}"
@@ -103,15 +102,27 @@ class Command(EmployeeRecordTransferCommand):
 
             if processing_code == EmployeeRecordUpdateNotification.ASP_PROCESSING_SUCCESS_CODE:  # Processed by ASP
                 if not dry_run:
-                    notification.process(code=processing_code, label=processing_label, archive=employee_record)
+                    notification.process(
+                        code=processing_code, label=processing_label, archive=employee_record, save=False
+                    )
+                    updated_notifications.append(notification)
                 else:
                     self.logger.info(f"DRY-RUN: Processed {notification}, {processing_code=}, {processing_label=}")
             else:  # Rejected by ASP
                 if not dry_run:
-                    notification.reject(code=processing_code, label=processing_label, archive=employee_record)
+                    notification.reject(
+                        code=processing_code, label=processing_label, archive=employee_record, save=False
+                    )
+                    updated_notifications.append(notification)
                 else:
                     self.logger.info(f"DRY-RUN: Rejected {notification}: {processing_code=}, {processing_label=}")
 
+        self.save_feedback(
+            EmployeeRecordUpdateNotification,
+            updated_notifications,
+            ["asp_processing_code", "asp_processing_label", "archived_json"],
+        )
+
     @monitor(
         monitor_slug="transfer-employee-records-updates-download",
         monitor_config={
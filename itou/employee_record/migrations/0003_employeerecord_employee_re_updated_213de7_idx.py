@@ -0,0 +1,18 @@
+# Generated by Django 6.0.8 on 2026-10-17 09:12
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+    dependencies = [
+        ("employee_record", "0002_employeerecord_ntt_and_more"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="employeerecord",
+            index=models.Index(fields=["updated_at", "id"], name="employee_re_updated_213de7_idx"),
+        ),
+    ]
@@ -299,6 +299,8 @@ class EmployeeRecord(ASPExchangeInformation, xwf_models.WorkflowEnabled):
                 name="employee_record_ntt_regex",
             ),
         ]
+        # Change feed of the API.
+        indexes = [models.Index(fields=["updated_at", "id"])]
 
     def __str__(self):
         return (
@@ -378,7 +380,7 @@ class EmployeeRecord(ASPExchangeInformation, xwf_models.WorkflowEnabled):
         self.set_asp_batch_information(file, line_number, archive)
 
     @xwf_models.transition()
-    def reject(self, *, code, label, archive):
+    def reject(self, *, code, label, archive, save=True, log=True):
         """
         Update status after an ASP rejection of the employee record
         """
@@ -386,7 +388,7 @@ class EmployeeRecord(ASPExchangeInformation, xwf_models.WorkflowEnabled):
         self.set_asp_processing_information(code, label, archive)
 
     @xwf_models.transition()
-    def process(self, *, code, label, archive, as_duplicate=False):
+    def process(self, *, code, label, archive, as_duplicate=False, save=True, log=True):
         if as_duplicate and code != self.ASP_DUPLICATE_ERROR_CODE:
             raise ValueError(f"Code needs to be {self.ASP_DUPLICATE_ERROR_CODE} and not {code} when {as_duplicate=}")
 
@@ -749,9 +751,9 @@ class EmployeeRecordUpdateNotification(ASPExchangeInformation, xwf_models.Workfl
         self.set_asp_batch_information(file, line_number, archive)
 
     @xwf_models.transition()
-    def reject(self, *, code, label, archive):
+    def reject(self, *, code, label, archive, save=True):
         self.set_asp_processing_information(code, label, archive)
 
     @xwf_models.transition()
-    def process(self, *, code, label, archive):
+    def process(self, *, code, label, archive, save=True):
         self.set_asp_processing_information(code, label, archive)
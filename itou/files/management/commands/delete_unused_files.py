@@ -10,7 +10,7 @@ from django.utils import timezone
 from itou.antivirus.models import Scan
 from itou.files.models import File
 from itou.utils.command import BaseCommand
-from itou.utils.storage.s3 import TEMPORARY_STORAGE_PREFIX, s3_client
+from itou.utils.storage.s3 import SNAPSHOTS_PREFIX, TEMPORARY_STORAGE_PREFIX, s3_client
 
 
 # Wait a bit before deleting a unknown file from S3 in case the database File is still not commited
@@ -62,6 +62,9 @@ class Command(BaseCommand):
             obj_summaries = page.get("Contents", [])
             for obj_summary in obj_summaries:
                 key = obj_summary["Key"]
+                if key.startswith(f"{SNAPSHOTS_PREFIX}/"):
+                    # The API snapshots have no File, build_api_snapshots deletes the outdated ones.
+                    continue
                 if not key.startswith(f"{TEMPORARY_STORAGE_PREFIX}/"):
                     if key not in known_keys:
                         unknown_files_nb += 1
@@ -7,7 +7,7 @@ from django.db.models.functions import Substr
 from django.utils import timezone
 from itoutils.django.commands import dry_runnable
 
-from itou.cities.models import City
+from itou.cities.utils import CityResolver
 from itou.common_apps.address.models import lat_lon_to_coords
 from itou.insertion.models import (
     SOURCE_DORA_VALUE,
@@ -156,8 +156,8 @@ class Command(BaseCommand):
         parser.add_argument("--wet-run", dest="wet_run", action="store_true")
 
     @functools.cached_property
-    def cities_by_code_insee(self):
-        return City.objects.only("pk").in_bulk(field_name="code_insee")
+    def cities(self):
+        return CityResolver()
 
     @functools.lru_cache(maxsize=len(GenericReferenceItemSource) * len(GenericReferenceItemKind))
     def reference_data_by_value(self, source, kind):
@@ -307,7 +307,7 @@ class Command(BaseCommand):
         obj.post_code = data["code_postal"] or ""
         obj.city = data["commune"] or ""
 
-        obj.insee_city = self.cities_by_code_insee.get(data["code_insee"])
+        obj.insee_city = self.cities.cities_by_code_insee.get(data["code_insee"])
         if data["code_insee"] and not obj.insee_city:
             self.logger.warning(
                 "%s with uid=%s without City(code_insee=%s)", obj.__class__.__name__, obj.uid, data["code_insee"]
@@ -0,0 +1,31 @@
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Bulk updates of job applications don't always invalidate the counts, keep them short-lived.
+RECEIVED_STATE_COUNTS_TIMEOUT = 10 * 60
+
+
+def _received_state_counts_key(company_id):
+    return f"job-applications-received-state-counts-{company_id}"
+
+
+def get_received_state_counts(company):
+    """
+    Number of the non archived job applications received by the company per state,
+    cached until one of them changes.
+    """
+    cache = caches["failsafe"]
+    cache_key = _received_state_counts_key(company.pk)
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = company.job_applications_received.filter(archived_at=None).count_by_state()
+        cache.set(cache_key, counts, RECEIVED_STATE_COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_received_state_counts(*company_ids):
+    keys = [_received_state_counts_key(company_id) for company_id in company_ids if company_id is not None]
+    caches["failsafe"].delete_many(keys)
+    # A concurrent request may cache the counts before the transaction is committed.
+    transaction.on_commit(lambda: caches["failsafe"].delete_many(keys))
@@ -4,6 +4,7 @@ from django.template.defaultfilters import pluralize
 from django.utils import timezone
 from itoutils.django.commands import dry_runnable
 
+from itou.job_applications.cache import invalidate_received_state_counts
 from itou.job_applications.enums import ARCHIVABLE_JOB_APPLICATION_STATES
 from itou.job_applications.models import JobApplication
 from itou.utils.command import BaseCommand
@@ -19,10 +20,13 @@ class Command(BaseCommand):
     @dry_runnable
     def handle(self, **options):
         now = timezone.now()
-        count = JobApplication.objects.filter(
+        job_applications = JobApplication.objects.filter(
             archived_at=None,
             state__in=ARCHIVABLE_JOB_APPLICATION_STATES,
             updated_at__lte=now - datetime.timedelta(days=180),
-        ).update(archived_at=now)
+        )
+        company_ids = set(job_applications.values_list("to_company_id", flat=True))
+        count = job_applications.update(archived_at=now)
+        invalidate_received_state_counts(*company_ids)
         s = pluralize(count)
         self.logger.info(f"Archived {count} job application{s}")
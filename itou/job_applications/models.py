@@ -26,6 +26,7 @@ from itou.employee_record.models import EmployeeRecord
 from itou.files.models import File
 from itou.gps.models import FollowUpGroup
 from itou.job_applications import notifications as job_application_notifications
+from itou.job_applications.cache import invalidate_received_state_counts
 from itou.job_applications.enums import (
     ARCHIVABLE_JOB_APPLICATION_STATES_MANUAL,
     AUTO_REJECT_JOB_APPLICATION_DELAY,
@@ -439,6 +440,12 @@ class JobApplicationQuerySet(models.QuerySet):
             .order_by("-month")
         )
 
+    def count_by_state(self):
+        """
+        Number of job applications per state, computed with a single grouped query.
+        """
+        return dict(self.order_by().values("state").annotate(count=Count("pk")).values_list("state", "count"))
+
     def _get_participations_subquery(self):
         """
         Returns a RDVI participations subquery related to outer job applications
@@ -923,6 +930,16 @@ class JobApplication(xwf_models.WorkflowEnabled, models.Model):
     def __str__(self):
         return str(self.id)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Workflow transitions save the job application: this also covers the previous company of a transfer.
+        invalidate_received_state_counts(self.to_company_id, self.transferred_from_id)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_received_state_counts(self.to_company_id)
+        return result
+
     def clean(self):
         super().clean()
 
@@ -0,0 +1,39 @@
+from itou.jobs.models import Appellation
+
+
+def normalize_appellation_name(name):
+    return " ".join(name.split()).lower()
+
+
+class AppellationResolver:
+    """
+    Resolve a (ROME code, label) pair to an Appellation.
+
+    The index ((ROME code, normalized name) -> appellation) is built once, an exact match is a dict
+    lookup. Other labels fall back to the full text `autocomplete` search, memoised for the lifetime
+    of the resolver.
+    """
+
+    def __init__(self, appellations=None):
+        if appellations is None:
+            # Appellations are ordered by name, the first one wins like with `.first()`.
+            appellations = Appellation.objects.defer("full_text")
+        self.appellations = {}
+        for appellation in appellations:
+            key = (appellation.rome_id, normalize_appellation_name(appellation.name))
+            self.appellations.setdefault(key, appellation)
+        self._autocompletions = {}
+
+    def resolve(self, rome_code, label):
+        try:
+            return self.appellations[(rome_code, normalize_appellation_name(label))]
+        except KeyError:
+            pass
+        key = (rome_code, label)
+        try:
+            return self._autocompletions[key]
+        except KeyError:
+            appellation = self._autocompletions[key] = Appellation.objects.autocomplete(
+                search_string=label, rome_code=rome_code
+            ).first()
+            return appellation
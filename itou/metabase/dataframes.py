@@ -2,6 +2,7 @@
 Helper methods for manipulating dataframes used by the populate_metabase_emplois script.
 """
 
+import itertools
 import logging
 import time
 
@@ -23,18 +24,46 @@ PANDA_DATAFRAME_TO_PSQL_TYPES_MAPPING = {
     np.bool_: "boolean",
 }
 
+# Nullable pandas dtypes of the table columns, the missing values of a chunk don't change its dtypes.
+PSQL_TYPES_TO_PANDA_DTYPES_MAPPING = {
+    "bigint": "Int64",
+    "text": "string",
+    "double precision": "Float64",
+    "boolean": "boolean",
+}
+
 
 def infer_columns_from_df(df):
-    # Generate a dataframe with the same headers a the first non null value for each column
-    df_columns = [df[column_name] for column_name in df.columns]
-    non_null_values = [df_column.get(df_column.first_valid_index()) for df_column in df_columns]
-    initial_line = pd.DataFrame([non_null_values], columns=df.columns)
+    """
+    Infer the table columns from a sample of the data, e.g. its first chunk.
+
+    Typed columns (int, float, bool) keep their numpy type while object columns
+    get the type of their first non null value (text if there is none).
+    """
+    columns = []
+    for col_name, df_column in df.items():
+        col_type = df_column.dtype.type
+        if col_type is np.object_ and (first_valid_index := df_column.first_valid_index()) is not None:
+            col_type = pd.Series([df_column[first_valid_index]]).dtype.type
+        columns.append((col_name, PANDA_DATAFRAME_TO_PSQL_TYPES_MAPPING[col_type]))
+    return columns
+
+
+def coerce_df_to_columns(df, columns):
+    """
+    Cast the dataframe to the table columns, which may have been inferred from another chunk of the data.
 
-    # Generate table sql definition from np types
-    return [
-        (col_name, PANDA_DATAFRAME_TO_PSQL_TYPES_MAPPING[col_type.type])
-        for col_name, col_type in initial_line.dtypes.items()
-    ]
+    Raise a ValueError when the values of a column don't fit its type.
+    """
+    dtypes = {}
+    for col_name, col_type in columns:
+        try:
+            dtypes[col_name] = df[col_name].astype(PSQL_TYPES_TO_PANDA_DTYPES_MAPPING[col_type])
+        except (TypeError, ValueError) as e:
+            raise ValueError(
+                f"Column {col_name!r} does not match its type {col_type!r} inferred from the first chunk: {e}"
+            ) from e
+    return pd.DataFrame(dtypes, index=df.index)
 
 
 def store_df(df, table_name, batch_size=10_000):
@@ -43,24 +72,47 @@ def store_df(df, table_name, batch_size=10_000):
 
     Do this chunk by chunk to solve
     psycopg.OperationalError "server closed the connection unexpectedly" error.
+
+    `df` can also be an iterable of dataframes, e.g. `pd.read_csv(..., chunksize=...)`,
+    which are then streamed to the database without loading the whole data in memory.
+    The columns are inferred from the first chunk, so there must be at least one,
+    and every chunk is cast to them.
+
+    Return the number of rows written.
     """
     start_time = time.perf_counter()
 
+    if isinstance(df, pd.DataFrame):
+        total_rows = len(df)
+        # Recipe from https://stackoverflow.com/questions/44729727/pandas-slice-large-dataframe-in-chunks
+        df_chunks = (df[i : i + batch_size] for i in range(0, df.shape[0], batch_size))
+    else:
+        total_rows = "?"
+        df_chunks = iter(df)
+    first_chunk = next(df_chunks, None)
+    if first_chunk is None:
+        sample = df
+    else:
+        sample = first_chunk
+        df_chunks = itertools.chain([first_chunk], df_chunks)
+
     # Drop unnamed columns
-    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    column_names = sample.columns[~sample.columns.str.contains("^Unnamed")]
 
-    columns = infer_columns_from_df(df)
-    logger.info("Injecting %i rows with %i columns into %r", len(df), len(columns), table_name)
+    columns = infer_columns_from_df(sample[column_names])
+    logger.info("Injecting %s rows with %i columns into %r", total_rows, len(columns), table_name)
 
     new_table_name = metabase_db.get_new_table_name(table_name)
     metabase_db.create_table(new_table_name, columns, reset=True)
 
     with metabase_db.get_connection() as conn, conn.cursor() as cursor:
         written_rows = 0
-        # Recipe from https://stackoverflow.com/questions/44729727/pandas-slice-large-dataframe-in-chunks
-        for df_chunk in [df[i : i + batch_size] for i in range(0, df.shape[0], batch_size)]:
+        for df_chunk in df_chunks:
             chunk_start_time = time.perf_counter()
-            rows = df_chunk.replace({np.nan: None}).to_dict(orient="split")["data"]
+            df_chunk = coerce_df_to_columns(df_chunk, columns)
+            # Box numpy values to python objects and NaN to None column by column,
+            # rows are then lazily yielded as tuples straight to the COPY.
+            df_chunk = df_chunk.astype(object).where(df_chunk.notna(), None)
             with cursor.copy(
                 sql.SQL("COPY {new_table_name} ({fields}) FROM STDIN WITH (FORMAT BINARY)").format(
                     new_table_name=sql.Identifier(new_table_name),
@@ -70,19 +122,20 @@ def store_df(df, table_name, batch_size=10_000):
                 )
             ) as copy:
                 copy.set_types([col[1] for col in columns])
-                for row in rows:
+                for row in df_chunk.itertuples(index=False, name=None):
                     copy.write_row(row)
             written_rows += len(df_chunk)
             logger.info(
-                "%r: %i of %i rows written in %0.2f seconds",
+                "%r: %i of %s rows written in %0.2f seconds",
                 table_name,
                 written_rows,
-                len(df),
+                total_rows,
                 time.perf_counter() - chunk_start_time,
             )
 
     metabase_db.rename_table_atomically(new_table_name, table_name)
     logger.info("%r created in %0.2f seconds", table_name, time.perf_counter() - start_time)
+    return written_rows
 
 
 def get_df_from_rows(rows):
@@ -3,6 +3,7 @@ Helper methods for manipulating tables used by the populate_metabase_emplois scr
 """
 
 import copy
+import datetime
 import functools
 import gc
 import itertools
@@ -14,11 +15,21 @@ from django.conf import settings
 from django.utils import timezone
 from psycopg import sql
 
-from itou.metabase.utils import convert_boolean_to_int, convert_datetime_to_local_date
+from itou.metabase.tables.utils import get_lookup_value
+from itou.metabase.utils import (
+    boolean_to_int,
+    convert_boolean_to_int,
+    convert_datetime_to_local_date,
+    datetime_to_local_date,
+)
 
 
 logger = logging.getLogger(__name__)
 
+HIGH_WATER_MARKS_TABLE_NAME = "c1_metabase_high_water_marks"
+INCREMENTAL_FULL_REFRESH_INTERVAL = datetime.timedelta(days=7)
+INCREMENTAL_OVERLAP = datetime.timedelta(hours=1)
+
 
 def get_connection(schema=None):
     connection = psycopg.connect(
@@ -94,23 +105,13 @@ def create_table(table_name: str, columns: list[str, str], schema=None, reset=Fa
         cursor.execute(create_table_query)
 
 
-def populate_table(table, batch_size, querysets=None, schema=None):
+def get_table_with_metabase_columns(table):
     """
-    About commits: a single final commit freezes the itou-metabase-db temporarily, making
-    our GUI unable to connect to the db during this commit.
-
-    This is why we instead do small and frequent commits, so that the db stays available
-    throughout the script.
+    Add our metadata column and the Metabase conversions to the table columns.
 
-    Note that psycopg will always automatically open a new transaction when none is open.
-    Thus it will open a new one after each such commit.
+    Columns declaring a `field` get a list of `transforms`, each one taking and returning the list of values
+    of a whole chunk, applied by inject_chunk().
     """
-    start_time = time.perf_counter()
-
-    table_name = table.name
-
-    total_rows = sum([queryset.count() for queryset in querysets])
-
     table = copy.deepcopy(table)
     # because of tenacity, we can't just add the last column to the global variable
     table.add_columns(
@@ -122,18 +123,102 @@ def populate_table(table, batch_size, querysets=None, schema=None):
                 # As metabase daily updates run typically every night after midnight, the last day with
                 # complete data is yesterday, not today.
                 "fn": lambda o: timezone.localdate(),
+                "field": None,
+                "transform": lambda _: timezone.localdate(),
             },
         ]
     )
 
-    # Transform boolean fields into 0-1 integer fields as
-    # metabase cannot sum or average boolean columns ¯\_(ツ)_/¯
     for c in table.columns:
+        if "field" in c:
+            c["transforms"] = []
+            if "transform" in c:
+                c["transforms"].append(functools.partial(map_values, c.pop("transform")))
+            if "column_transform" in c:
+                c["transforms"].append(c.pop("column_transform"))
+        # Transform boolean fields into 0-1 integer fields as
+        # metabase cannot sum or average boolean columns ¯\_(ツ)_/¯
         if c["type"] == "boolean":
             c["type"] = "integer"
             c["fn"] = functools.partial(convert_boolean_to_int, c["fn"])
+            if "field" in c:
+                c["transforms"].append(functools.partial(map_values, boolean_to_int))
         if c["type"] == "date":
             c["fn"] = functools.partial(convert_datetime_to_local_date, c["fn"])
+            if "field" in c:
+                c["transforms"].append(functools.partial(map_values, datetime_to_local_date))
+    return table
+
+
+def map_values(transform, values):
+    return list(map(transform, values))
+
+
+def get_values_list_fields(table_columns):
+    """
+    Return the fields to fetch with `values_list()`, or None if some columns need model instances.
+    """
+    if all("field" in c for c in table_columns):
+        return list(dict.fromkeys(c["field"] for c in table_columns if c["field"] is not None))
+    return None
+
+
+def inject_chunk(cur, table_columns, chunk, table_name, fields=None):
+    """
+    Rows are model instances, or tuples of `fields` values fetched with `values_list()`.
+
+    Values are computed column by column so that declared transforms are mapped over a whole column
+    instead of being called through a chain of wrappers for every cell.
+    """
+    if fields is not None:
+        values_by_field = dict(zip(fields, zip(*chunk)))
+    columns = []
+    for c in table_columns:
+        if "field" not in c:
+            values = [c["fn"](row) for row in chunk]
+        elif c["field"] is None:
+            values = [None] * len(chunk)
+        elif fields is not None:
+            values = values_by_field[c["field"]]
+        else:
+            values = [get_lookup_value(row, c["field"]) for row in chunk]
+        for transform in c.get("transforms", []):
+            values = transform(values)
+        columns.append(values)
+    rows = zip(*columns)
+    with cur.copy(
+        sql.SQL("COPY {table_name} ({fields}) FROM STDIN WITH (FORMAT BINARY)").format(
+            table_name=sql.Identifier(table_name),
+            fields=sql.SQL(",").join(
+                [sql.Identifier(c["name"]) for c in table_columns],
+            ),
+        )
+    ) as copy:
+        copy.set_types([c["type"] for c in table_columns])
+        for row in rows:
+            copy.write_row(row)
+
+
+def populate_table(table, batch_size, querysets=None, schema=None):
+    """
+    About commits: a single final commit freezes the itou-metabase-db temporarily, making
+    our GUI unable to connect to the db during this commit.
+
+    This is why we instead do small and frequent commits, so that the db stays available
+    throughout the script.
+
+    Note that psycopg will always automatically open a new transaction when none is open.
+    Thus it will open a new one after each such commit.
+
+    Return the number of rows written.
+    """
+    start_time = time.perf_counter()
+
+    table_name = table.name
+
+    total_rows = sum([queryset.count() for queryset in querysets])
+
+    table = get_table_with_metabase_columns(table)
 
     logger.info("Injecting %i rows with %i columns into %r", total_rows, len(table.columns), table_name)
 
@@ -141,24 +226,13 @@ def populate_table(table, batch_size, querysets=None, schema=None):
     create_table(new_table_name, [(c["name"], c["type"]) for c in table.columns], reset=True, schema=schema)
 
     with get_connection(schema=schema) as conn, conn.cursor() as cur:
-
-        def inject_chunk(table_columns, chunk, new_table_name):
-            rows = [[c["fn"](row) for c in table_columns] for row in chunk]
-            with cur.copy(
-                sql.SQL("COPY {new_table_name} ({fields}) FROM STDIN WITH (FORMAT BINARY)").format(
-                    new_table_name=sql.Identifier(new_table_name),
-                    fields=sql.SQL(",").join(
-                        [sql.Identifier(c["name"]) for c in table_columns],
-                    ),
-                )
-            ) as copy:
-                copy.set_types([c["type"] for c in table_columns])
-                for row in rows:
-                    copy.write_row(row)
-
         # Add comments on table columns.
         for c in table.columns:
-            assert set(c.keys()) == {"name", "type", "comment", "fn"}
+            assert (
+                {"name", "type", "comment", "fn"}
+                <= c.keys()
+                <= {"name", "type", "comment", "fn", "field", "transforms"}
+            )
             column_name = c["name"]
             column_comment = c["comment"]
             comment_query = sql.SQL("comment on column {new_table_name}.{column_name} is {column_comment}").format(
@@ -168,8 +242,11 @@ def populate_table(table, batch_size, querysets=None, schema=None):
             )
             cur.execute(comment_query)
 
+        fields = get_values_list_fields(table.columns)
         written_rows = 0
         for queryset in querysets:
+            if fields is not None:
+                queryset = queryset.values_list(*fields)
             # Insert rows by batch of batch_size.
             # A bigger number makes the script faster until a certain point,
             # but it also increases RAM usage.
@@ -177,7 +254,7 @@ def populate_table(table, batch_size, querysets=None, schema=None):
             for chunk in itertools.batched(queryset.iterator(chunk_size=batch_size), batch_size):
                 chunk_start_time = time.perf_counter()
                 logger.info("%r: chunk created in %0.2f seconds", table_name, chunk_start_time - queryset_start_time)
-                inject_chunk(table_columns=table.columns, chunk=chunk, new_table_name=new_table_name)
+                inject_chunk(cur, table_columns=table.columns, chunk=chunk, table_name=new_table_name, fields=fields)
                 written_rows += len(chunk)
                 logger.info(
                     "%r: %i of %i rows written in %0.2f seconds",
@@ -193,3 +270,149 @@ def populate_table(table, batch_size, querysets=None, schema=None):
 
     rename_table_atomically(new_table_name, table_name, schema=schema)
     logger.info("%r created in %0.2f seconds", table_name, time.perf_counter() - start_time)
+    return written_rows
+
+
+def get_delta_table_name(table_name):
+    return f"z_delta_{table_name}"
+
+
+def get_ids_table_name(table_name):
+    return f"z_ids_{table_name}"
+
+
+def get_high_water_mark(table_name, column_names, schema=None):
+    """
+    Return the (high_water_mark, full_refresh_at) couple of an incrementally updated table,
+    or (None, None) if it never was populated by update_table(), doesn't exist anymore
+    or doesn't have the expected columns.
+    """
+    with get_connection(schema=schema) as conn, conn.cursor() as cur:
+        cur.execute(
+            sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} "
+                "(table_name varchar PRIMARY KEY, high_water_mark timestamp with time zone, "
+                "full_refresh_at timestamp with time zone)"
+            ).format(sql.Identifier(HIGH_WATER_MARKS_TABLE_NAME))
+        )
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s ORDER BY ordinal_position",
+            [table_name],
+        )
+        if [column_name for (column_name,) in cur.fetchall()] != column_names:
+            return None, None
+        cur.execute(
+            sql.SQL("SELECT high_water_mark, full_refresh_at FROM {} WHERE table_name = %s").format(
+                sql.Identifier(HIGH_WATER_MARKS_TABLE_NAME)
+            ),
+            [table_name],
+        )
+        return cur.fetchone() or (None, None)
+
+
+def set_high_water_mark(cur, table_name, high_water_mark, full_refresh_at=None):
+    cur.execute(
+        sql.SQL(
+            "INSERT INTO {} (table_name, high_water_mark, full_refresh_at) VALUES (%s, %s, %s) "
+            "ON CONFLICT (table_name) DO UPDATE SET high_water_mark = EXCLUDED.high_water_mark, "
+            "full_refresh_at = COALESCE(EXCLUDED.full_refresh_at, {}.full_refresh_at)"
+        ).format(sql.Identifier(HIGH_WATER_MARKS_TABLE_NAME), sql.Identifier(HIGH_WATER_MARKS_TABLE_NAME)),
+        [table_name, high_water_mark, full_refresh_at],
+    )
+
+
+def update_table(table, batch_size, queryset, changed_since, *, full_refresh=False, schema=None):
+    """
+    Incrementally update a table instead of rebuilding it from scratch.
+
+    `changed_since(high_water_mark)` must return a `Q` object matching the rows of `queryset`
+    which may have changed since the previous run. Only those rows are rewritten, and rows
+    which are no longer part of `queryset` are deleted.
+
+    Columns computed from related objects or from the current date may drift between
+    two full rebuilds, which happen when `full_refresh` is set, on the first run and then
+    every INCREMENTAL_FULL_REFRESH_INTERVAL.
+
+    Return the number of rows written.
+    """
+    start_time = time.perf_counter()
+    # Rows modified while we read the database may not be visible to our queries yet,
+    # they will be caught by the next run thanks to INCREMENTAL_OVERLAP.
+    now = timezone.now()
+
+    table_name = table.name
+    metabase_table = get_table_with_metabase_columns(table)
+    high_water_mark, full_refresh_at = get_high_water_mark(
+        table_name, [c["name"] for c in metabase_table.columns], schema=schema
+    )
+    if full_refresh or high_water_mark is None or full_refresh_at < now - INCREMENTAL_FULL_REFRESH_INTERVAL:
+        written_rows = populate_table(table, batch_size, querysets=[queryset], schema=schema)
+        with get_connection(schema=schema) as conn, conn.cursor() as cur:
+            set_high_water_mark(cur, table_name, now, full_refresh_at=now)
+        return written_rows
+
+    table = metabase_table
+    [id_column] = [c for c in table.columns if c["name"] == "id"]
+    delta_queryset = queryset.filter(changed_since(high_water_mark - INCREMENTAL_OVERLAP))
+    total_rows = delta_queryset.count()
+    logger.info("Updating %i rows since %s into %r", total_rows, high_water_mark, table_name)
+
+    delta_table_name = get_delta_table_name(table_name)
+    ids_table_name = get_ids_table_name(table_name)
+    create_table(delta_table_name, [(c["name"], c["type"]) for c in table.columns], reset=True, schema=schema)
+    create_table(ids_table_name, [("id", id_column["type"])], reset=True, schema=schema)
+
+    fields = get_values_list_fields(table.columns)
+    if fields is not None:
+        delta_queryset = delta_queryset.values_list(*fields)
+
+    with get_connection(schema=schema) as conn, conn.cursor() as cur:
+        written_rows = 0
+        for chunk in itertools.batched(delta_queryset.iterator(chunk_size=batch_size), batch_size):
+            inject_chunk(cur, table_columns=table.columns, chunk=chunk, table_name=delta_table_name, fields=fields)
+            written_rows += len(chunk)
+            logger.info("%r: %i of %i changed rows written", table_name, written_rows, total_rows)
+        gc.collect()
+
+        # Rows which vanished from the queryset have to be deleted.
+        with cur.copy(
+            sql.SQL("COPY {} (id) FROM STDIN WITH (FORMAT BINARY)").format(sql.Identifier(ids_table_name))
+        ) as copy:
+            copy.set_types([id_column["type"]])
+            for pk in queryset.values_list("pk", flat=True).order_by().iterator(chunk_size=batch_size):
+                copy.write_row([pk])
+        cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(ids_table_name)))
+
+        # Everything below happens in the same transaction, Metabase users never see a partial update.
+        cur.execute(
+            sql.SQL(
+                "DELETE FROM {table} WHERE id IN (SELECT id FROM {delta}) "
+                "OR NOT EXISTS (SELECT FROM {ids} WHERE {ids}.id = {table}.id)"
+            ).format(
+                table=sql.Identifier(table_name),
+                delta=sql.Identifier(delta_table_name),
+                ids=sql.Identifier(ids_table_name),
+            )
+        )
+        deleted_rows = cur.rowcount
+        fields = sql.SQL(",").join([sql.Identifier(c["name"]) for c in table.columns])
+        cur.execute(
+            sql.SQL("INSERT INTO {table} ({fields}) SELECT {fields} FROM {delta}").format(
+                table=sql.Identifier(table_name),
+                fields=fields,
+                delta=sql.Identifier(delta_table_name),
+            )
+        )
+        for name in [delta_table_name, ids_table_name]:
+            cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+        set_high_water_mark(cur, table_name, now)
+
+    logger.info(
+        "%r updated in %0.2f seconds: %i rows deleted or replaced, %i rows written",
+        table_name,
+        time.perf_counter() - start_time,
+        deleted_rows,
+        written_rows,
+    )
+    return written_rows
@@ -18,12 +18,18 @@ We maintain a google sheet with extensive documentation about all tables and fie
 Its name is "Documentation ITOU METABASE [Master doc]". No direct link here for safety reasons.
 """
 
+import concurrent.futures
 import logging
+import multiprocessing
+import resource
+import time
 from collections import OrderedDict
 
+import django
 import tenacity
 from django.conf import settings
 from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connections
 from django.db.models import Count, F, Max, Min, OuterRef, Prefetch, Q, Subquery
 from django.utils import timezone
 
@@ -90,6 +96,27 @@ def log_retry_attempt(retry_state):
     logging.info("Attempt failed with outcome=%s", retry_state.outcome)
 
 
+# Modes which have to be populated before any other one when running in parallel.
+# Every mode not listed here only depends on those referential tables and can be run concurrently.
+REFERENTIAL_MODES = ["references", "enums"]
+
+
+def populate_in_worker(mode, incremental):
+    """
+    Run a single populate operation in a pool worker.
+
+    Workers are spawned processes with their own Django connection (opened lazily by the ORM)
+    and their own metabase connection (each `populate_table()` call opens one).
+    """
+    start_time = time.perf_counter()
+    command = Command()
+    command.incremental = incremental
+    written_rows = command.MODE_TO_OPERATION[mode]()
+    connections.close_all()
+    # Workers only handle one task, so the peak RSS is the one of the operation (in KiB on Linux).
+    return mode, written_rows, time.perf_counter() - start_time, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
 class Command(BaseCommand):
     help = "Populate metabase database."
 
@@ -98,6 +125,7 @@ class Command(BaseCommand):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.incremental = False
         # Order in the dict is the order in which the function are going to be called, hence referential data on top
         self.MODE_TO_OPERATION = {
             # Referential data
@@ -130,12 +158,26 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--mode", required=True, choices=["all", *sorted(self.MODE_TO_OPERATION)])
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=1,
+            help="Number of tables populated concurrently in `all` mode, each in its own process.",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only rewrite the changed rows of the biggest tables, with a weekly full rebuild.",
+        )
 
     def populate_analytics(self):
-        metabase_db.populate_table(analytics.AnalyticsTable, batch_size=100_000, querysets=[Datum.objects.all()])
-        metabase_db.populate_table(
+        written_rows = metabase_db.populate_table(
+            analytics.AnalyticsTable, batch_size=100_000, querysets=[Datum.objects.all()]
+        )
+        written_rows += metabase_db.populate_table(
             analytics.DashboardVisitTable, batch_size=100_000, querysets=[StatsDashboardVisit.objects.all()]
         )
+        return written_rows
 
     def populate_companies(self):
         ONE_MONTH_AGO = timezone.now() - timezone.timedelta(days=30)
@@ -273,7 +315,7 @@ class Command(BaseCommand):
             )
         )
 
-        metabase_db.populate_table(companies.TABLE, batch_size=10_000, querysets=[queryset])
+        return metabase_db.populate_table(companies.TABLE, batch_size=10_000, querysets=[queryset])
 
     def populate_job_descriptions(self):
         queryset = (
@@ -285,7 +327,7 @@ class Command(BaseCommand):
             .with_job_applications_count()
             .all()
         )
-        metabase_db.populate_table(job_descriptions.TABLE, batch_size=50_000, querysets=[queryset])
+        return metabase_db.populate_table(job_descriptions.TABLE, batch_size=50_000, querysets=[queryset])
 
     def populate_organizations(self):
         """
@@ -361,7 +403,7 @@ class Command(BaseCommand):
             )
         )
 
-        metabase_db.populate_table(
+        return metabase_db.populate_table(
             organizations.TABLE,
             batch_size=10_000,
             querysets=[queryset],
@@ -458,11 +500,26 @@ class Command(BaseCommand):
         )
         job_seekers_table = job_seekers.get_table()
 
-        metabase_db.populate_table(job_seekers_table, batch_size=10_000, querysets=[queryset])
+        def changed_since(since):
+            if since.year != timezone.localdate().year:
+                # The age of every job seeker changed on January 1st.
+                return Q()
+            # Changes on the job seeker profile are only caught by the periodic full rebuild.
+            return (
+                Q(date_joined__gte=since)
+                # Job seekers are no longer considered active 7 days after their last login.
+                | Q(last_login__gte=since - timezone.timedelta(days=7))
+                | Q(pk__in=JobApplication.objects.filter(updated_at__gte=since).values("job_seeker"))
+                | Q(pk__in=EligibilityDiagnosis.objects.filter(updated_at__gte=since).values("job_seeker"))
+            )
+
+        if self.incremental:
+            return metabase_db.update_table(job_seekers_table, 10_000, queryset, changed_since)
+        return metabase_db.populate_table(job_seekers_table, batch_size=10_000, querysets=[queryset])
 
     def populate_criteria(self):
         queryset = AdministrativeCriteria.objects.all()
-        metabase_db.populate_table(criteria.TABLE, batch_size=10_000, querysets=[queryset])
+        return metabase_db.populate_table(criteria.TABLE, batch_size=10_000, querysets=[queryset])
 
     def populate_job_applications(self):
         queryset = (
@@ -530,7 +587,21 @@ class Command(BaseCommand):
             )
         )
 
-        metabase_db.populate_table(job_applications.TABLE, batch_size=20_000, querysets=[queryset])
+        if self.incremental:
+            return metabase_db.update_table(
+                job_applications.TABLE,
+                20_000,
+                queryset,
+                changed_since=lambda since: (
+                    Q(updated_at__gte=since)
+                    | Q(
+                        pk__in=JobApplicationTransitionLog.objects.filter(timestamp__gte=since).values(
+                            "job_application"
+                        )
+                    )
+                ),
+            )
+        return metabase_db.populate_table(job_applications.TABLE, batch_size=20_000, querysets=[queryset])
 
     def populate_selected_jobs(self):
         """
@@ -540,7 +611,7 @@ class Command(BaseCommand):
             jobapplication__origin=Origin.PE_APPROVAL
         ).filter(jobapplication__to_company_id__in=Company.objects.active())
 
-        metabase_db.populate_table(selected_jobs.TABLE, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(selected_jobs.TABLE, batch_size=100_000, querysets=[queryset])
 
     def populate_approvals(self):
         only_fields = {
@@ -557,62 +628,75 @@ class Command(BaseCommand):
                 "origin",
             )
         )
-        metabase_db.populate_table(approvals.TABLE, batch_size=30_000, querysets=[queryset])
+        if self.incremental:
+            return metabase_db.update_table(
+                approvals.TABLE,
+                30_000,
+                queryset,
+                changed_since=lambda since: (
+                    # Suspensions and prolongations also update the approval through database triggers.
+                    Q(updated_at__gte=since)
+                    | Q(pk__in=JobApplication.objects.filter(updated_at__gte=since).values("approval"))
+                ),
+            )
+        return metabase_db.populate_table(approvals.TABLE, batch_size=30_000, querysets=[queryset])
 
     def populate_prolongations(self):
         queryset = Prolongation.objects.all()
-        metabase_db.populate_table(prolongations.TABLE, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(prolongations.TABLE, batch_size=100_000, querysets=[queryset])
 
     def populate_prolongation_requests(self):
         queryset = ProlongationRequest.objects.select_related(
             "prolongation",
             "deny_information",
         ).all()
-        metabase_db.populate_table(prolongation_requests.TABLE, batch_size=50_000, querysets=[queryset])
+        return metabase_db.populate_table(prolongation_requests.TABLE, batch_size=50_000, querysets=[queryset])
 
     def populate_suspensions(self):
         queryset = Suspension.objects.all()
-        metabase_db.populate_table(suspensions.TABLE, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(suspensions.TABLE, batch_size=100_000, querysets=[queryset])
 
     def populate_institutions(self):
         queryset = Institution.objects.all()
-        metabase_db.populate_table(institutions.TABLE, batch_size=10_000, querysets=[queryset])
+        return metabase_db.populate_table(institutions.TABLE, batch_size=10_000, querysets=[queryset])
 
     def populate_evaluation_campaigns(self):
         queryset = EvaluationCampaign.objects.all()
-        metabase_db.populate_table(evaluation_campaigns.TABLE, batch_size=10_000, querysets=[queryset])
+        return metabase_db.populate_table(evaluation_campaigns.TABLE, batch_size=10_000, querysets=[queryset])
 
     def populate_evaluated_siaes(self):
         queryset = EvaluatedSiae.objects.prefetch_related(
             "evaluated_job_applications__evaluated_administrative_criteria"
         ).all()
-        metabase_db.populate_table(evaluated_siaes.TABLE, batch_size=5_000, querysets=[queryset])
+        return metabase_db.populate_table(evaluated_siaes.TABLE, batch_size=5_000, querysets=[queryset])
 
     def populate_evaluated_job_applications(self):
         queryset = EvaluatedJobApplication.objects.prefetch_related("evaluated_administrative_criteria").all()
-        metabase_db.populate_table(evaluated_job_applications.TABLE, batch_size=20_000, querysets=[queryset])
+        return metabase_db.populate_table(evaluated_job_applications.TABLE, batch_size=20_000, querysets=[queryset])
 
     def populate_evaluated_criteria(self):
         queryset = EvaluatedAdministrativeCriteria.objects.all()
-        metabase_db.populate_table(evaluated_criteria.TABLE, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(evaluated_criteria.TABLE, batch_size=100_000, querysets=[queryset])
 
     def populate_users(self):
         queryset = User.objects.filter(kind=UserKind.PROFESSIONAL, is_active=True)
-        metabase_db.populate_table(users.TABLE, batch_size=30_000, querysets=[queryset])
+        return metabase_db.populate_table(users.TABLE, batch_size=30_000, querysets=[queryset])
 
     def populate_memberships(self):
         siae_queryset = CompanyMembership.objects.all()
         prescriber_queryset = PrescriberMembership.objects.all()
         institution_queryset = InstitutionMembership.objects.all()
 
-        metabase_db.populate_table(
+        return metabase_db.populate_table(
             memberships.TABLE, batch_size=100_000, querysets=[siae_queryset, prescriber_queryset, institution_queryset]
         )
 
     def populate_references(self):
         # DB referential
-        metabase_db.populate_table(rome_codes.TABLE, batch_size=100_000, querysets=[Rome.objects.all()])
-        metabase_db.populate_table(insee_codes.TABLE, batch_size=50_000, querysets=[City.objects.all()])
+        written_rows = metabase_db.populate_table(rome_codes.TABLE, batch_size=100_000, querysets=[Rome.objects.all()])
+        written_rows += metabase_db.populate_table(
+            insee_codes.TABLE, batch_size=50_000, querysets=[City.objects.all()]
+        )
         # Code referential
         rows = []
         for dpt_code, dpt_name in DEPARTMENTS.items():
@@ -622,7 +706,8 @@ class Command(BaseCommand):
             row["nom_departement"] = dpt_name
             row["nom_region"] = DEPARTMENT_TO_REGION[dpt_code]
             rows.append(row)
-        store_df(df=get_df_from_rows(rows), table_name="departements")
+        written_rows += store_df(df=get_df_from_rows(rows), table_name="departements")
+        return written_rows
 
     def populate_enums(self):
         # TODO(vperron,dejafait): This works as long as we don't have several table creations in the same call.
@@ -635,15 +720,17 @@ class Command(BaseCommand):
             RefusalReason: "c1_ref_motif_de_refus",
             Suspension.Reason: "c1_ref_motif_suspension",
         }
+        written_rows = 0
         for enum, table_name in enum_to_table.items():
             self.logger.info("Preparing content for %s table...", table_name)
             rows = [OrderedDict(code=str(item), label=item.label) for item in enum]
             df = get_df_from_rows(rows)
-            store_df(df=df, table_name=table_name)
+            written_rows += store_df(df=df, table_name=table_name)
+        return written_rows
 
     def populate_gps_groups(self):
         queryset = FollowUpGroup.objects.all().annotate(beneficiary_department=F("beneficiary__department"))
-        metabase_db.populate_table(gps.GroupsTable, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(gps.GroupsTable, batch_size=100_000, querysets=[queryset])
 
     def populate_gps_memberships(self):
         queryset = (
@@ -665,27 +752,68 @@ class Command(BaseCommand):
                 )
             )
         )
-        metabase_db.populate_table(gps.MembershipsTable, batch_size=100_000, querysets=[queryset])
+        return metabase_db.populate_table(gps.MembershipsTable, batch_size=100_000, querysets=[queryset])
 
     def populate_mobilization_events(self):
         queryset = MobilizationEvent.objects.all().select_related("structure", "service", "structure__source")
-        metabase_db.populate_table(
+        return metabase_db.populate_table(
             mobilization_events.TABLE, batch_size=100_000, querysets=[queryset], schema="raw_emplois"
         )
 
+    def populate_all_in_parallel(self, jobs):
+        summary = []
+        for mode in REFERENTIAL_MODES:
+            start_time = time.perf_counter()
+            written_rows = self.MODE_TO_OPERATION[mode]()
+            summary.append((mode, written_rows, time.perf_counter() - start_time, None))
+
+        # Don't leak the parent connection into the workers, they open their own.
+        connections.close_all()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+            max_tasks_per_child=1,
+        ) as executor:
+            futures = [
+                executor.submit(populate_in_worker, mode, self.incremental)
+                for mode in self.MODE_TO_OPERATION
+                if mode not in REFERENTIAL_MODES
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    summary.append(future.result())
+                    self.logger.info("%r populated in %0.2f seconds", summary[-1][0], summary[-1][2])
+            except Exception:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        for mode, written_rows, duration, max_rss in sorted(summary, key=lambda item: item[2], reverse=True):
+            self.logger.info(
+                "%r: rows=%s duration=%0.2fs max_rss=%s",
+                mode,
+                written_rows,
+                duration,
+                f"{max_rss // 1024}MiB" if max_rss is not None else "n/a",
+            )
+
     @tenacity.retry(
         retry=tenacity.retry_if_not_exception_type(RuntimeError),
         stop=tenacity.stop_after_attempt(3),
         wait=tenacity.wait_fixed(5),
         after=log_retry_attempt,
     )
-    def handle(self, *, mode, **options):
+    def handle(self, *, mode, jobs, incremental, **options):
+        self.incremental = incremental
         if mode == "all":
             send_slack_message(
                 ":rocket: lancement mise à jour de données C1 -> Metabase", url=settings.PILOTAGE_SLACK_WEBHOOK_URL
             )
-            for operation in self.MODE_TO_OPERATION.values():
-                operation()
+            if jobs > 1:
+                self.populate_all_in_parallel(jobs)
+            else:
+                for operation in self.MODE_TO_OPERATION.values():
+                    operation()
             build_dbt_daily()
             send_slack_message(
                 ":white_check_mark: succès mise à jour de données C1 -> Metabase",
@@ -9,8 +9,8 @@ from itou.metabase.tables.utils import (
     MetabaseTable,
     get_column_from_field,
     get_department_and_region_columns,
+    get_hash_column,
     get_model_field,
-    hash_content,
 )
 
 
@@ -92,11 +92,10 @@ TABLE.add_columns(
             "comment": "Provient des injections AI",
             "fn": lambda o: o.origin == Origin.AI_STOCK if isinstance(o, Approval) else False,
         },
-        {
-            "name": "hash_numéro_pass_iae",
-            "type": "varchar",
-            "comment": "Version obfusquée du PASS IAE ou d'agrément",
-            "fn": lambda o: hash_content(o.number),
-        },
+        get_hash_column(
+            get_model_field(Approval, "number"),
+            name="hash_numéro_pass_iae",
+            comment="Version obfusquée du PASS IAE ou d'agrément",
+        ),
     ]
 )
@@ -5,7 +5,7 @@ from itou.companies.models import Company
 from itou.metabase.tables.utils import (
     MetabaseTable,
     get_address_columns,
-    get_choice,
+    get_choice_column,
     get_column_from_field,
     get_establishment_is_active_column,
     get_establishment_last_login_date_column,
@@ -33,12 +33,12 @@ TABLE.add_columns(
         get_column_from_field(get_model_field(Company, "description"), name="description"),
         get_column_from_field(get_model_field(Company, "kind"), name="type"),
         get_column_from_field(get_model_field(Company, "siret"), name="siret"),
-        {
-            "name": "source",
-            "type": "varchar",
-            "comment": "Source des données de la structure",
-            "fn": lambda o: get_choice(choices=CompanySource.choices, key=o.source),
-        },
+        get_choice_column(
+            get_model_field(Company, "source"),
+            name="source",
+            choices=CompanySource.choices,
+            comment="Source des données de la structure",
+        ),
         get_column_from_field(get_model_field(Company, "naf"), name="code_naf"),
         get_column_from_field(get_model_field(Company, "email"), name="email_public"),
         get_column_from_field(get_model_field(Company, "auth_email"), name="email_authentification"),
@@ -5,6 +5,7 @@ from itou.job_applications.models import JobApplication
 from itou.metabase.tables.utils import (
     MetabaseTable,
     get_choice,
+    get_choice_column,
     get_column_from_field,
     get_department_and_region_columns,
     get_model_field,
@@ -102,12 +103,12 @@ TABLE.add_columns(
         get_column_from_field(
             get_model_field(JobApplication, "processed_at"), name="date_traitement", field_type="date"
         ),
-        {
-            "name": "état",
-            "type": "varchar",
-            "comment": "Etat de la candidature",
-            "fn": lambda o: get_choice(choices=JobApplicationState.choices, key=o.state),
-        },
+        get_choice_column(
+            get_model_field(JobApplication, "state"),
+            name="état",
+            choices=JobApplicationState.choices,
+            comment="Etat de la candidature",
+        ),
         {
             "name": "origine",
             "type": "varchar",
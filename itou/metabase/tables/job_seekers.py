@@ -13,13 +13,13 @@ from itou.metabase.tables.utils import (
     get_choice,
     get_column_from_field,
     get_department_and_region_columns,
+    get_hash_column,
     get_model_field,
     get_post_code_column,
     get_qpv_job_seeker_pks,
-    hash_content,
 )
 from itou.users.enums import IdentityProvider
-from itou.users.models import User
+from itou.users.models import JobSeekerProfile, User
 from itou.utils import iso_standards
 from itou.utils.france_standards import NIR
 
@@ -182,12 +182,12 @@ def get_table():
     job_seekers_table.add_columns(
         [
             get_column_from_field(get_model_field(User, "pk"), name="id", comment="ID C1 du candidat"),
-            {
-                "name": "hash_nir",
-                "type": "varchar",
-                "comment": "Version obfusquée du NIR",
-                "fn": lambda o: hash_content(o.jobseeker_profile.nir) if o.jobseeker_profile.nir else None,
-            },
+            get_hash_column(
+                get_model_field(JobSeekerProfile, "nir"),
+                name="hash_nir",
+                comment="Version obfusquée du NIR",
+                lookup="jobseeker_profile__nir",
+            ),
             {
                 "name": "sexe_selon_nir",
                 "type": "varchar",
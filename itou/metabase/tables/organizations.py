@@ -3,7 +3,7 @@ from operator import attrgetter
 from itou.metabase.tables.utils import (
     MetabaseTable,
     get_address_columns,
-    get_choice,
+    get_choice_column,
     get_column_from_field,
     get_establishment_is_active_column,
     get_establishment_last_login_date_column,
@@ -22,12 +22,12 @@ TABLE.add_columns(
         get_column_from_field(
             get_model_field(PrescriberOrganization, "kind"), name="type", comment="Type organisation (abrégé)"
         ),
-        {
-            "name": "type_complet",
-            "type": "varchar",
-            "comment": "Type organisation (détaillé)",
-            "fn": lambda o: get_choice(choices=PrescriberOrganizationKind.choices, key=o.kind),
-        },
+        get_choice_column(
+            get_model_field(PrescriberOrganization, "kind"),
+            name="type_complet",
+            choices=PrescriberOrganizationKind.choices,
+            comment="Type organisation (détaillé)",
+        ),
         {
             "name": "habilitée",
             "type": "boolean",
@@ -1,10 +1,8 @@
-from django.utils import timezone
-
 from itou.approvals.enums import ProlongationRequestStatus
 from itou.approvals.models import ProlongationRequest
 from itou.metabase.tables.utils import (
     MetabaseTable,
-    get_choice,
+    get_choice_column,
     get_column_from_field,
     get_common_prolongation_columns,
     get_model_field,
@@ -26,24 +24,24 @@ TABLE.add_columns(
             # - https://stackoverflow.com/questions/25944968/check-if-a-onetoone-relation-exists-in-django
             "fn": lambda o: o.prolongation.pk if hasattr(o, "prolongation") else None,
         },
-        {
-            "name": "état",
-            "type": "varchar",
-            "comment": "Etat de la demande",
-            "fn": lambda o: get_choice(choices=ProlongationRequestStatus.choices, key=o.status),
-        },
+        get_choice_column(
+            get_model_field(ProlongationRequest, "status"),
+            name="état",
+            choices=ProlongationRequestStatus.choices,
+            comment="Etat de la demande",
+        ),
         {
             "name": "motif_de_refus",
             "type": "varchar",
             "comment": "Motif de refus de la demande",
             "fn": lambda o: o.deny_information.reason if hasattr(o, "deny_information") else None,
         },
-        {
-            "name": "date_de_demande",
-            "type": "date",
-            "comment": "Date de la demande",
-            "fn": lambda o: timezone.localdate(o.created_at),
-        },
+        get_column_from_field(
+            get_model_field(ProlongationRequest, "created_at"),
+            name="date_de_demande",
+            comment="Date de la demande",
+            field_type="date",
+        ),
         get_column_from_field(get_model_field(ProlongationRequest, "processed_at"), name="date_traitement"),
         get_column_from_field(get_model_field(ProlongationRequest, "processed_by"), name="id_utilisateur_traitant"),
         get_column_from_field(get_model_field(ProlongationRequest, "reminder_sent_at"), name="date_envoi_rappel"),
@@ -1,5 +1,3 @@
-from django.utils import timezone
-
 from itou.approvals.models import Prolongation
 from itou.metabase.tables.utils import (
     MetabaseTable,
@@ -14,12 +12,12 @@ TABLE.add_columns(
     get_common_prolongation_columns(model=Prolongation)
     + [
         get_column_from_field(get_model_field(Prolongation, "validated_by"), name="id_utilisateur_prescripteur"),
-        {
-            "name": "date_de_création",
-            "type": "date",
-            "comment": "Date de création",
-            "fn": lambda o: timezone.localdate(o.created_at),
-        },
+        get_column_from_field(
+            get_model_field(Prolongation, "created_at"),
+            name="date_de_création",
+            comment="Date de création",
+            field_type="date",
+        ),
         get_column_from_field(get_model_field(Prolongation, "request"), name="id_demande_de_prolongation"),
     ]
 )
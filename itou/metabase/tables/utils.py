@@ -1,10 +1,7 @@
-import difflib
 import functools
 import hashlib
-from collections import defaultdict
 from operator import attrgetter
 
-import unidecode
 from django.conf import settings
 from django.db.models import JSONField
 from django.db.models.fields import (
@@ -22,7 +19,7 @@ from django.utils import timezone
 
 from itou.approvals.enums import Origin, ProlongationReason
 from itou.approvals.models import Approval
-from itou.cities.models import City
+from itou.cities.utils import CityResolver
 from itou.common_apps.address.departments import DEPARTMENT_TO_REGION, DEPARTMENTS
 from itou.common_apps.address.models import BAN_API_RELIANCE_SCORE, AddressMixin
 from itou.geo.enums import ZRRStatus
@@ -31,6 +28,15 @@ from itou.users.models import User
 
 
 class MetabaseTable:
+    """
+    Columns are dicts with a `name`, a `type`, a `comment` and a row-wise `fn`.
+
+    Columns built from a model field also declare the `field` they read (an ORM lookup, or None for
+    constant columns) and either an optional per-value `transform` or a `column_transform` taking
+    the list of values of a whole chunk. They are computed column by column, and tables made only
+    of such columns are fetched with `values_list()` instead of model instances.
+    """
+
     def __init__(self, name):
         self.name = name
         self.columns = []
@@ -45,6 +51,14 @@ class MetabaseTable:
         return fn(input)
 
 
+def get_lookup_value(obj, lookup):
+    for attr in lookup.split("__"):
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
 def get_model_field(model, name):
     if name == "pk":
         return model._meta.pk
@@ -84,7 +98,8 @@ def get_column_from_field(field, name, *, comment=None, field_type=None):
         "name": name,
         "type": field_type or get_field_type_from_field(field),
         "comment": comment or str(field.verbose_name),  # Force str() to handle _() lazyness
-        "fn": attrgetter(f"{field.name}_id" if isinstance(field, ForeignKey) else field.name),
+        "fn": attrgetter(field.attname),
+        "field": field.attname,
     }
 
 
@@ -94,7 +109,54 @@ def get_choice(choices, key):
     return dict(choices)[key]
 
 
-def get_department_and_region_columns(name_suffix="", comment_suffix="", custom_fn=lambda o: o):
+def get_choice_transform(choices):
+    choices = dict(choices)
+    return lambda key: None if key is None else choices[key]
+
+
+def get_choice_column(field, name, *, choices, comment):
+    """
+    Human readable label of a choice field.
+    """
+    transform = get_choice_transform(choices)
+    return {
+        "name": name,
+        "type": "varchar",
+        "comment": comment,
+        "fn": lambda o: transform(getattr(o, field.attname)),
+        "field": field.attname,
+        "transform": transform,
+    }
+
+
+def get_department_and_region_columns(name_suffix="", comment_suffix="", custom_fn=None):
+    if custom_fn is None:
+        # Read the `department` field of the row itself, which allows column-wise evaluation.
+        return [
+            {
+                "name": f"département{name_suffix}",
+                "type": "varchar",
+                "comment": f"Département{comment_suffix}",
+                "fn": lambda o: getattr(o, "department", None),
+                "field": "department",
+            },
+            {
+                "name": f"nom_département{name_suffix}",
+                "type": "varchar",
+                "comment": f"Nom complet du département{comment_suffix}",
+                "fn": lambda o: DEPARTMENTS.get(getattr(o, "department", None)),
+                "field": "department",
+                "transform": DEPARTMENTS.get,
+            },
+            {
+                "name": f"région{name_suffix}",
+                "type": "varchar",
+                "comment": f"Région{comment_suffix}",
+                "fn": lambda o: DEPARTMENT_TO_REGION.get(getattr(o, "department", None)),
+                "field": "department",
+                "transform": DEPARTMENT_TO_REGION.get,
+            },
+        ]
     return [
         {
             "name": f"département{name_suffix}",
@@ -118,29 +180,18 @@ def get_department_and_region_columns(name_suffix="", comment_suffix="", custom_
 
 
 @functools.cache
-def get_post_code_to_insee_cities_map():
+def get_city_resolver():
     """
     Load once and for all this ~35k items dataset in memory.
     """
-    post_code_to_insee_cities_map = defaultdict(list)
-    for city in City.objects.only("post_codes", "code_insee", "name"):
-        for post_code in city.post_codes:
-            post_code_to_insee_cities_map[post_code].append(city)
-    return post_code_to_insee_cities_map
+    return CityResolver()
 
 
 def get_code_commune(obj: AddressMixin):
     if obj.insee_city:
         return obj.insee_city.code_insee
-    cities = get_post_code_to_insee_cities_map().get(obj.post_code)
-    if not cities:
-        return None
-    if len(cities) == 1:
-        return cities[0].code_insee
-
-    possibilities = {unidecode.unidecode(city.name).lower(): city for city in cities}
-    matches = difflib.get_close_matches(unidecode.unidecode(obj.city).lower(), possibilities, n=1, cutoff=0.0)
-    return possibilities[matches[0]].code_insee
+    city = get_city_resolver().resolve(obj.post_code, obj.city)
+    return city.code_insee if city else None
 
 
 @functools.cache
@@ -213,7 +264,7 @@ def get_address_columns(name_suffix="", comment_suffix="", custom_fn=lambda o: o
                 "fn": lambda o: custom_fn(o).latitude,
             },
         ]
-        + get_department_and_region_columns(name_suffix, comment_suffix, custom_fn)
+        + get_department_and_region_columns(name_suffix, comment_suffix, custom_fn=custom_fn)
     )
 
 
@@ -274,18 +325,59 @@ def hash_content(content):
     return hashlib.sha256(f"{content}{settings.PILOTAGE_DATA_HASH_SALT}".encode()).hexdigest()
 
 
+def hash_contents(contents, *, keep_empty=False):
+    """
+    Batch version of hash_content(), each distinct value is only hashed once.
+
+    Empty values are hashed like any other value (e.g. `None` is hashed as "None"),
+    unless `keep_empty` is set, in which case they are returned as None.
+    """
+    # The salt is a suffix so it can't be pre-fed to a hash object, but it can be encoded once.
+    salt = f"{settings.PILOTAGE_DATA_HASH_SALT}".encode()
+    digests = {}
+    hashes = []
+    for content in contents:
+        if keep_empty and not content:
+            hashes.append(None)
+            continue
+        content = f"{content}"
+        try:
+            digest = digests[content]
+        except KeyError:
+            digest = digests[content] = hashlib.sha256(content.encode() + salt).hexdigest()
+        hashes.append(digest)
+    return hashes
+
+
+def get_hash_column(field, name, *, comment, lookup=None):
+    """
+    Obfuscated version of a field, NULL values stay NULL.
+
+    `lookup` allows to read the field through a relation, e.g. `jobseeker_profile__nir`.
+    """
+    lookup = lookup or field.attname
+    return {
+        "name": name,
+        "type": "varchar",
+        "comment": comment,
+        "fn": lambda o: hash_content(value) if (value := get_lookup_value(o, lookup)) else None,
+        "field": lookup,
+        "column_transform": functools.partial(hash_contents, keep_empty=True),
+    }
+
+
 def get_common_prolongation_columns(model):
     return [
         get_column_from_field(get_model_field(model, "pk"), name="id"),
         get_column_from_field(get_model_field(model, "approval"), name="id_pass_agrément"),
         get_column_from_field(get_model_field(model, "start_at"), name="date_début"),
         get_column_from_field(get_model_field(model, "end_at"), name="date_fin"),
-        {
-            "name": "motif",
-            "type": "varchar",
-            "comment": "Motif renseigné",
-            "fn": lambda o: get_choice(choices=ProlongationReason.choices, key=o.reason),
-        },
+        get_choice_column(
+            get_model_field(model, "reason"),
+            name="motif",
+            choices=ProlongationReason.choices,
+            comment="Motif renseigné",
+        ),
         # Do not inject `reason_explanation` as it contains highly sensitive personal information in practice.
         get_column_from_field(get_model_field(model, "declared_by"), name="id_utilisateur_déclarant"),
         get_column_from_field(get_model_field(model, "declared_by_siae"), name="id_structure_déclarante"),
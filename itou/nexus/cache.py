@@ -0,0 +1,52 @@
+from django.core.cache import caches
+
+from itou.utils.cache import bump_cache_version, get_cache_version
+
+
+DROPDOWN_STATUS_VERSION_KEY = "nexus-dropdown-status-version"
+# Changes of the emplois users (identity provider, deactivation) don't invalidate the statuses, keep them short-lived.
+DROPDOWN_STATUS_TIMEOUT = 10 * 60
+
+
+def _dropdown_status_key(version, email):
+    # Emails are case insensitive in the nexus tables.
+    return f"nexus-dropdown-status-{version}-{email.lower()}"
+
+
+def get_dropdown_statuses(emails):
+    """
+    Return the current version of the dropdown statuses and the statuses cached
+    for this version, by email. Missing emails have to be computed from the database.
+    """
+    cache = caches["failsafe"]
+    version = get_cache_version(DROPDOWN_STATUS_VERSION_KEY)
+    keys = {_dropdown_status_key(version, email): email for email in emails}
+    cached = cache.get_many(keys)
+    if not isinstance(cached, dict):
+        # The failsafe client returns a sentinel when redis is unavailable.
+        cached = {}
+    return version, {keys[key]: status for key, status in cached.items()}
+
+
+def set_dropdown_statuses(version, statuses):
+    caches["failsafe"].set_many(
+        {_dropdown_status_key(version, email): status for email, status in statuses.items()},
+        DROPDOWN_STATUS_TIMEOUT,
+    )
+
+
+def invalidate_dropdown_statuses():
+    # A full sync changes the threshold of a whole service: changing the version makes every status stale.
+    bump_cache_version(DROPDOWN_STATUS_VERSION_KEY)
+
+
+def invalidate_email_dropdown_statuses(*emails):
+    cache = caches["failsafe"]
+    version = cache.get(DROPDOWN_STATUS_VERSION_KEY)
+    if version is not None:
+        cache.delete_many([_dropdown_status_key(version, email) for email in emails])
+
+
+def invalidate_dropdown_status_on_login(sender, request, user, **kwargs):
+    # Logging in again always computes the status from the database.
+    invalidate_email_dropdown_statuses(user.email)
@@ -1,6 +1,7 @@
 from django.urls import reverse
 from itoutils.django.nexus.middleware import BaseAutoLoginMiddleware
 
+from itou.nexus import cache as nexus_cache
 from itou.nexus.utils import dropdown_status
 from itou.users.enums import UserKind
 from itou.users.models import User
@@ -35,5 +36,10 @@ class DropDownMiddleware:
     def __call__(self, request):
         request.nexus_dropdown = {}
         if self.must_load_dropdown(request):
-            request.nexus_dropdown = dropdown_status(user=request.user)
+            email = request.user.email
+            version, statuses = nexus_cache.get_dropdown_statuses([email])
+            if email not in statuses:
+                statuses[email] = dropdown_status(user=request.user)
+                nexus_cache.set_dropdown_statuses(version, statuses)
+            request.nexus_dropdown = statuses[email]
         return self.get_response(request)
@@ -7,6 +7,7 @@ from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from itou.common_apps.address.models import AddressMixin
+from itou.nexus.cache import invalidate_email_dropdown_statuses
 from itou.nexus.enums import Auth, NexusStructureKind, NexusUserKind, Role, Service
 from itou.users.models import User
 from itou.utils.validators import validate_siret
@@ -162,6 +163,7 @@ class NexusRessourceSyncStatus(models.Model):
 class ActivatedServiceManager(models.Manager):
     def activate(self, user, service):
         ActivatedService.objects.bulk_create([ActivatedService(user=user, service=service)], ignore_conflicts=True)
+        invalidate_email_dropdown_statuses(user.email)
 
 
 class ActivatedService(models.Model):
@@ -1,5 +1,6 @@
 from django.utils import timezone
 
+from itou.nexus import cache as nexus_cache
 from itou.nexus.enums import STRUCTURE_KIND_MAPPING, USER_KIND_MAPPING, Auth, Service
 from itou.nexus.models import ActivatedService, NexusMembership, NexusRessourceSyncStatus, NexusStructure, NexusUser
 from itou.users.enums import IdentityProvider, UserKind
@@ -42,17 +43,42 @@ def get_service_users(*, email=None, user=None):
     return service_users
 
 
-def dropdown_status(*, email=None, user=None):
-    assert (email is None) ^ (user is None), "One and only one of email and user is required"
-    service_users = get_service_users(email=email, user=user)
-    email = email or user.email
-
+def build_dropdown_status(service_users):
     return {
         "proconnect": Auth.PRO_CONNECT in {user.auth for user in service_users},
         "activated_services": sorted([user.source for user in service_users]),
     }
 
 
+def dropdown_status(*, email=None, user=None):
+    assert (email is None) ^ (user is None), "One and only one of email and user is required"
+    return build_dropdown_status(get_service_users(email=email, user=user))
+
+
+def dropdown_status_many(emails):
+    """
+    Return the dropdown status of each email, reading them from the cache
+    and computing the missing ones with a constant number of queries.
+    """
+    version, statuses = nexus_cache.get_dropdown_statuses(emails)
+    missing_emails = [email for email in emails if email not in statuses]
+    if missing_emails:
+        service_users = {email.lower(): [] for email in missing_emails}
+        for nexus_user in NexusUser.objects.filter(email__in=missing_emails):
+            service_users[nexus_user.email.lower()].append(nexus_user)
+        for user in User.objects.filter(
+            email__in=missing_emails, is_active=True, kind=UserKind.PROFESSIONAL
+        ).prefetch_related("activated_services"):
+            user_data = serialize_user(user)
+            service_users[user.email.lower()].append(build_user(user_data, Service.EMPLOIS))
+            for activated_service in user.activated_services.all():
+                service_users[user.email.lower()].append(build_user(user_data, activated_service.service))
+        computed_statuses = {email: build_dropdown_status(service_users[email.lower()]) for email in missing_emails}
+        nexus_cache.set_dropdown_statuses(version, computed_statuses)
+        statuses |= computed_statuses
+    return {email: statuses[email] for email in emails}
+
+
 # ------------------------------------------------
 # Sync utils
 
@@ -68,11 +94,15 @@ def init_full_sync(service):
 
 
 def complete_full_sync(service, started_at):
-    return bool(
+    completed = bool(
         NexusRessourceSyncStatus.objects.filter(service=service, in_progress_since=started_at).update(
             in_progress_since=None, valid_since=started_at
         )
     )
+    if completed:
+        # The users not synced since started_at are now ignored
+        nexus_cache.invalidate_dropdown_statuses()
+    return completed
 
 
 def serialize_user(user):
@@ -114,14 +144,15 @@ def sync_users(nexus_users):
         "auth",
         "updated_at",
     ]
-    return len(
-        NexusUser.objects.bulk_create(
-            nexus_users,
-            update_conflicts=True,
-            update_fields=update_fields,
-            unique_fields=["id"],
-        )
+    synced_users = NexusUser.objects.bulk_create(
+        nexus_users,
+        update_conflicts=True,
+        update_fields=update_fields,
+        unique_fields=["id"],
     )
+    # The previous email of an updated user is not known: its status expires with the timeout
+    nexus_cache.invalidate_email_dropdown_statuses(*[user.email for user in synced_users])
+    return len(synced_users)
 
 
 def build_membership(membership_data, service):
@@ -11,6 +11,7 @@ from unittest import mock
 from dateutil.relativedelta import relativedelta
 from django.contrib.postgres.aggregates import ArrayAgg
 from django.db import transaction
+from django.db.models import Value
 from django.test import override_settings
 from django.utils import timezone
 
@@ -146,17 +147,19 @@ def load_data():
         create_campaigns_and_calendar(evaluated_period_start_at, evaluated_period_end_at, adversarial_stage_start)
         evaluation_campaign = EvaluationCampaign.objects.get(institution=institution)
 
-        # eligible_job_applications must return a queryset, not a list.
+        eligible_job_applications = job_applications.annotate(
+            evaluation_campaign_id=Value(evaluation_campaign.pk)
+        ).order_by("pk")
         with (
             mock.patch(
-                "itou.siae_evaluations.models.EvaluationCampaign.eligible_job_applications",
-                return_value=job_applications,
+                "itou.siae_evaluations.models.campaigns_eligible_job_applications",
+                return_value=eligible_job_applications,
             ),
             mock.patch(
                 "itou.siae_evaluations.enums.EvaluationJobApplicationsBoundariesNumber.SELECTION_PERCENTAGE", 100
             ),
             mock.patch(
-                "itou.siae_evaluations.models.EvaluationCampaign.number_of_siaes_to_select",
+                "itou.siae_evaluations.models.siaes_to_select_count",
                 return_value=controlled_siaes.count(),
             ),
         ):
@@ -1,11 +1,18 @@
+import collections
 import datetime
+import functools
+import logging
+import operator
+import random
+import secrets
 from pathlib import Path
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models, transaction
-from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q
+from django.db.models import Case, Count, Exists, F, OuterRef, Prefetch, Q, Value, When, prefetch_related_objects
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.functional import cached_property
 
@@ -25,14 +32,15 @@ from itou.utils.models import InclusiveDateRangeField, check_nullable_date_order
 from itou.utils.validators import validate_html
 
 
-def select_min_max_job_applications(job_applications):
+logger = logging.getLogger(__name__)
+
+
+def select_min_max_job_applications(job_applications, rng):
     # select SELECTION_PERCENTAGE % max, within bounds
     # minimum MIN job_applications, maximum MAX job_applications
 
     limit = int(
-        job_applications.count()
-        * evaluation_enums.EvaluationJobApplicationsBoundariesNumber.SELECTION_PERCENTAGE
-        / 100
+        len(job_applications) * evaluation_enums.EvaluationJobApplicationsBoundariesNumber.SELECTION_PERCENTAGE / 100
     )
 
     if limit < evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MIN:
@@ -40,7 +48,160 @@ def select_min_max_job_applications(job_applications):
     elif limit > evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MAX:
         limit = evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MAX
 
-    return job_applications.order_by("?")[:limit]
+    return rng.sample(job_applications, min(limit, len(job_applications)))
+
+
+def siaes_to_select_count(eligible_count, chosen_percent):
+    if eligible_count:
+        return max(round(eligible_count * chosen_percent / 100), 1)
+    return 0
+
+
+def evaluable_job_applications(**filters):
+    # accepted job_applications with self-approval made by hiring siae.
+    return (
+        JobApplication.objects.exclude(approval=None)
+        .select_related("approval", "to_company", "eligibility_diagnosis", "eligibility_diagnosis__author_siae")
+        .filter(
+            to_company__kind__in=evaluation_enums.EvaluationSiaesKind.Evaluable,
+            state=JobApplicationState.ACCEPTED,
+            eligibility_diagnosis__author_kind=KIND_EMPLOYER,
+            eligibility_diagnosis__author_siae=F("to_company"),
+            # The job application must have created the approval.
+            approval__start_at=F("hiring_start_at"),
+            approval__number__startswith=settings.ASP_ITOU_PREFIX,
+            **filters,
+        )
+    )
+
+
+def campaigns_eligible_job_applications(campaigns):
+    """
+    The eligible job applications of all the campaigns, fetched at once and
+    annotated with the `evaluation_campaign_id` they are eligible to.
+    """
+    campaign_filters = {campaign.pk: Q(**campaign.eligible_job_applications_filters()) for campaign in campaigns}
+    return (
+        evaluable_job_applications()
+        .filter(functools.reduce(operator.or_, campaign_filters.values()))
+        .annotate(
+            evaluation_campaign_id=Case(
+                *(When(campaign_filter, then=pk) for pk, campaign_filter in campaign_filters.items()),
+                output_field=models.IntegerField(),
+            )
+        )
+        # The selection must only depend on the seed: sort the candidates.
+        .order_by("pk")
+    )
+
+
+def populate_campaigns(campaigns, set_at, seed=None):
+    """
+    Select the SIAEs and the job applications to evaluate for all the campaigns at once.
+
+    The eligible job applications are loaded in a single query and the selection is drawn in
+    memory with a random generator initialized with `seed`: with the same data, the same seed
+    gives the same selection. The seed is logged, to be able to replay a selection.
+    """
+    if not campaigns:
+        return
+    if seed is None:
+        seed = secrets.randbits(64)
+    logger.info("Populating evaluation campaigns=%s with seed=%d", [campaign.pk for campaign in campaigns], seed)
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        # Also guards against a concurrent population of the same campaigns.
+        updated = EvaluationCampaign.objects.filter(
+            pk__in=[campaign.pk for campaign in campaigns], evaluations_asked_at=None
+        ).update(percent_set_at=Coalesce("percent_set_at", Value(set_at)), evaluations_asked_at=set_at)
+        if updated != len(campaigns):
+            raise CampaignAlreadyPopulatedException()
+        for campaign in campaigns:
+            if not campaign.percent_set_at:
+                campaign.percent_set_at = set_at
+            campaign.evaluations_asked_at = set_at
+
+        campaign_siae_job_applications = collections.defaultdict(lambda: collections.defaultdict(list))
+        for job_application in campaigns_eligible_job_applications(campaigns):
+            campaign_siae_job_applications[job_application.evaluation_campaign_id][
+                job_application.to_company_id
+            ].append(job_application)
+
+        evaluated_siaes = []
+        selected_job_applications = []
+        for campaign in sorted(campaigns, key=lambda campaign: campaign.pk):
+            siae_job_applications = campaign_siae_job_applications[campaign.pk]
+            eligible_siae_ids = sorted(
+                siae_id
+                for siae_id, job_applications in siae_job_applications.items()
+                if len(job_applications) >= evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MIN
+            )
+            for siae_id in sorted(
+                rng.sample(eligible_siae_ids, siaes_to_select_count(len(eligible_siae_ids), campaign.chosen_percent))
+            ):
+                evaluated_siae = EvaluatedSiae(evaluation_campaign=campaign, siae_id=siae_id)
+                evaluated_siaes.append(evaluated_siae)
+                selected_job_applications.extend(
+                    (evaluated_siae, job_application)
+                    for job_application in select_min_max_job_applications(siae_job_applications[siae_id], rng)
+                )
+        EvaluatedSiae.objects.bulk_create(evaluated_siaes)
+
+        prefetch_related_objects(
+            [job_application for _evaluated_siae, job_application in selected_job_applications],
+            Prefetch(
+                "eligibility_diagnosis__selected_administrative_criteria",
+                queryset=SelectedAdministrativeCriteria.objects.filter(certification_period__isempty=False),
+                to_attr="certified_administrative_criteria",
+            ),
+        )
+        evaluated_job_apps = []
+        criteria = []
+        for evaluated_siae, job_application in selected_job_applications:
+            evaluated_job_app = EvaluatedJobApplication(evaluated_siae=evaluated_siae, job_application=job_application)
+            evaluated_job_apps.append(evaluated_job_app)
+            for selected_criterion in job_application.eligibility_diagnosis.certified_administrative_criteria:
+                if job_application.hiring_start_at in selected_criterion.certification_period:
+                    criteria.append(
+                        EvaluatedAdministrativeCriteria(
+                            evaluated_job_application=evaluated_job_app,
+                            administrative_criteria=selected_criterion.administrative_criteria,
+                            uploaded_at=set_at,
+                            submitted_at=set_at,
+                            review_state=evaluation_enums.EvaluatedAdministrativeCriteriaState.ACCEPTED,
+                            criteria_certified=True,
+                        )
+                    )
+                # TODO: For the 2026 campaign on auto-prescriptions
+                # hires in 2025, this should be updated to handle
+                # LEVEL_2.
+                # Generating an accepted administrative criteria with
+                # level 2 will significantly break all views in this
+                # module. Many parts of it rely on the criteria state
+                # to decide what actions to offer, and the state of the
+                # evaluated job application.
+                assert selected_criterion.administrative_criteria.level == AdministrativeCriteriaLevel.LEVEL_1, (
+                    f"AdministrativeCriteria pk={selected_criterion.pk} has level "
+                    f"{selected_criterion.administrative_criteria.level}."
+                )
+        EvaluatedJobApplication.objects.bulk_create(evaluated_job_apps)
+        EvaluatedAdministrativeCriteria.objects.bulk_create(criteria)
+
+        evaluated_siaes = EvaluatedSiae.objects.filter(
+            pk__in=[evaluated_siae.pk for evaluated_siae in evaluated_siaes]
+        ).prefetch_related("evaluated_job_applications__evaluated_administrative_criteria")
+        emails = []
+        for evaluated_siae in evaluated_siaes:
+            if evaluated_siae.state == evaluation_enums.EvaluatedSiaeState.ACCEPTED:
+                evaluated_siae.reviewed_at = set_at
+                evaluated_siae.final_reviewed_at = set_at
+                evaluated_siae.save(update_fields=["reviewed_at", "final_reviewed_at"])
+                emails.append(SIAEEmailFactory(evaluated_siae).accepted_from_certified_criteria())
+            else:
+                emails.append(SIAEEmailFactory(evaluated_siae).selected())
+        emails += [CampaignEmailFactory(campaign).selected_siae() for campaign in campaigns]
+        send_email_messages(emails)
 
 
 def validate_institution(institution_id):
@@ -131,6 +292,9 @@ class EvaluationCampaignQuerySet(models.QuerySet):
     def in_progress(self):
         return self.filter(self.in_progress_q)
 
+    def populate(self, set_at, seed=None):
+        populate_campaigns(list(self.select_related("institution")), set_at, seed=seed)
+
     def viewable(self):
         recent_q = Q(ended_at__gte=timezone.now() - CAMPAIGN_VIEWABLE_DURATION)
         return (
@@ -214,24 +378,15 @@ class EvaluationCampaign(models.Model):
         if self.evaluated_period_end_at <= self.evaluated_period_start_at:
             raise ValidationError("La date de début de la période contrôlée doit être antérieure à sa date de fin.")
 
+    def eligible_job_applications_filters(self):
+        return {
+            "to_company__department": self.institution.department,
+            "hiring_start_at__gte": self.evaluated_period_start_at,
+            "hiring_start_at__lte": self.evaluated_period_end_at,
+        }
+
     def eligible_job_applications(self):
-        # accepted job_applications with self-approval made by hiring siae.
-        return (
-            JobApplication.objects.exclude(approval=None)
-            .select_related("approval", "to_company", "eligibility_diagnosis", "eligibility_diagnosis__author_siae")
-            .filter(
-                to_company__department=self.institution.department,
-                to_company__kind__in=evaluation_enums.EvaluationSiaesKind.Evaluable,
-                state=JobApplicationState.ACCEPTED,
-                eligibility_diagnosis__author_kind=KIND_EMPLOYER,
-                eligibility_diagnosis__author_siae=F("to_company"),
-                # The job application must have created the approval.
-                approval__start_at=F("hiring_start_at"),
-                hiring_start_at__gte=self.evaluated_period_start_at,
-                hiring_start_at__lte=self.evaluated_period_end_at,
-                approval__number__startswith=settings.ASP_ITOU_PREFIX,
-            )
-        )
+        return evaluable_job_applications(**self.eligible_job_applications_filters())
 
     def eligible_siaes(self):
         return (
@@ -242,92 +397,12 @@ class EvaluationCampaign(models.Model):
         )
 
     def number_of_siaes_to_select(self):
-        eligible_count = self.eligible_siaes().count()
-        if eligible_count:
-            return max(round(eligible_count * self.chosen_percent / 100), 1)
-        return 0
+        return siaes_to_select_count(self.eligible_siaes().count(), self.chosen_percent)
 
-    def eligible_siaes_under_ratio(self):
-        return (
-            self.eligible_siaes()
-            .values_list("to_company", flat=True)
-            .order_by("?")[: self.number_of_siaes_to_select()]
-        )
-
-    def populate(self, set_at):
+    def populate(self, set_at, seed=None):
         if self.evaluations_asked_at:
             raise CampaignAlreadyPopulatedException()
-
-        with transaction.atomic():
-            if not self.percent_set_at:
-                self.percent_set_at = set_at
-            self.evaluations_asked_at = set_at
-
-            self.save(update_fields=["percent_set_at", "evaluations_asked_at"])
-
-            evaluated_siaes = EvaluatedSiae.objects.bulk_create(
-                EvaluatedSiae(evaluation_campaign=self, siae_id=pk) for pk in self.eligible_siaes_under_ratio()
-            )
-
-            evaluated_siaes_pks = []
-            for evaluated_siae in evaluated_siaes:
-                evaluated_siaes_pks.append(evaluated_siae.pk)
-                for job_application in select_min_max_job_applications(
-                    self.eligible_job_applications().filter(to_company_id=evaluated_siae.siae_id)
-                ).prefetch_related(
-                    Prefetch(
-                        "eligibility_diagnosis__selected_administrative_criteria",
-                        queryset=SelectedAdministrativeCriteria.objects.filter(certification_period__isempty=False),
-                        to_attr="certified_administrative_criteria",
-                    )
-                ):
-                    evaluated_job_app = EvaluatedJobApplication.objects.create(
-                        evaluated_siae=evaluated_siae,
-                        job_application=job_application,
-                    )
-                    criteria = []
-                    for selected_criterion in job_application.eligibility_diagnosis.certified_administrative_criteria:
-                        if job_application.hiring_start_at in selected_criterion.certification_period:
-                            criteria.append(
-                                EvaluatedAdministrativeCriteria(
-                                    evaluated_job_application=evaluated_job_app,
-                                    administrative_criteria=selected_criterion.administrative_criteria,
-                                    uploaded_at=set_at,
-                                    submitted_at=set_at,
-                                    review_state=evaluation_enums.EvaluatedAdministrativeCriteriaState.ACCEPTED,
-                                    criteria_certified=True,
-                                )
-                            )
-                        # TODO: For the 2026 campaign on auto-prescriptions
-                        # hires in 2025, this should be updated to handle
-                        # LEVEL_2.
-                        # Generating an accepted administrative criteria with
-                        # level 2 will significantly break all views in this
-                        # module. Many parts of it rely on the criteria state
-                        # to decide what actions to offer, and the state of the
-                        # evaluated job application.
-                        assert (
-                            selected_criterion.administrative_criteria.level == AdministrativeCriteriaLevel.LEVEL_1
-                        ), (
-                            f"AdministrativeCriteria pk={selected_criterion.pk} has level "
-                            f"{selected_criterion.administrative_criteria.level}."
-                        )
-                    EvaluatedAdministrativeCriteria.objects.bulk_create(criteria)
-
-            evaluated_siaes = EvaluatedSiae.objects.filter(pk__in=evaluated_siaes_pks).prefetch_related(
-                "evaluated_job_applications__evaluated_administrative_criteria"
-            )
-            emails = []
-            for evaluated_siae in evaluated_siaes:
-                if evaluated_siae.state == evaluation_enums.EvaluatedSiaeState.ACCEPTED:
-                    evaluated_siae.reviewed_at = set_at
-                    evaluated_siae.final_reviewed_at = set_at
-                    evaluated_siae.save(update_fields=["reviewed_at", "final_reviewed_at"])
-                    emails.append(SIAEEmailFactory(evaluated_siae).accepted_from_certified_criteria())
-                else:
-                    emails.append(SIAEEmailFactory(evaluated_siae).selected())
-            emails += [CampaignEmailFactory(self).selected_siae()]
-            send_email_messages(emails)
+        populate_campaigns([self], set_at, seed=seed)
 
     def freeze(self, freeze_at):
         EvaluatedSiae.objects.filter(evaluation_campaign=self, submission_freezed_at__isnull=True).update(
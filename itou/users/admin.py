@@ -25,6 +25,7 @@ from django.utils.text import Truncator
 
 from itou.approvals.models import Approval
 from itou.common_apps.address.models import BAN_API_RELIANCE_SCORE
+from itou.common_apps.organizations.cache import invalidate_user_membership_context
 from itou.communications.models import NotificationSettings
 from itou.companies.models import CompanyMembership
 from itou.eligibility.models import EligibilityDiagnosis, GEIQEligibilityDiagnosis
@@ -783,6 +784,7 @@ class ItouUserAdmin(InconsistencyCheckMixin, CreatedOrUpdatedByMixin, ItouModelM
         InstitutionMembership.objects.filter(user=user).update(
             is_active=False, is_admin=False, updated_by=request.user, updated_at=now
         )
+        invalidate_user_membership_context(user.pk)
 
         user.email = f"{user.email}_old"
         user.username = f"old_{user.username}"
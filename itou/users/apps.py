@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_in
+
+from itou.common_apps.organizations.cache import invalidate_user_membership_context_on_login
+from itou.nexus.cache import invalidate_dropdown_status_on_login
 
 
 class UsersAppConfig(AppConfig):
     name = "itou.users"
     verbose_name = "Utilisateurs"
+
+    def ready(self):
+        super().ready()
+        # The contexts cached per user by the middlewares are refreshed when the user logs in.
+        user_logged_in.connect(invalidate_user_membership_context_on_login)
+        user_logged_in.connect(invalidate_dropdown_status_on_login)
@@ -1,6 +1,7 @@
 from django.db import transaction
 from django.db.models import Exists, OuterRef, Prefetch
 
+from itou.common_apps.organizations.cache import invalidate_user_membership_context
 from itou.companies.models import Company, CompanyMembership
 from itou.utils.command import BaseCommand
 
@@ -50,6 +51,7 @@ class Command(BaseCommand):
                 for membership in to_promote:
                     membership.is_admin = True
                 CompanyMembership.objects.bulk_update(to_promote, ["is_admin", "updated_at"])
+                invalidate_user_membership_context(*(membership.user_id for membership in to_promote))
                 for membership in to_promote:
                     company.auto_admin_attribution_email(membership.user).send()
                     self.logger.info(
@@ -3,6 +3,7 @@ import enum
 import json
 import logging
 import re
+import threading
 import time
 from typing import TYPE_CHECKING
 
@@ -117,6 +118,65 @@ class PoleEmploiRateLimitException(PoleEmploiAPIException):
         self.retry_after = retry_after
 
 
+class RateLimiter:
+    """
+    Token bucket limiting the requests of the threads sharing a client to `rate` per second,
+    with bursts of at most `capacity` requests.
+
+    The rate adapts to the API: a rate limited response pauses every thread for the delay asked
+    by the API and halves the rate, down to `min_rate`. Each response which is not rate limited then
+    raises it by a fraction of the initial rate, which it never exceeds.
+    """
+
+    DECREASE_FACTOR = 0.5
+    # The rate gets back to the initial rate in at most this number of responses.
+    RECOVERY_REQUESTS = 20
+
+    def __init__(self, rate, capacity=1, min_rate=None):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = rate / 8 if min_rate is None else min_rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._updated_at:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    # Paused.
+                    wait = self._updated_at - now
+            time.sleep(wait)
+
+    def pause(self, retry_after):
+        try:
+            delay = int(retry_after)
+        except ValueError:
+            logger.info("Invalid Retry-After header %s.", retry_after)
+            delay = 60
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._updated_at:
+                # The concurrent requests rate limited during a pause only decrease the rate once.
+                self.rate = max(self.min_rate, self.rate * self.DECREASE_FACTOR)
+            # No token is refilled until the pause ends.
+            self._tokens = 0
+            self._updated_at = max(self._updated_at, now + delay)
+
+    def recover(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / self.RECOVERY_REQUESTS)
+
+
 API_CLIENT_EMPTY_NIR_BAD_RESPONSE = "empty_nir"
 
 
@@ -161,6 +221,8 @@ class BasePoleEmploiApiClient:
         self.key = key
         self.secret = secret
         self._httpx_client = None
+        # Shared by the threads using this client, see `RateLimiter`.
+        self.rate_limiter = None
 
     def __enter__(self):
         self._httpx_client = httpx.Client().__enter__()
@@ -211,6 +273,8 @@ class BasePoleEmploiApiClient:
             if not token:
                 token = self._refresh_token()
 
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
             response = self._get_httpx_client().request(
                 method=method,
                 url=url,
@@ -225,7 +289,12 @@ class BasePoleEmploiApiClient:
             if response.status_code == 429:
                 logger.warning("Request on url=%s triggered rate limit", url)
                 # https://francetravail.io/produits-partages/documentation/utilisation-api-france-travail/erreurs-frequentes#:~:text=429 Too Many Requests  # noqa: E501
-                raise PoleEmploiRateLimitException(429, retry_after=response.headers.get("Retry-After", "60"))
+                retry_after = response.headers.get("Retry-After", "60")
+                if self.rate_limiter is not None:
+                    self.rate_limiter.pause(retry_after)
+                raise PoleEmploiRateLimitException(429, retry_after=retry_after)
+            if self.rate_limiter is not None:
+                self.rate_limiter.recover()
             if response.status_code not in (200, 206):
                 logger.warning("Request on url=%s returned status_code=%s", url, response.status_code)
                 try:
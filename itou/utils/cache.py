@@ -1,5 +1,7 @@
+import uuid
 from functools import wraps
 
+from django.core.cache import caches
 from django_redis.cache import CONNECTION_INTERRUPTED, RedisCache
 from django_redis.client import DefaultClient
 from django_redis.exceptions import ConnectionInterrupted
@@ -55,3 +57,17 @@ class UnclearableCache(RedisCache):
         # RedisCache calls FLUSHDB, which is not concerned with KEY_PREFIX.
         # That’s an issue for tests isolation.
         raise RuntimeError("Don’t clear the cache.")
+
+
+def get_cache_version(version_key):
+    """
+    Return the version included in the keys of a group of cache entries.
+
+    Changing the version with `bump_cache_version` makes every entry of the group
+    unreachable at once: the entries must be set with a timeout, so that they expire.
+    """
+    return caches["failsafe"].get_or_set(version_key, uuid.uuid4().hex, None)
+
+
+def bump_cache_version(version_key):
+    caches["failsafe"].set(version_key, uuid.uuid4().hex, None)
@@ -5,12 +5,17 @@ import io
 import openpyxl
 import xlsx_streaming
 from django import http
+from django.db.models import QuerySet
 from django.utils import timezone
 from django.utils.http import content_disposition_header
 
 from itou.www.itou_staff_views.export_utils import get_export_ts
 
 
+# Number of rows, and their prefetched objects, held in memory at once while streaming an export.
+EXPORT_CHUNK_SIZE = 1000
+
+
 class Format(enum.Enum):
     TEXT = "text"
     INTEGER = 1
@@ -43,13 +48,28 @@ def _generate_excel_template(headers, columns):
     return buffer
 
 
+def iter_in_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over the rows of an export without evaluating the whole queryset beforehand.
+
+    Querysets are read with a server-side cursor and their prefetch_related() lookups
+    are performed chunk by chunk, so the first rows can be written while the next
+    ones are fetched.
+    """
+    if isinstance(rows, QuerySet):
+        return rows.iterator(chunk_size=chunk_size)
+    return iter(rows)
+
+
 def to_streaming_response(queryset, filename, headers, serializer, with_time=False, columns=None):
     """Generate a HTTP Streaming response with a XLSX file"""
 
     xlsx_streaming.set_export_timezone(timezone.get_default_timezone())
     openxml_mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     template = _generate_excel_template(headers, columns=columns)
-    stream = xlsx_streaming.stream_queryset_as_xlsx(queryset, template, serializer=serializer)
+    stream = xlsx_streaming.stream_queryset_as_xlsx(
+        iter_in_chunks(queryset), template, serializer=serializer, batch_size=EXPORT_CHUNK_SIZE
+    )
     response = http.StreamingHttpResponse(stream, content_type=openxml_mimetype)
     if with_time:
         filename = f"{filename}_{get_export_ts()}"
@@ -1,5 +1,10 @@
+import hashlib
+
 from django.conf import settings
+from django.core.cache import caches
 from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
 
 
 class ItouPaginator(Paginator):
@@ -33,6 +38,64 @@ class ItouPage(Page):
         self.display_pager = total_pages > 1
 
 
+class KeysetPaginator(ItouPaginator):
+    """
+    Paginate an ordered queryset by seeking from the ordering keys of the previous page
+    instead of using an OFFSET, which gets slower the further you go in a big list.
+
+    The count and the cursors (the ordering keys of the last row of each page) are kept in
+    the cache under `cache_key`, which identifies the paginated list (e.g. the user and the
+    search filters): the client only sees page numbers. The first page always recomputes the
+    count and starts a new browsing, a page without a known cursor falls back to an OFFSET.
+
+    The queryset must be ordered by non-nullable fields or annotations, the last one being
+    unique (e.g. `pk`).
+    """
+
+    CACHE_TIMEOUT = 30 * 60
+
+    def __init__(self, object_list, per_page, *, cache_key, refresh=False, max_pages_num=10):
+        super().__init__(object_list, per_page, max_pages_num=max_pages_num)
+        ordering = object_list.query.order_by
+        if not ordering or not all(isinstance(field, str) for field in ordering):
+            raise ValueError("KeysetPaginator needs a queryset ordered by field names")
+        self.ordering = [(field.removeprefix("-"), field.startswith("-")) for field in ordering]
+        key_hash = hashlib.sha256(f"{per_page}-{ordering}-{cache_key}".encode()).hexdigest()
+        self.cache_key = f"keyset-paginator-{key_hash}"
+        self.state = None if refresh else caches["failsafe"].get(self.cache_key)
+        if self.state is None:
+            self.state = {"count": None, "cursors": {}}
+
+    @cached_property
+    def count(self):
+        if self.state["count"] is None:
+            self.state["count"] = super().count
+        return self.state["count"]
+
+    def _seek_filter(self, cursor):
+        # (a, b) > (x, y) is expanded to a > x OR (a = x AND b > y) to support mixed directions.
+        seek_filter = Q()
+        for i, (field, descending) in enumerate(self.ordering):
+            equal_keys = {previous_field: value for (previous_field, _), value in zip(self.ordering[:i], cursor)}
+            seek_filter |= Q(**equal_keys, **{f"{field}__{'lt' if descending else 'gt'}": cursor[i]})
+        return seek_filter
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        if cursor := self.state["cursors"].get(number):
+            object_list = list(self.object_list.filter(self._seek_filter(cursor))[: top - bottom])
+        else:
+            object_list = list(self.object_list[bottom:top])
+        if object_list and number < self.num_pages:
+            self.state["cursors"][number + 1] = [getattr(object_list[-1], field) for field, _ in self.ordering]
+        caches["failsafe"].set(self.cache_key, self.state, self.CACHE_TIMEOUT)
+        return self._get_page(object_list, number, self)
+
+
 def pager(queryset, page, items_per_page=settings.PAGE_SIZE_SMALL, pages_num=10):
     """
     A generic pager built on top of Django core's Paginator.
@@ -63,3 +126,27 @@ def pager(queryset, page, items_per_page=settings.PAGE_SIZE_SMALL, pages_num=10)
     except (EmptyPage, InvalidPage):
         # If page request is out of range, deliver last page of results.
         return paginator.page(total_pages)
+
+
+def keyset_pager(queryset, page, cache_key, items_per_page=settings.PAGE_SIZE_SMALL, pages_num=10):
+    """
+    Same as `pager()`, with a KeysetPaginator: use it for big lists where the OFFSET of deep pages
+    gets slow. `cache_key` identifies the paginated list, the same key must be given when browsing
+    its pages.
+    """
+    try:
+        page = int(page)
+    except (ValueError, TypeError):
+        page = 1
+
+    # The first page starts a new browsing with a fresh count.
+    paginator = KeysetPaginator(
+        queryset, items_per_page, cache_key=cache_key, refresh=page <= 1, max_pages_num=pages_num
+    )
+    total_pages = paginator.num_pages
+
+    try:
+        return paginator.page(page)
+    except (EmptyPage, InvalidPage):
+        # If page request is out of range, deliver last page of results.
+        return paginator.page(total_pages)
@@ -6,6 +6,7 @@ from django.http import HttpResponseRedirect
 from django.urls import reverse
 from itoutils.urls import add_url_params
 
+from itou.common_apps.organizations.cache import get_membership_context, set_membership_context
 from itou.companies.models import Company, CompanyMembership
 from itou.institutions.models import Institution, InstitutionMembership
 from itou.otp.utils import get_user_devices, require_otp
@@ -19,23 +20,20 @@ from itou.www.logout.enums import LogoutWarning
 logger = logging.getLogger(__name__)
 
 
-def extract_membership_infos_and_update_session(
-    company_memberships,
-    prescriber_memberships,
-    institution_memberships,
-    session,
-):
+def extract_membership_infos_and_update_session(organizations, session):
+    """
+    organizations are (organization, is_admin) pairs, in the order of the memberships.
+    """
     current_org_key = session.get(global_constants.ITOU_SESSION_CURRENT_ORGANIZATION_KEY)
 
     orgs = []
     current_org = None
     admin_status = {}
-    for membership in company_memberships + prescriber_memberships + institution_memberships:
-        org = membership.get_organization()
+    for org, is_admin in organizations:
         orgs.append(org)
         if org.organization_switch_key == current_org_key:
             current_org = org
-        admin_status[org.organization_switch_key] = membership.is_admin
+        admin_status[org.organization_switch_key] = is_admin
     if current_org is None:
         if orgs:
             # If an org exists, choose the first one
@@ -72,7 +70,8 @@ def get_active_company_memberships(user):
     # If there is no current company, we want to default to the first active one
     # (and preferably not one in grace period)
     active_memberships.sort(key=lambda m: (m.company.has_convention_in_grace_period, m.joined_at))
-    return active_memberships
+    # All the memberships are returned for the membership context: the companies may become active again.
+    return active_memberships, memberships
 
 
 def get_active_prescriber_memberships(user):
@@ -95,6 +94,44 @@ def get_active_institution_memberships(user):
     )
 
 
+def build_membership_context(company_memberships, prescriber_memberships, institution_memberships):
+    """
+    Only the IDs of the organizations and the admin flags are cached, the organizations
+    are retrieved on every request so that they are never stale.
+    """
+    return (
+        [(m.company_id, m.is_admin) for m in sorted(company_memberships, key=lambda m: m.joined_at)],
+        [(m.organization_id, m.is_admin) for m in prescriber_memberships],
+        [(m.institution_id, m.is_admin) for m in institution_memberships],
+    )
+
+
+def _get_membership_context_organizations(queryset, memberships):
+    if not memberships:
+        return []
+    organizations = queryset.in_bulk([pk for pk, _is_admin in memberships])
+    # Organizations which are not returned anymore (e.g. a company at the end of its grace period) are skipped.
+    return [(organizations[pk], is_admin) for pk, is_admin in memberships if pk in organizations]
+
+
+def get_membership_context_organizations(context):
+    """
+    Return the organizations of the cached membership context as (organization, is_admin) pairs,
+    in the order of get_active_*_memberships().
+    """
+    company_memberships, prescriber_memberships, institution_memberships = context
+    companies = _get_membership_context_organizations(
+        Company.objects.active_or_in_grace_period().select_related("convention"), company_memberships
+    )
+    # The memberships are sorted by join date, the sort is stable.
+    companies.sort(key=lambda pair: pair[0].has_convention_in_grace_period)
+    return (
+        companies,
+        _get_membership_context_organizations(PrescriberOrganization.objects.all(), prescriber_memberships),
+        _get_membership_context_organizations(Institution.objects.all(), institution_memberships),
+    )
+
+
 class ItouCurrentOrganizationMiddleware:
     """
     Store the ID of the current prescriber organization or employer structure in session
@@ -118,24 +155,37 @@ class ItouCurrentOrganizationMiddleware:
 
             # Retrieve memberships and organizations
             if user.is_professional:
-                company_memberships = get_active_company_memberships(user)
-                prescriber_memberships = get_active_prescriber_memberships(user)
-                institution_memberships = get_active_institution_memberships(user)
+                context = get_membership_context(user)
+                if context is None:
+                    company_memberships, all_company_memberships = get_active_company_memberships(user)
+                    prescriber_memberships = get_active_prescriber_memberships(user)
+                    institution_memberships = get_active_institution_memberships(user)
+                    set_membership_context(
+                        user,
+                        build_membership_context(
+                            all_company_memberships, prescriber_memberships, institution_memberships
+                        ),
+                    )
+                    company_organizations = [(m.company, m.is_admin) for m in company_memberships]
+                    prescriber_organizations = [(m.organization, m.is_admin) for m in prescriber_memberships]
+                    institution_organizations = [(m.institution, m.is_admin) for m in institution_memberships]
+                else:
+                    company_organizations, prescriber_organizations, institution_organizations = (
+                        get_membership_context_organizations(context)
+                    )
 
                 (
                     request.organizations,
                     request.current_organization,
                     request.is_current_organization_admin,
                 ) = extract_membership_infos_and_update_session(
-                    company_memberships,
-                    prescriber_memberships,
-                    institution_memberships,
+                    company_organizations + prescriber_organizations + institution_organizations,
                     request.session,
                 )
 
                 # FT users must have at least one FT organization
                 if user.email.endswith(global_constants.FRANCE_TRAVAIL_EMAIL_SUFFIX) and not any(
-                    m.organization.kind == PrescriberOrganizationKind.FT for m in prescriber_memberships
+                    org.kind == PrescriberOrganizationKind.FT for org, _is_admin in prescriber_organizations
                 ):
                     logout_warning = LogoutWarning.FT_NO_FT_ORGANIZATION
                 elif not request.current_organization:
@@ -6,6 +6,8 @@ from itou.utils.enums import ItouEnvironment
 
 
 TEMPORARY_STORAGE_PREFIX = "temporary_storage"
+# Exports of the API, they have no File.
+SNAPSHOTS_PREFIX = "api-snapshots"
 
 
 def s3_client():
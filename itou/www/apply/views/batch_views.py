@@ -13,6 +13,7 @@ from django_xworkflows import models as xwf_models
 
 from itou.companies.models import Company
 from itou.job_applications import enums as job_applications_enums
+from itou.job_applications.cache import invalidate_received_state_counts
 from itou.job_applications.enums import JobApplicationState
 from itou.job_applications.models import JobApplication
 from itou.utils.auth import check_request
@@ -84,6 +85,7 @@ def archive(request):
         archived_at=timezone.now(),
         archived_by=request.user,
     )
+    invalidate_received_state_counts(request.current_organization.pk)
 
     if archived_nb > 1:
         messages.success(request, f"{archived_nb} candidatures ont bien été archivées.", extra_tags="toast")
@@ -124,6 +126,7 @@ def unarchive(request):
         archived_at=None,
         archived_by=None,
     )
+    invalidate_received_state_counts(request.current_organization.pk)
 
     if unarchived_nb > 1:
         messages.success(request, f"{unarchived_nb} candidatures ont bien été désarchivées.", extra_tags="toast")
@@ -8,6 +8,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 
+from itou.job_applications.cache import invalidate_received_state_counts
 from itou.job_applications.enums import ARCHIVABLE_JOB_APPLICATION_STATES_MANUAL, JobApplicationState
 from itou.job_applications.models import JobApplication
 from itou.utils.auth import check_request
@@ -87,5 +88,8 @@ def archive_view(request, job_application_id, *, action):
     )
     if not matched:
         raise Http404
+    invalidate_received_state_counts(
+        JobApplication.objects.filter(pk=job_application_id).values_list("to_company_id", flat=True).get()
+    )
     messages.success(request, f"La candidature a bien été {action}.", extra_tags="toast")
     return HttpResponseRedirect(reverse("apply:details_for_company", args=(job_application_id,)))
@@ -21,7 +21,7 @@ from itou.job_applications.models import JobApplication, JobApplicationWorkflow
 from itou.users.perms import add_user_can_view_personal_information
 from itou.utils.auth import check_request, check_user
 from itou.utils.ordering import OrderEnum
-from itou.utils.pagination import pager
+from itou.utils.pagination import keyset_pager
 from itou.utils.perms.company import get_current_company_or_404
 from itou.utils.perms.utils import can_view_personal_information
 from itou.utils.readonly import readonly_view
@@ -71,6 +71,13 @@ class JobApplicationOrder(OrderEnum):
     CREATED_AT_DESC = "-created_at"
 
 
+def _get_pager_cache_key(request, list_kind):
+    # The listed applications depend on the user, their current organization and the filters.
+    params = sorted((key, value) for key, values in request.GET.lists() if key != "page" for value in values)
+    organization_pk = request.current_organization.pk if request.current_organization else None
+    return f"{list_kind.name}-{request.user.pk}-{organization_pk}-{params}"
+
+
 def _add_pending_for_weeks(job_applications):
     SECONDS_IN_WEEK = 7 * 24 * 60 * 60
     for job_app in job_applications:
@@ -168,7 +175,12 @@ def list_for_job_seeker(request, template_name="apply/list_for_job_seeker.html")
         job_seeker_full_name=Concat(Lower("job_seeker__last_name"), Value(" "), Lower("job_seeker__first_name"))
     ).order_by(*order.order_by)
 
-    job_applications_page = pager(job_applications, request.GET.get("page"), items_per_page=settings.PAGE_SIZE_DEFAULT)
+    job_applications_page = keyset_pager(
+        job_applications,
+        request.GET.get("page"),
+        cache_key=_get_pager_cache_key(request, list_kind),
+        items_per_page=settings.PAGE_SIZE_DEFAULT,
+    )
     _add_pending_for_weeks(job_applications_page)
 
     # The candidate has obviously access to its personal info
@@ -236,7 +248,12 @@ def list_prescriptions(request, template_name="apply/list_prescriptions.html"):
         job_seeker_full_name=Concat(Lower("job_seeker__last_name"), Value(" "), Lower("job_seeker__first_name"))
     ).order_by(*order.order_by)
 
-    job_applications_page = pager(job_applications, request.GET.get("page"), items_per_page=settings.PAGE_SIZE_DEFAULT)
+    job_applications_page = keyset_pager(
+        job_applications,
+        request.GET.get("page"),
+        cache_key=_get_pager_cache_key(request, list_kind),
+        items_per_page=settings.PAGE_SIZE_DEFAULT,
+    )
     _add_pending_for_weeks(job_applications_page)
     add_user_can_view_personal_information(
         job_applications_page, functools.partial(can_view_personal_information, request)
@@ -340,7 +357,12 @@ def list_for_siae(request, template_name="apply/list_for_siae.html"):
         job_seeker_full_name=Concat(Lower("job_seeker__last_name"), Value(" "), Lower("job_seeker__first_name"))
     ).order_by(*order.order_by)
 
-    job_applications_page = pager(job_applications, request.GET.get("page"), items_per_page=settings.PAGE_SIZE_DEFAULT)
+    job_applications_page = keyset_pager(
+        job_applications,
+        request.GET.get("page"),
+        cache_key=_get_pager_cache_key(request, list_kind),
+        items_per_page=settings.PAGE_SIZE_DEFAULT,
+    )
     _add_pending_for_weeks(job_applications_page)
 
     # SIAE members have access to personal info
@@ -30,6 +30,7 @@ from itou.eligibility.models.iae import EligibilityDiagnosis
 from itou.employee_record.enums import Status
 from itou.employee_record.models import EmployeeRecord
 from itou.institutions.enums import InstitutionKind
+from itou.job_applications.cache import get_received_state_counts
 from itou.job_applications.enums import JobApplicationState
 from itou.metabase.models import DatumKey
 from itou.nexus.utils import activate_pilotage
@@ -108,9 +109,9 @@ def _employer_dashboard_context(request):
             "badge": "bg-info-lighter",
         },
     ]
-    job_applications = current_org.job_applications_received.filter(archived_at=None).values("state").all()
+    state_counts = get_received_state_counts(current_org)
     for category in job_applications_categories:
-        category["counter"] = len([ja for ja in job_applications if ja["state"] in category["states"]])
+        category["counter"] = sum(state_counts.get(state, 0) for state in category["states"])
         category["url"] = f"{reverse('apply:list_for_siae')}?{'&'.join([f'states={c}' for c in category['states']])}"
 
     return {
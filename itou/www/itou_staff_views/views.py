@@ -25,7 +25,7 @@ from itou.users.models import JobSeekerProfile, User
 from itou.utils.admin import get_admin_view_link
 from itou.utils.auth import check_user
 from itou.utils.db import or_queries
-from itou.utils.export import generate_excel_sheet
+from itou.utils.export import generate_excel_sheet, iter_in_chunks
 from itou.utils.readonly import http_methods, readonly_view
 from itou.utils.views import with_triggers_context
 from itou.www.itou_staff_views import merge_utils
@@ -106,7 +106,7 @@ def export_job_applications_unknown_to_ft(
 
         def content():
             yield job_app_export_spec.keys()
-            for job_app in job_apps_qs:
+            for job_app in iter_in_chunks(job_apps_qs):
                 yield export_row(job_app_export_spec, job_app)
 
         # Avoid exceedingly long filenames.
@@ -198,9 +198,9 @@ def export_cta(request):
 
     def content():
         yield cta_export_spec.keys()
-        for employee in employees_qs.iterator():
+        for employee in iter_in_chunks(employees_qs):
             yield export_row(cta_export_spec, employee)
-        for prescriber in prescribers_qs.iterator():
+        for prescriber in iter_in_chunks(prescribers_qs):
             yield export_row(cta_export_spec, prescriber)
 
     writer = csv.writer(Echo())
@@ -231,7 +231,7 @@ def export_fs_3437(request):
 
     def content():
         yield fs_3437_export_spec.keys()
-        for obj in employee_record_qs.iterator():
+        for obj in iter_in_chunks(employee_record_qs):
             yield export_row(fs_3437_export_spec, obj)
 
     writer = csv.writer(Echo())
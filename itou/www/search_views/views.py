@@ -1,3 +1,4 @@
+import functools
 import logging
 import warnings
 from collections import defaultdict, namedtuple
@@ -17,6 +18,7 @@ from django.views.generic import FormView
 from itoutils.urls import add_url_params
 
 from itou.common_apps.address.departments import DEPARTMENTS_WITH_DISTRICTS
+from itou.companies.cache import get_or_set_search_results
 from itou.companies.enums import CompanyKind, JobSource, JobSourceTag
 from itou.companies.models import Company, JobDescription
 from itou.insertion.models import Service
@@ -45,9 +47,53 @@ INSEE_CODES_WITH_DISTRICTS = {"13055", "75056", "69123"}
 
 PageAndCounts = namedtuple("PageAndCounts", ("results_page", "siaes_count", "job_descriptions_count"))
 
+CompanySearchResult = namedtuple(
+    "CompanySearchResult", ("pk", "display_name", "kind", "department", "post_code", "distance")
+)
+
 logger = logging.getLogger(__name__)
 
 
+def get_company_search_results(city, distance):
+    """
+    Searchable companies around the city, in the order they are displayed.
+
+    Only the few fields needed to filter the results and to build the form choices are fetched,
+    the displayed companies are fetched page by page.
+    """
+    siaes = (
+        Company.objects.active()
+        .within(city.coords, distance)
+        .filter(is_searchable=True)
+        .with_search_stats()
+        .annotate(distance=Distance("coords", city.coords) / 1000)
+        # Split results into 4 buckets shown in the following order, each bucket being internally sorted
+        # by job_app_score.
+        # 1) has_active_members and is_hiring
+        # These are the siaes which can currently hire, and should be on top.
+        # 2) has_active_members and not is_hiring
+        # These are the siaes not currently hiring, they should
+        # be rather high in the list since they are likely to hire again.
+        # 3) not has_active_members and is_hiring
+        # These are the siaes with no member, they should show last because noone
+        # is there to process any job application.
+        # 4) not has_active_members and not is_hiring
+        # This group is supposed to be empty. But itou staff may have
+        # detached members from their siae so it could still happen.
+        .order_by(
+            "-has_active_members",
+            "-is_hiring",
+            "job_app_score",
+            "pk",  # ensure a deterministic order for tests and pagination
+        )
+        .values_list("pk", "name", "brand", "kind", "department", "post_code", "distance")
+    )
+    return [
+        CompanySearchResult(pk, brand or name, kind, department, post_code, siae_distance)
+        for pk, name, brand, kind, department, post_code, siae_distance in siaes
+    ]
+
+
 @login_not_required
 def employer_search_home(request, template_name="search/siaes_search_home.html"):
     if request.user.is_authenticated:
@@ -108,11 +154,12 @@ class EmployerSearchBaseView(LoginNotRequiredMixin, ReadonlyViewMixin, ApplyForJ
         # this enables not losing the count while changing tabs.
         contract_types = form.cleaned_data.get("contract_types", self.request.GET.getlist("contract_types", []))
 
-        siaes = (
-            Company.objects.active()
-            .within(city.coords, distance)
-            .filter(is_searchable=True)
-            .annotate(distance=Distance("coords", city.coords) / 1000)
+        # The same (city, distance) pairs are searched over and over: cache the matching companies
+        # and apply the other filters on them.
+        siaes = get_or_set_search_results(
+            "companies",
+            {"city": city.pk, "distance": distance},
+            functools.partial(get_company_search_results, city, distance),
         )
         job_descriptions = (
             JobDescription.objects.active()
@@ -133,7 +180,7 @@ class EmployerSearchBaseView(LoginNotRequiredMixin, ReadonlyViewMixin, ApplyForJ
         self.add_form_choices(form, siaes)
 
         if kinds:
-            siaes = siaes.filter(kind__in=kinds)
+            siaes = [siae for siae in siaes if siae.kind in kinds]
             job_clauses = Q(company__kind__in=kinds)
             if CompanyKind.EA.value in kinds:
                 job_clauses |= Q(source_kind=JobSource.PE_API, source_tags__contains=[JobSourceTag.FT_EA_OFFER.value])
@@ -152,14 +199,14 @@ class EmployerSearchBaseView(LoginNotRequiredMixin, ReadonlyViewMixin, ApplyForJ
             districts += self.request.GET.getlist(f"districts_{department_with_district}")
 
         if departments:
-            siaes = siaes.filter(department__in=departments)
+            siaes = [siae for siae in siaes if siae.department in departments]
             job_descriptions = job_descriptions.filter(
                 Q(location__isnull=False, location__department__in=departments)
                 | Q(location__isnull=True, company__department__in=departments)
             )
 
         if districts:
-            siaes = siaes.filter(post_code__in=districts)
+            siaes = [siae for siae in siaes if siae.post_code in districts]
 
         domains = self.request.GET.getlist("domains")
         if domains:
@@ -175,9 +222,17 @@ class EmployerSearchBaseView(LoginNotRequiredMixin, ReadonlyViewMixin, ApplyForJ
             except ValueError:
                 clean_company_pk = None
             else:
-                siaes = siaes.filter(pk=clean_company_pk)
+                siaes = [siae for siae in siaes if siae.pk == clean_company_pk]
 
-        results_and_counts = self.get_results_page_and_counts(siaes, job_descriptions)
+        job_descriptions_filters = {
+            "city": city.pk,
+            "distance": distance,
+            "kinds": sorted(kinds),
+            "contract_types": sorted(contract_types),
+            "departments": sorted(departments),
+            "domains": sorted(domains),
+        }
+        results_and_counts = self.get_results_page_and_counts(siaes, job_descriptions, job_descriptions_filters)
 
         new_saved_search_form = None
         if self.request.user.is_authenticated:
@@ -214,7 +269,6 @@ class EmployerSearchBaseView(LoginNotRequiredMixin, ReadonlyViewMixin, ApplyForJ
 class EmployerSearchView(EmployerSearchBaseView):
     def add_form_choices(self, form, siaes):
         # Extract departments from results to inject them as filters
-        # The DB contains around 4k SIAE (always fast in Python and no need of iterator())
         departments_districts = defaultdict(set)
         company_choices = []
         for siae in siaes:
@@ -235,45 +289,31 @@ class EmployerSearchView(EmployerSearchBaseView):
         if company_choices:
             form.add_field_company(company_choices)
 
-    def get_results_page_and_counts(self, siaes, job_descriptions):
-        siaes = (
-            siaes.prefetch_related(
-                Prefetch(
-                    lookup="job_description_through",
-                    queryset=JobDescription.objects.with_annotation_is_unpopular()
-                    .filter(company__in=siaes, is_active=True)
-                    .select_related("appellation", "location", "company"),
-                    to_attr="active_job_descriptions",
-                )
-            )
-            .with_is_hiring()
-            .with_has_active_members()
-            # Split results into 4 buckets shown in the following order, each bucket being internally sorted
-            # by job_app_score.
-            # 1) has_active_members and is_hiring
-            # These are the siaes which can currently hire, and should be on top.
-            # 2) has_active_members and not is_hiring
-            # These are the siaes not currently hiring, they should
-            # be rather high in the list since they are likely to hire again.
-            # 3) not has_active_members and is_hiring
-            # These are the siaes with no member, they should show last because noone
-            # is there to process any job application.
-            # 4) not has_active_members and not is_hiring
-            # This group is supposed to be empty. But itou staff may have
-            # detached members from their siae so it could still happen.
-            .order_by(
-                "-has_active_members",
-                "-is_hiring",
-                "job_app_score",
-                "pk",  # ensure a deterministic order for tests and pagination
+    def get_results_page_and_counts(self, siaes, job_descriptions, job_descriptions_filters):
+        page = pager(siaes, self.request.GET.get("page"), items_per_page=settings.PAGE_SIZE_SMALL)
+        search_results = page.object_list
+        page_siaes = Company.objects.filter(pk__in=[siae.pk for siae in search_results]).prefetch_related(
+            Prefetch(
+                lookup="job_description_through",
+                queryset=JobDescription.objects.with_annotation_is_unpopular()
+                .filter(is_active=True)
+                .select_related("appellation", "location", "company"),
+                to_attr="active_job_descriptions",
             )
         )
-
-        page = pager(siaes, self.request.GET.get("page"), items_per_page=settings.PAGE_SIZE_SMALL)
+        page_siaes = {siae.pk: siae for siae in page_siaes.with_search_stats()}
+        page.object_list = []
+        for search_result in search_results:
+            # Companies deleted since the results were cached are skipped.
+            if siae := page_siaes.get(search_result.pk):
+                siae.distance = search_result.distance
+                page.object_list.append(siae)
         return PageAndCounts(
             results_page=page,
             siaes_count=page.paginator.count,
-            job_descriptions_count=job_descriptions.count(),
+            job_descriptions_count=get_or_set_search_results(
+                "job-descriptions-count", job_descriptions_filters, job_descriptions.count
+            ),
         )
 
 
@@ -291,7 +331,7 @@ class JobDescriptionSearchView(EmployerSearchBaseView):
     def add_form_choices(self, form, siaes):
         pass
 
-    def get_results_page_and_counts(self, siaes, job_descriptions):
+    def get_results_page_and_counts(self, siaes, job_descriptions, job_descriptions_filters):
         job_descriptions = job_descriptions.order_by(F("source_kind").asc(nulls_first=True), "-updated_at")
 
         page = pager(job_descriptions, self.request.GET.get("page"), items_per_page=settings.PAGE_SIZE_SMALL)
@@ -312,7 +352,7 @@ class JobDescriptionSearchView(EmployerSearchBaseView):
             )
         return PageAndCounts(
             results_page=page,
-            siaes_count=siaes.count(),
+            siaes_count=len(siaes),
             job_descriptions_count=page.paginator.count,
         )
 
@@ -0,0 +1,46 @@
+import socketserver
+import struct
+import threading
+
+import pytest
+
+from itou.antivirus import clamd
+
+
+@pytest.fixture
+def clamd_server(settings, tmp_path):
+    streams = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            assert self.rfile.read(len(b"zINSTREAM\0")) == b"zINSTREAM\0"
+            content = b""
+            while size := struct.unpack("!L", self.rfile.read(4))[0]:
+                content += self.rfile.read(size)
+            streams.append(content)
+            self.wfile.write(self.server.replies[content])
+
+    settings.CLAMD_SOCKET = str(tmp_path / "clamd.ctl")
+    with socketserver.ThreadingUnixStreamServer(settings.CLAMD_SOCKET, Handler) as server:
+        server.replies = {}
+        server.streams = streams
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def test_instream(clamd_server, mocker):
+    mocker.patch("itou.antivirus.clamd.CHUNK_SIZE", 4)
+    clamd_server.replies = {
+        b"clean content": b"stream: OK\0",
+        b"virus": b"stream: Eicar-Signature FOUND\0",
+        b"too large": b"INSTREAM size limit exceeded. ERROR\0",
+    }
+
+    assert clamd.instream(b"clean content") is None
+    assert clamd.instream(b"virus") == "Eicar-Signature"
+    with pytest.raises(clamd.ClamdError, match="INSTREAM size limit exceeded. ERROR"):
+        clamd.instream(b"too large")
+    assert clamd_server.streams == [b"clean content", b"virus", b"too large"]
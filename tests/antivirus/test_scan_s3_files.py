@@ -7,6 +7,7 @@ from django.core.management import call_command
 from django.utils import timezone
 from pytest_django.asserts import assertQuerySetEqual
 
+from itou.antivirus import clamd
 from itou.antivirus.models import Scan
 from itou.files.models import File
 from tests.antivirus.factories import ScanFactory
@@ -33,39 +34,16 @@ def test_scan_s3_files(mocker):
     # file that was checked in the last month
     file6 = ScanFactory(clamav_completed_at=one_week_ago, infected=False).file
 
-    # save those files in s3 bucket with dummy content
-    for key in File.objects.values_list("key", flat=True):
-        with io.BytesIO() as content:
-            default_storage.save(key, content)
+    # save those files in s3 bucket, with a virus in the infected ones
+    for file in File.objects.all():
+        default_storage.save(file.key, io.BytesIO(b"virus" if file in [file2, file4] else b"clean"))
 
     mocker.patch("itou.antivirus.management.commands.scan_s3_files.timezone.now").return_value = now
-
-    # we mock this function to avoid failures related to missing groups or permission errors
-    mocker.patch("itou.antivirus.management.commands.scan_s3_files.shutil.chown")
-
-    # we don't need to manipulate real files
-    mocker.patch("itou.antivirus.management.commands.scan_s3_files.os.chmod")
-
-    # files are retrieved from S3 and saved as temporary files
-    filepath_s3key = {
-        "/tmp/tmp_file1": file1.key,
-        "/tmp/tmp_file2": file2.key,
-        "/tmp/tmp_file3": file3.key,
-        "/tmp/tmp_file4": file4.key,
-        "/tmp/tmp_file5": file5.key,
-        "/tmp/tmp_file6": file6.key,
-    }
-    mocker.patch(
-        "itou.antivirus.management.commands.scan_s3_files.Command.download_files"
-    ).return_value = filepath_s3key
-
-    subprocess_mock = mocker.patch("itou.antivirus.management.commands.scan_s3_files.subprocess.run")
-    subprocess_mock.return_value.returncode = 1  # 1 means some files are infected
-    subprocess_mock.return_value.stdout = "\n".join(
-        [
-            f"/tmp/tmp_file2: {VIRUS} FOUND",
-            f"/tmp/tmp_file4: {VIRUS} FOUND",
-        ]
+    # smaller mini-batches to ease testing
+    mocker.patch("itou.antivirus.management.commands.scan_s3_files.Command.MINI_BATCH_SIZE", 2)
+    instream_mock = mocker.patch(
+        "itou.antivirus.management.commands.scan_s3_files.clamd.instream",
+        side_effect=lambda content: VIRUS if content == b"virus" else None,
     )
 
     call_command("scan_s3_files")
@@ -83,3 +61,54 @@ def test_scan_s3_files(mocker):
         transform=lambda s: (s.file_id, s.clamav_completed_at, s.clamav_signature, s.infected),
         ordered=False,
     )
+    assert instream_mock.call_count == 5
+
+
+@pytest.mark.usefixtures("temporary_bucket")
+def test_scan_s3_files_skips_missing_files(caplog, mocker):
+    file = FileFactory()
+    missing_file = FileFactory()
+    default_storage.save(file.key, io.BytesIO(b"clean"))
+    mocker.patch("itou.antivirus.management.commands.scan_s3_files.clamd.instream", return_value=None)
+
+    call_command("scan_s3_files")
+
+    assertQuerySetEqual(
+        Scan.objects.values_list("file_id", "infected", "clamav_failed_at__isnull"),
+        [(file.pk, False, True), (missing_file.pk, None, False)],
+        ordered=False,
+    )
+    assert f"Could not download file={missing_file.key}" in caplog.messages
+    assert "Scanned 1 files" in caplog.messages
+
+
+@pytest.mark.usefixtures("temporary_bucket")
+def test_scan_s3_files_retries_failures_later(caplog, mocker):
+    now = timezone.now()
+    file = FileFactory()
+    default_storage.save(file.key, io.BytesIO(b"clean"))
+    mocker.patch("itou.antivirus.management.commands.scan_s3_files.timezone.now").return_value = now
+    instream_mock = mocker.patch(
+        "itou.antivirus.management.commands.scan_s3_files.clamd.instream", side_effect=clamd.ClamdError("Oops")
+    )
+
+    call_command("scan_s3_files")
+    assert f"Could not scan file={file.key}: Oops" in caplog.messages
+    assertQuerySetEqual(
+        Scan.objects.values_list("file_id", "clamav_completed_at", "clamav_failed_at"), [(file.pk, None, now)]
+    )
+
+    # The failure is not retried right away.
+    call_command("scan_s3_files")
+    assert instream_mock.call_count == 1
+
+    later = now + relativedelta(days=1, seconds=1)
+    mocker.patch("itou.antivirus.management.commands.scan_s3_files.timezone.now").return_value = later
+    instream_mock.side_effect = None
+    instream_mock.return_value = None
+    call_command("scan_s3_files")
+    assert instream_mock.call_count == 2
+    assertQuerySetEqual(
+        Scan.objects.values_list("file_id", "clamav_completed_at", "clamav_failed_at", "infected"),
+        [(file.pk, later, None, False)],
+    )
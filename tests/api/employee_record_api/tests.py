@@ -1,10 +1,15 @@
+import datetime
+
+import pytest
 from dateutil.relativedelta import relativedelta
 from django.urls import reverse
 from django.utils import timezone
+from freezegun import freeze_time
 from itoutils.django.testing import assertSnapshotQueries
 from pytest_django.asserts import assertContains
 from rest_framework.authtoken.models import Token
 
+from itou.api.pagination import ChangeFeedPagination
 from itou.api.token_auth.views import TOKEN_ID_STR
 from itou.employee_record.enums import Status
 from itou.employee_record.models import EmployeeRecord
@@ -439,6 +444,100 @@ class TestEmployeeRecordAPIParameters:
         assert len(results) == 0
 
 
+class TestEmployeeRecordChangeFeed:
+    endpoint_url = reverse("v1:employee-records-changes")
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, mocker):
+        mocker.patch(
+            "itou.common_apps.address.format.get_geocoding_data",
+            side_effect=mock_get_geocoding_data,
+        )
+        mocker.patch.object(ChangeFeedPagination, "page_size", 1)
+        with freeze_time("2026-01-01 10:00"):
+            job_application = JobApplicationFactory(sent_by_prescriber_alone=True, for_employee_record=True)
+            self.employee_record_1 = EmployeeRecord.from_job_application(job_application)
+            self.employee_record_1.save()
+        with freeze_time("2026-01-01 11:00"):
+            job_application = JobApplicationFactory(
+                sent_by_prescriber_alone=True, for_employee_record=True, to_company=job_application.to_company
+            )
+            self.employee_record_2 = EmployeeRecord.from_job_application(job_application)
+            self.employee_record_2.save()
+        self.employer = job_application.to_company.members.first()
+
+    def test_feed(self, api_client):
+        api_client.force_login(self.employer)
+
+        response = api_client.get(self.endpoint_url, format="json")
+        assert response.status_code == 200
+        data = response.json()
+        assert [result["id"] for result in data["results"]] == [self.employee_record_1.pk]
+        assert data["has_more"] is True
+
+        response = api_client.get(self.endpoint_url, {"cursor": data["cursor"]}, format="json")
+        data = response.json()
+        assert [result["id"] for result in data["results"]] == [self.employee_record_2.pk]
+        assert data["has_more"] is False
+
+        # Nothing changed since the last cursor, which is kept for the next call.
+        response = api_client.get(self.endpoint_url, {"cursor": data["cursor"]}, format="json")
+        assert response.json()["results"] == []
+        assert response.json()["cursor"] == data["cursor"]
+
+        # Status transitions are part of the feed.
+        with freeze_time("2026-01-01 12:00"):
+            self.employee_record_1.ready()
+        response = api_client.get(self.endpoint_url, {"cursor": data["cursor"]}, format="json")
+        [result] = response.json()["results"]
+        assert result["id"] == self.employee_record_1.pk
+        assert result["statut"] == Status.READY
+
+    def test_recent_changes_are_delayed(self, api_client):
+        api_client.force_login(self.employer)
+        self.employee_record_1.ready()
+
+        response = api_client.get(self.endpoint_url, {"cursor": ""}, format="json")
+        assert [result["id"] for result in response.json()["results"]] == [self.employee_record_2.pk]
+
+    def test_changes_of_open_transactions_are_delayed(self, api_client):
+        api_client.force_login(self.employer)
+        # The test transaction is still open, like the transaction of a long command.
+        with freeze_time(timezone.now() + datetime.timedelta(hours=1)):
+            self.employee_record_1.ready()
+
+        with freeze_time(timezone.now() + datetime.timedelta(hours=2)):
+            response = api_client.get(self.endpoint_url, {"cursor": ""}, format="json")
+        assert [result["id"] for result in response.json()["results"]] == [self.employee_record_2.pk]
+
+    def test_etag(self, api_client):
+        api_client.force_login(self.employer)
+
+        response = api_client.get(self.endpoint_url, format="json")
+        etag = response.headers["ETag"]
+        response = api_client.get(self.endpoint_url, format="json", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        with freeze_time("2026-01-01 09:00"):
+            self.employee_record_2.created_at = timezone.now()
+            self.employee_record_2.save()
+        response = api_client.get(self.endpoint_url, format="json", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @pytest.mark.parametrize("cursor", ["invalid", "WyJub3QgYSBkYXRlIiwgMV0="])
+    def test_invalid_cursor(self, api_client, cursor):
+        api_client.force_login(self.employer)
+        response = api_client.get(self.endpoint_url, {"cursor": cursor}, format="json")
+        assert response.status_code == 400
+
+    def test_invalid_since_parameter(self, api_client):
+        api_client.force_login(self.employer)
+        response = api_client.get(reverse("v1:employee-records-list"), {"since": "2026-13-01"}, format="json")
+        assert response.status_code == 400
+
+
 class TestEmployeeRecordUpdateNotificationViewSet:
     endpoint_url = reverse("v1:employee-record-notifications-list")
 
@@ -1,8 +1,11 @@
 from itou.api.job_application_api.schema import (
+    job_application_bulk_search_request_example,
+    job_application_bulk_search_response_valid_example,
     job_application_search_request_example,
     job_application_search_response_valid_example,
 )
 from itou.api.job_application_api.serializers import (
+    JobApplicationBulkSearchResponseSerializer,
     JobApplicationSearchRequestSerializer,
     JobApplicationSearchResponseSerializer,
     JobDescriptionSerializer,
@@ -32,3 +35,13 @@ def test_job_application_search_response_example():
         job_application_search_response_valid_example.value["results"][1]["orientation_postes_recherches"][0].keys()
         == JobDescriptionSerializer().fields.keys()
     )
+
+
+def test_job_application_bulk_search_examples():
+    """
+    Ensure bulk search example payloads are in sync with current serializers
+    """
+    for search in job_application_bulk_search_request_example.value["recherches"]:
+        assert search.keys() == JobApplicationSearchRequestSerializer().fields.keys()
+    for result in job_application_bulk_search_response_valid_example.value:
+        assert result.keys() == JobApplicationBulkSearchResponseSerializer().fields.keys()
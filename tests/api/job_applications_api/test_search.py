@@ -3,6 +3,8 @@ from datetime import date
 
 import pytest
 from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from freezegun import freeze_time
@@ -297,3 +299,101 @@ def test_search_older_than_3_months(api_client):
         )
         response = api_client.post(reverse("v1:job-applications-search"), VALID_SEARCH_DATA, format="json")
     assert response.json()["results"] == []
+
+
+class TestJobApplicationBulkSearchApi:
+    ENDPOINT_URL = reverse_lazy("v1:job-applications-bulk-search")
+
+    @pytest.fixture(autouse=True)
+    def setup_method(self, settings):
+        settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] |= {"job-applications-search": "10/minute"}
+
+        self.job_seeker_1 = JobSeekerFactory(
+            jobseeker_profile__nir="269054958815780",
+            jobseeker_profile__birthdate=date(1969, 5, 12),
+            last_name="Durand",
+            first_name="Nathalie",
+            born_in_france=True,
+            with_address=True,
+        )
+        self.job_seeker_2 = JobSeekerFactory(
+            jobseeker_profile__nir="199127524528683",
+            jobseeker_profile__birthdate=date(1999, 12, 3),
+            last_name="Dupont-Maréchal",
+            first_name="Léopold",
+            born_outside_france=True,
+            with_address=True,
+        )
+        self.job_applications_1 = JobApplicationFactory.create_batch(
+            2, sent_by_prescriber_alone=True, job_seeker=self.job_seeker_1
+        )
+        self.job_application_2 = JobApplicationFactory(sent_by_prescriber_alone=True, job_seeker=self.job_seeker_2)
+
+        self.token = DepartmentToken.objects.create(department="01", label="Token tests département 01")
+        self.searches = [
+            VALID_SEARCH_DATA,
+            {"nir": "199127524528683", "nom": "Dupont Maréchal", "prenom": "leopold", "date_naissance": "1999-12-03"},
+            {"nir": "290010101010125", "nom": "Doe", "prenom": "Jane", "date_naissance": "1990-01-01"},
+        ]
+
+    def test_unauthorized_access(self, api_client):
+        api_client.force_authenticate(JobSeekerFactory())
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": self.searches}, format="json")
+        assert response.status_code == 403
+
+    def test_results_grouped_by_search(self, api_client):
+        api_client.force_authenticate(ServiceAccount(), self.token)
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": self.searches}, format="json")
+        assert response.status_code == 200
+        assert [
+            (result["nir"], {job_application["identifiant_unique"] for job_application in result["candidatures"]})
+            for result in response.json()
+        ] == [
+            ("269054958815780", {str(job_application.pk) for job_application in self.job_applications_1}),
+            ("199127524528683", {str(self.job_application_2.pk)}),
+            ("290010101010125", set()),
+        ]
+
+    def test_names_are_checked_for_each_search(self, api_client):
+        api_client.force_authenticate(ServiceAccount(), self.token)
+        searches = [VALID_SEARCH_DATA, {**self.searches[1], "nom": "Duport"}]
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": searches}, format="json")
+        assert response.status_code == 200
+        assert [len(result["candidatures"]) for result in response.json()] == [2, 0]
+
+    def test_num_queries_does_not_depend_on_searches(self, api_client):
+        api_client.force_authenticate(ServiceAccount(), self.token)
+        with CaptureQueriesContext(connection) as one_search:
+            api_client.post(self.ENDPOINT_URL, {"recherches": self.searches[:1]}, format="json")
+        with CaptureQueriesContext(connection) as many_searches:
+            api_client.post(self.ENDPOINT_URL, {"recherches": self.searches}, format="json")
+        assert len(many_searches) == len(one_search)
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"recherches": []},
+            {"recherches": [VALID_SEARCH_DATA, VALID_SEARCH_DATA]},
+            {"recherches": [{**VALID_SEARCH_DATA, "date_naissance": ""}]},
+            VALID_SEARCH_DATA,
+        ],
+    )
+    def test_invalid_payload(self, api_client, payload):
+        api_client.force_authenticate(ServiceAccount(), self.token)
+        response = api_client.post(self.ENDPOINT_URL, payload, format="json")
+        assert response.status_code == 400
+
+    def test_throttling_counts_searches(self, api_client):
+        api_client.force_authenticate(ServiceAccount(), self.token)
+
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": self.searches}, format="json")
+        assert response.status_code == 200
+        # The quota is shared with the search API.
+        for _ in range(6):
+            response = api_client.post(reverse("v1:job-applications-search"), VALID_SEARCH_DATA, format="json")
+            assert response.status_code == 200
+
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": self.searches[:2]}, format="json")
+        assert response.status_code == 429
+        response = api_client.post(self.ENDPOINT_URL, {"recherches": self.searches[:1]}, format="json")
+        assert response.status_code == 200
@@ -6,6 +6,7 @@ import pytest
 from django.urls import reverse
 from freezegun import freeze_time
 from itoutils.django.testing import assertSnapshotQueries
+from pytest_django.asserts import assertNumQueries
 from rest_framework.test import APIClient
 
 from itou.api.models import DepartmentToken
@@ -189,6 +190,31 @@ class TestSiaeAPIFetchList:
         assert response.json()["count"] == 0
         assert response.status_code == 200
 
+    def test_fetch_siae_list_cache(self, api_client, caplog):
+        query_params = {"code_insee": self.saint_andre.code_insee, "distance_max_km": 100}
+        response = api_client.get(ENDPOINT_URL, query_params, format="json")
+        assert response.json()["count"] == 2
+        assert caplog.messages[-1] == "SIAE API cache miss"
+
+        # Same normalized filters.
+        with assertNumQueries(0):
+            response = api_client.get(
+                ENDPOINT_URL, {**query_params, "distance_max_km": "100.0", "page": 1}, format="json"
+            )
+        assert response.json()["count"] == 2
+        assert caplog.messages[-1] == "SIAE API cache hit"
+
+        # Another page.
+        response = api_client.get(ENDPOINT_URL, {**query_params, "page_size": 1}, format="json")
+        assert len(response.json()["results"]) == 1
+        assert caplog.messages[-1] == "SIAE API cache miss"
+
+        # Saving a company invalidates the cache.
+        CompanyFactory(department="44", coords=self.saint_andre.coords)
+        response = api_client.get(ENDPOINT_URL, query_params, format="json")
+        assert response.json()["count"] == 3
+        assert caplog.messages[-1] == "SIAE API cache miss"
+
     def test_fetch_siae_list_by_department(self, api_client):
         # Declare company in 56 despite its coordinates
         company56 = CompanyFactory(kind=CompanyKind.EI, department="56", coords=self.saint_andre.coords)
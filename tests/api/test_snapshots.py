@@ -0,0 +1,142 @@
+import gzip
+import json
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from itou.api.marche_api.serializers import MarcheCompanySerializer
+from itou.api.marche_api.views import get_companies_queryset
+from itou.api.models import ServiceToken
+from itou.api.snapshots import SNAPSHOTS_PREFIX, _cache_key, build_snapshot, get_latest_snapshot
+from itou.nexus.enums import Service
+from itou.utils.storage.s3 import s3_client
+from tests.companies.factories import CompanyFactory
+from tests.prescribers.factories import PrescriberOrganizationFactory
+
+
+SNAPSHOT_NAMES = ["data-inclusion-orga", "data-inclusion-siae", "marche"]
+
+
+@pytest.fixture(autouse=True)
+def clear_latest_snapshot_cache():
+    yield
+    caches["failsafe"].delete_many([_cache_key(name) for name in SNAPSHOT_NAMES])
+
+
+def list_snapshot_keys(name):
+    response = s3_client().list_objects_v2(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=f"{SNAPSHOTS_PREFIX}/{name}/"
+    )
+    return sorted(obj["Key"] for obj in response.get("Contents", []))
+
+
+class TestBuildSnapshot:
+    def test_build(self, temporary_bucket):
+        company = CompanyFactory()
+
+        latest, updated = build_snapshot("marche", get_companies_queryset(), MarcheCompanySerializer)
+        assert updated is True
+        assert list_snapshot_keys("marche") == sorted([latest["key"], f"{SNAPSHOTS_PREFIX}/marche/latest.json"])
+        assert latest["previous_key"] is None
+        obj = s3_client().get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=latest["key"])
+        lines = gzip.decompress(obj["Body"].read()).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [company.pk]
+
+        # Unchanged data: the snapshot is kept.
+        assert build_snapshot("marche", get_companies_queryset(), MarcheCompanySerializer) == (latest, False)
+
+        # The previous snapshot is kept for the downloads in progress, older ones are removed.
+        CompanyFactory()
+        second, updated = build_snapshot("marche", get_companies_queryset(), MarcheCompanySerializer)
+        assert updated is True
+        assert second["previous_key"] == latest["key"]
+        assert second["etag"] != latest["etag"]
+        CompanyFactory()
+        third, updated = build_snapshot("marche", get_companies_queryset(), MarcheCompanySerializer)
+        assert updated is True
+        assert list_snapshot_keys("marche") == sorted(
+            [second["key"], third["key"], f"{SNAPSHOTS_PREFIX}/marche/latest.json"]
+        )
+
+        caches["failsafe"].delete(_cache_key("marche"))
+        assert get_latest_snapshot("marche") == third
+
+    def test_command(self, temporary_bucket, caplog):
+        CompanyFactory()
+        PrescriberOrganizationFactory()
+
+        call_command("build_api_snapshots")
+        assert caplog.messages == [
+            "Snapshot data-inclusion-orga updated",
+            "Snapshot data-inclusion-siae updated",
+            "Snapshot marche updated",
+        ]
+
+        caplog.clear()
+        call_command("build_api_snapshots")
+        assert caplog.messages == [
+            "Snapshot data-inclusion-orga unchanged",
+            "Snapshot data-inclusion-siae unchanged",
+            "Snapshot marche unchanged",
+        ]
+
+
+class TestSnapshotView:
+    def api_client(self, service):
+        token = ServiceToken.objects.create(service=service)
+        return APIClient(headers={"Authorization": f"Token {token.key}"})
+
+    @pytest.mark.parametrize(
+        "url_name,data,service",
+        [
+            ("v1:marche-company-snapshot", {}, Service.MARCHE),
+            ("v1:structures-snapshot", {"type": "siae"}, Service.DATA_INCLUSION),
+        ],
+    )
+    @pytest.mark.empty_temporary_bucket_expected
+    def test_permissions(self, url_name, data, service, temporary_bucket):
+        url = reverse(url_name)
+        assert APIClient().get(url, data).status_code == 401
+        assert self.api_client(Service.DORA).get(url, data).status_code == 403
+        # Not built yet.
+        assert self.api_client(service).get(url, data).status_code == 404
+
+    def test_missing_type(self):
+        response = self.api_client(Service.DATA_INCLUSION).get(reverse("v1:structures-snapshot"))
+        assert response.status_code == 400
+
+    def test_download(self, temporary_bucket):
+        orga = PrescriberOrganizationFactory()
+        call_command("build_api_snapshots")
+        url = reverse("v1:structures-snapshot")
+        api_client = self.api_client(Service.DATA_INCLUSION)
+
+        response = api_client.get(url, {"type": "orga"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/gzip"
+        assert response["Content-Disposition"] == 'attachment; filename="data-inclusion-orga.ndjson.gz"'
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [str(orga.uid)]
+
+        response = api_client.get(url, {"type": "orga"}, headers={"If-None-Match": response["ETag"]})
+        assert response.status_code == 304
+
+        response = api_client.get(url, {"type": "orga"}, headers={"If-Modified-Since": response["Last-Modified"]})
+        assert response.status_code == 304
+
+    def test_download_missing_object(self, temporary_bucket):
+        PrescriberOrganizationFactory()
+        call_command("build_api_snapshots")
+        latest = get_latest_snapshot("data-inclusion-orga")
+        client = s3_client()
+        for key in [latest["key"], f"{SNAPSHOTS_PREFIX}/data-inclusion-orga/latest.json"]:
+            client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+
+        # The outdated pointer is still cached.
+        response = self.api_client(Service.DATA_INCLUSION).get(reverse("v1:structures-snapshot"), {"type": "orga"})
+        assert response.status_code == 404
+        assert caches["failsafe"].get(_cache_key("data-inclusion-orga")) is None
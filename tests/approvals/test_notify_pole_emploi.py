@@ -1,5 +1,6 @@
 import datetime
 import json
+import re
 from unittest.mock import patch
 
 import httpx
@@ -560,7 +561,7 @@ class TestCancelledApprovalNotifyPoleEmploiIntegration:
 class TestApprovalsSendToPeManagement:
     @patch.object(CancelledApproval, "notify_pole_emploi", return_value=api_enums.PEApiNotificationStatus.ERROR)
     @patch.object(Approval, "notify_pole_emploi", return_value=api_enums.PEApiNotificationStatus.SHOULD_RETRY)
-    @patch("itou.approvals.management.commands.send_approvals_to_pe.sleep")
+    @patch("itou.approvals.management.commands.send_approvals_to_pe.time.sleep")
     # smaller batch to ease testing
     @patch("itou.approvals.management.commands.send_approvals_to_pe.MAX_APPROVALS_PER_RUN", 10)
     def test_invalid_job_seeker_for_pole_emploi(self, sleep_mock, notify_mock, cancelled_notify_mock, caplog):
@@ -643,7 +644,7 @@ class TestApprovalsSendToPeManagement:
             assert approval.pe_notification_status == api_enums.PEApiNotificationStatus.READY
 
     @patch.object(Approval, "notify_pole_emploi", return_value=api_enums.PEApiNotificationStatus.SHOULD_RETRY)
-    @patch("itou.approvals.management.commands.send_approvals_to_pe.sleep")
+    @patch("itou.approvals.management.commands.send_approvals_to_pe.time.sleep")
     # smaller batch to ease testing
     @patch("itou.approvals.management.commands.send_approvals_to_pe.MAX_APPROVALS_PER_RUN", 1)
     def test_error_log(self, sleep_mock, notify_mock, caplog):
@@ -675,3 +676,40 @@ class TestApprovalsSendToPeManagement:
         # Since the notify_pole_emploi have been mocked, the READY/SHOULD_RETRY approvals kept their statuses
         retry_approval.refresh_from_db()
         assert retry_approval.pe_notification_status == api_enums.PEApiNotificationStatus.SHOULD_RETRY
+
+    @patch.object(CancelledApproval, "notify_pole_emploi", return_value=api_enums.PEApiNotificationStatus.SUCCESS)
+    @patch.object(Approval, "notify_pole_emploi", return_value=api_enums.PEApiNotificationStatus.SHOULD_RETRY)
+    # smaller batch to ease testing
+    @patch("itou.approvals.management.commands.send_approvals_to_pe.MAX_APPROVALS_PER_RUN", 2)
+    def test_workers(self, notify_mock, cancelled_notify_mock, caplog):
+        retry_approvals = ApprovalFactory.create_batch(
+            3,
+            start_at=datetime.datetime.today().date() - datetime.timedelta(days=1),
+            with_jobapplication=True,
+            pe_notification_status="notification_should_retry",
+        )
+        cancelled_approval = CancelledApprovalFactory(
+            start_at=datetime.datetime.today().date() - datetime.timedelta(days=1)
+        )
+        management.call_command("send_approvals_to_pe", wet_run=True, workers=2, rate=1000)
+
+        # The queue is drained beyond the batch size, each approval is attempted once.
+        assert notify_mock.call_count == 3
+        assert cancelled_notify_mock.call_count == 1
+        assert sorted(caplog.messages[:4]) == sorted(
+            [
+                f"approval={approval} start_at={approval.start_at.isoformat()} pe_state=notification_should_retry"
+                for approval in retry_approvals
+            ]
+            + [
+                f"cancelledapproval={cancelled_approval} start_at={cancelled_approval.start_at.isoformat()} "
+                "pe_state=notification_ready"
+            ]
+        )
+        assert caplog.messages[4].startswith("Sent 4 approvals in ")
+        assert caplog.messages[4].endswith(" with workers=2, final rate=1000.00/s")
+        # Throughput per status
+        assert [re.sub(r"\(\d+\.\d+/s\)$", "(x/s)", message) for message in caplog.messages[5:-1]] == [
+            "Sent 3 approvals with new pe_notification_status=notification_should_retry (x/s)",
+            "Sent 1 approvals with new pe_notification_status=notification_success (x/s)",
+        ]
@@ -9,6 +9,7 @@ from itou.archive.utils import (
     exclude_users_with_blocking_relations,
     get_user_reverse_relations,
     get_year_month_or_none,
+    year_month,
 )
 from itou.invitations.models import EmployerInvitation
 from itou.users.models import User
@@ -96,3 +97,17 @@ class TestCountRelatedSubquery:
 )
 def test_get_year_month_or_none(date_input, expected_output):
     assert get_year_month_or_none(date_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "date_joined",
+    [
+        timezone.make_aware(datetime.datetime(2023, 10, 15)),
+        timezone.make_aware(datetime.datetime(2024, 8, 31, 23, 0, 0), datetime.UTC),
+    ],
+)
+def test_year_month(date_joined):
+    employer = EmployerFactory(date_joined=date_joined)
+    assert User.objects.filter(pk=employer.pk).values_list(year_month("date_joined"), flat=True).get() == (
+        get_year_month_or_none(date_joined)
+    )
@@ -5,6 +5,7 @@ from pytest_django.asserts import assertQuerySetEqual
 
 from itou.cities.management.commands.sync_cities import get_next_insee_code
 from itou.cities.models import City, EditionModeChoices
+from itou.cities.utils import CityResolver
 from tests.cities.factories import create_city_guerande, create_test_cities
 from tests.companies.factories import JobDescriptionFactory
 from tests.jobs.factories import create_test_romes_and_appellations
@@ -534,3 +535,25 @@ def test_get_next_insee_code(settings, respx_mock):
         ],
     )
     assert get_next_insee_code("60054", date="2020-01-01") is None
+
+
+def test_city_resolver():
+    paris = City(name="Paris", post_codes=["75001", "75002", "75008"], code_insee="75056")
+    paris_8 = City(name="Paris 8e Arrondissement", post_codes=["75008"], code_insee="75108")
+    saint_denis_reunion = City(name="Saint-Denis", post_codes=["97400", "97490"], code_insee="97411")
+    sainte_clotilde = City(name="Sainte-Clotilde", post_codes=["97490"], code_insee="97490")
+    guerande = City(name="Guérande", post_codes=["44350"], code_insee="44069")
+    resolver = CityResolver([paris, paris_8, saint_denis_reunion, sainte_clotilde, guerande])
+
+    assert resolver.resolve("75008", "PARIS") == paris
+    assert resolver.resolve("75008", "paris 8e arrondissement") == paris_8
+    assert resolver.resolve("75008", "Paris 8") == paris
+    assert resolver.resolve("75002", "Lutèce") == paris
+    assert resolver.resolve("54350", "Guérande") is None
+    # Equal similarity, the most specific city wins.
+    assert resolver.resolve("97490", "") == sainte_clotilde
+
+    # Without a threshold, the only city of a post code is always returned.
+    assert resolver.resolve("44350", "ERAND") == guerande
+    assert resolver.resolve("44350", "ERAND", threshold=0.3) is None
+    assert resolver.resolve("44350", "GUERAND", threshold=0.3) == guerande
@@ -1,6 +1,8 @@
 import re
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from itou.communications import registry as notifications_registry
 from itou.communications.apps import sync_notifications
@@ -329,6 +331,34 @@ class TestEmailNotification:
         assert len(mailoutbox) == 1
         assert mailoutbox[0].to == [admin.email]
 
+    def test_send_many(self, email_notification, django_capture_on_commit_callbacks, mailoutbox, caplog):
+        sync_notifications(NotificationRecord)
+        record = NotificationRecord.objects.get(notification_class=email_notification.__name__)
+        admin_membership = PrescriberMembershipFactory(is_admin=True)
+        organization = admin_membership.organization
+        member = PrescriberMembershipFactory(organization=organization, is_admin=False).user
+        disabled_member = PrescriberMembershipFactory(organization=organization, is_admin=False).user
+        settings, _ = NotificationSettings.get_or_create(disabled_member, organization)
+        settings.disabled_notifications.set([record])
+        # Only disabled outside of the organization
+        settings, _ = NotificationSettings.get_or_create(member)
+        settings.disabled_notifications.set([record])
+        left_member = PrescriberMembershipFactory(organization=organization, is_admin=False, is_active=False).user
+
+        notifications = [
+            email_notification(user, organization) for user in [admin_membership.user, member, disabled_member]
+        ] + [email_notification(left_member, organization)]
+        with django_capture_on_commit_callbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            email_notification.send_many(notifications)
+
+        assert caplog.messages == ["Send email copy to admin, admin_count=1"]
+        assert sorted(mail.to[0] for mail in mailoutbox) == sorted(
+            [admin_membership.user.email, member.email, left_member.email, admin_membership.user.email]
+        )
+        # The settings and the memberships are loaded once for all the notifications
+        assert len([query for query in ctx.captured_queries if "notificationsettings" in query["sql"]]) == 1
+        assert len([query for query in ctx.captured_queries if "prescribermembership" in query["sql"]]) == 1
+
 
 class TestProfiledNotification:
     def setup_method(self):
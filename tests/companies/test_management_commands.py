@@ -10,7 +10,7 @@ from itoutils.django.testing import assertSnapshotQueries
 from pytest_django.asserts import assertQuerySetEqual
 
 from itou.companies.enums import CompanyKind, CompanySource, JobSource
-from itou.companies.models import Company, JobDescription
+from itou.companies.models import Company, CompanySearchStats, JobDescription
 from itou.users.enums import ActionKind
 from itou.users.models import JobSeekerAssignment
 from tests.approvals.factories import ProlongationRequestFactory
@@ -263,6 +263,34 @@ class TestMoveCompanyData:
         assertQuerySetEqual(company_to.assessments.all(), [assessment, assessment2], ordered=False)
 
 
+def test_reconcile_company_search_stats(caplog):
+    company = companies_factories.CompanyFactory(with_membership=True, with_jobs=True)
+    up_to_date_company = companies_factories.CompanyFactory(with_membership=True)
+    orphan = CompanySearchStats.objects.create(company_id=0, count_active_job_descriptions=1)
+    # Simulate a drift, e.g. an update bypassing the triggers.
+    CompanySearchStats.objects.filter(company=company).update(count_active_job_descriptions=0)
+
+    # Dry run first
+    management.call_command("reconcile_company_search_stats", wet_run=False)
+    assert caplog.messages[0] == "Command launched with wet_run=False"
+    assert caplog.messages[1] == "Fixed search statistics of 1 companies, removed 1 orphans"
+    assert CompanySearchStats.objects.get(company=company).count_active_job_descriptions == 0
+    assert CompanySearchStats.objects.filter(pk=orphan.pk).exists()
+
+    caplog.clear()
+
+    # Wet run now
+    management.call_command("reconcile_company_search_stats", wet_run=True)
+    assert caplog.messages[0] == "Fixed search statistics of 1 companies, removed 1 orphans"
+    assert CompanySearchStats.objects.get(company=company).count_active_job_descriptions == 4
+    assert CompanySearchStats.objects.get(company=up_to_date_company).has_active_members is True
+    assert not CompanySearchStats.objects.filter(pk=orphan.pk).exists()
+
+    caplog.clear()
+    management.call_command("reconcile_company_search_stats", wet_run=True)
+    assert caplog.messages[0] == "Fixed search statistics of 0 companies, removed 0 orphans"
+
+
 def test_update_companies_job_app_score(caplog):
     company_1 = companies_factories.CompanyFactory()
     company_2 = JobApplicationFactory(sent_by_prescriber_alone=True, to_company__with_jobs=True).to_company
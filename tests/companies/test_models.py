@@ -480,6 +480,46 @@ class TestCompanyQuerySet:
         result = Company.objects.with_has_active_members().get(pk=company.pk)
         assert not result.has_active_members
 
+    def test_with_search_stats(self):
+        def assert_search_stats_are_up_to_date():
+            expected = Company.objects.with_is_hiring().with_has_active_members().order_by("pk")
+            assert [
+                (company.pk, company.count_active_job_descriptions, company.is_hiring, company.has_active_members)
+                for company in Company.objects.with_search_stats().order_by("pk")
+            ] == [
+                (company.pk, company.count_active_job_descriptions, company.is_hiring, company.has_active_members)
+                for company in expected
+            ]
+
+        company = CompanyFactory(with_membership=True, with_jobs=True, spontaneous_applications_open_since=None)
+        other_company = CompanyFactory(spontaneous_applications_open_since=None)
+        assert_search_stats_are_up_to_date()
+
+        job_description = company.job_description_through.first()
+        job_description.is_active = False
+        job_description.save()
+        assert_search_stats_are_up_to_date()
+
+        job_description.is_active = True
+        job_description.company = other_company
+        job_description.save()
+        assert_search_stats_are_up_to_date()
+
+        company.job_description_through.update(is_active=False)
+        assert_search_stats_are_up_to_date()
+        other_company.job_description_through.all().delete()
+        assert_search_stats_are_up_to_date()
+
+        membership = company.memberships.get()
+        membership.is_active = False
+        membership.save()
+        assert_search_stats_are_up_to_date()
+
+        CompanyMembershipFactory(company=other_company)
+        assert_search_stats_are_up_to_date()
+        other_company.memberships.all().delete()
+        assert_search_stats_are_up_to_date()
+
     def test_can_have_prior_action(self):
         company = CompanyFactory(not_geiq_kind=True)
         assert company.can_have_prior_action is False
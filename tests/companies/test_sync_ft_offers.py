@@ -6,10 +6,12 @@ from django.core import management
 from django.test import override_settings
 
 from itou.cities.models import City
+from itou.cities.utils import CityResolver
 from itou.companies.enums import POLE_EMPLOI_SIRET
 from itou.companies.management.commands.sync_ft_offers import pe_offer_to_job_description
 from itou.companies.models import JobDescription
 from itou.jobs.models import Appellation, Rome
+from itou.jobs.utils import AppellationResolver
 from itou.utils.apis import pe_api_enums
 from itou.utils.mocks.pole_emploi import API_OFFRES_RESPONSE_OK
 
@@ -232,3 +234,54 @@ class TestPeOfferToJobDescription:
         job_description = pe_offer_to_job_description(offer, logging.getLogger())
 
         assert job_description.location == city
+
+    def test_pe_offer_to_job_description_ambiguous_postal_code_fallback(self):
+        City.objects.create(
+            slug="saint-claude",
+            department="39",
+            name="SAINT-CLAUDE",
+            post_codes=["39200"],
+            code_insee="39478",
+        )
+        villard = City.objects.create(
+            slug="villard-saint-sauveur",
+            department="39",
+            name="VILLARD-SAINT-SAUVEUR",
+            post_codes=["39200"],
+            code_insee="39569",
+        )
+        offer = self.base_offer_data
+        offer["lieuTravail"] = {"codePostal": "39200", "commune": "39999", "libelle": "39 - Villard-Saint-Sauveur"}
+
+        job_description = pe_offer_to_job_description(offer, logging.getLogger())
+
+        assert job_description.location == villard
+
+    def test_pe_offer_to_job_description_shared_resolvers(self, django_assert_num_queries):
+        City.objects.create(
+            slug="slug",
+            department="39",
+            name="SAINT-CLAUDE",
+            post_codes=["39200"],
+            code_insee="39478",
+        )
+        offer = self.base_offer_data
+        offer["lieuTravail"]["commune"] = "39478"
+        appellations = AppellationResolver()
+        cities = CityResolver()
+
+        with django_assert_num_queries(0):
+            for _ in range(3):
+                job_description = pe_offer_to_job_description(
+                    offer, logging.getLogger(), appellations=appellations, cities=cities
+                )
+                assert job_description.appellation.code == "I1304"
+
+        # Unknown labels fall back to the full text search, only once.
+        offer["appellationlibelle"] = "Technicien de maintenance"
+        with django_assert_num_queries(1):
+            for _ in range(3):
+                job_description = pe_offer_to_job_description(
+                    offer, logging.getLogger(), appellations=appellations, cities=cities
+                )
+                assert job_description.appellation.code == "I1304"
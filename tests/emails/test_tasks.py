@@ -3,8 +3,9 @@ from django.core.mail.message import EmailMessage
 from factory import Faker
 from requests.exceptions import ConnectTimeout
 
+from itou.emails import tasks
 from itou.emails.models import Email
-from itou.emails.tasks import AsyncEmailBackend, _async_send_message
+from itou.emails.tasks import AsyncEmailBackend, _async_send_message, _async_send_messages, batched_email_delivery
 
 
 class TestAsyncEmailBackend:
@@ -32,6 +33,104 @@ class TestAsyncEmailBackend:
             assert email.subject == "subject"
             assert email.body == "body"
 
+    def test_send_messages_in_batches(
+        self, anymail_mailjet_settings, django_capture_on_commit_callbacks, mocker, requests_mock, success_response
+    ):
+        mocker.patch("itou.emails.tasks._EMAILS_PER_TASK", 2)
+        get_connection_spy = mocker.spy(tasks, "get_connection")
+        requests_mock.post(f"{anymail_mailjet_settings.ANYMAIL['MAILJET_API_URL']}send", json=success_response)
+        messages = [
+            EmailMessage(from_email="unit-test@tests.com", to=["you@test.local"], subject="subject", body="body")
+            for _ in range(3)
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sent = AsyncEmailBackend().send_messages(messages)
+
+        assert sent == 3
+        # One connection per batch of emails
+        assert get_connection_spy.call_count == 2
+        assert requests_mock.call_count == 3
+        assert [email.esp_response for email in Email.objects.all()] == [success_response] * 3
+
+    def test_send_messages_in_batches_retries_failed_email(
+        self,
+        anymail_mailjet_settings,
+        caplog,
+        django_capture_on_commit_callbacks,
+        error_response,
+        requests_mock,
+        success_response,
+    ):
+        requests_mock.post(
+            f"{anymail_mailjet_settings.ANYMAIL['MAILJET_API_URL']}send",
+            [{"json": success_response}, {"json": error_response}, {"json": success_response}],
+        )
+        messages = [
+            EmailMessage(from_email="unit-test@tests.com", to=["you@test.local"], subject="subject", body="body")
+            for _ in range(2)
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sent = AsyncEmailBackend().send_messages(messages)
+
+        assert sent == 2
+        # The failed email was sent again on its own, successfully
+        assert requests_mock.call_count == 3
+        assert TestAsyncSendMessage.RETRY_TEXT not in caplog.text
+        assert [email.esp_response for email in Email.objects.order_by("pk")] == [success_response] * 2
+
+    def test_send_messages_in_batches_hands_over_crashed_email(
+        self, caplog, django_capture_on_commit_callbacks, mocker
+    ):
+        send_email_mock = mocker.patch("itou.emails.tasks._send_email", side_effect=[True, KeyError("Messages"), True])
+        messages = [
+            EmailMessage(from_email="unit-test@tests.com", to=["you@test.local"], subject="subject", body="body")
+            for _ in range(2)
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sent = AsyncEmailBackend().send_messages(messages)
+
+        assert sent == 2
+        first_email, second_email = Email.objects.order_by("pk")
+        assert f"Could not send email_id={second_email.pk} in a batch." in caplog.messages
+        # The crashed email was sent again on its own
+        assert [call.args[0] for call in send_email_mock.call_args_list] == [first_email, second_email, second_email]
+
+    def test_send_messages_in_batches_skips_sent_emails(
+        self, anymail_mailjet_settings, django_capture_on_commit_callbacks, requests_mock, success_response
+    ):
+        sent_email = Email.objects.create(
+            to=["you@test.local"], cc=[], bcc=[], subject="Hi", body_text="Hello", esp_response=success_response
+        )
+        email = Email.objects.create(to=["you@test.local"], cc=[], bcc=[], subject="Hi", body_text="Hello")
+        requests_mock.post(f"{anymail_mailjet_settings.ANYMAIL['MAILJET_API_URL']}send", json=success_response)
+
+        # Retry of a task which already sent the first email.
+        with django_capture_on_commit_callbacks(execute=True):
+            _async_send_messages([sent_email.pk, email.pk])
+
+        assert requests_mock.call_count == 1
+        email.refresh_from_db()
+        assert email.esp_response == success_response
+
+    def test_batched_email_delivery(self, django_capture_on_commit_callbacks, mailoutbox, mocker):
+        get_connection_spy = mocker.spy(tasks, "get_connection")
+        backend = AsyncEmailBackend()
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with batched_email_delivery():
+                for i in range(3):
+                    backend.send_messages(
+                        [EmailMessage(from_email="unit-test@tests.com", to=[f"you{i}@test.local"], body="body")]
+                    )
+
+        # A single task was enqueued
+        assert len(callbacks) == 1
+        assert [email.to for email in mailoutbox] == [["you0@test.local"], ["you1@test.local"], ["you2@test.local"]]
+        assert get_connection_spy.call_count == 1
+
 
 @pytest.fixture
 def anymail_mailjet_settings(settings):
@@ -10,7 +10,7 @@ from itoutils.django.testing import assertSnapshotQueries
 
 from itou.employee_record.enums import NotificationStatus, Status
 from itou.employee_record.management.commands import transfer_employee_records
-from itou.employee_record.models import EmployeeRecordBatch
+from itou.employee_record.models import EmployeeRecordBatch, EmployeeRecordTransition
 from itou.job_applications.enums import JobApplicationState
 from itou.utils.asp import REMOTE_DOWNLOAD_DIR, REMOTE_UPLOAD_DIR
 from tests.approvals.factories import ProlongationFactory, SuspensionFactory
@@ -203,6 +203,28 @@ def test_upload_and_download(snapshot, sftp_directory, command, caplog):
     )
 
 
+@freezegun.freeze_time("2021-09-27")
+def test_download_saves_the_feedback_file_in_bulk(sftp_directory, command, django_assert_num_queries):
+    employee_records = EmployeeRecordFactory.create_batch(3, ready_for_transfer=True)
+
+    command.handle(upload=True, download=False, preflight=False, wet_run=True)
+    process_incoming_file(sftp_directory, "0000", "OK")
+
+    # Savepoint, employee records, employee records update, transition logs, release savepoint
+    with django_assert_num_queries(5):
+        command.handle(upload=False, download=True, preflight=False, wet_run=True)
+    for employee_record in employee_records:
+        employee_record.refresh_from_db()
+        assert employee_record.status == Status.PROCESSED
+        assert employee_record.asp_processing_code == "0000"
+        assert employee_record.updated_at == timezone.now()
+        log = employee_record.logs.get(transition=EmployeeRecordTransition.PROCESS)
+        assert log.from_state == Status.SENT
+        assert log.to_state == Status.PROCESSED
+        assert log.asp_processing_code == "0000"
+        assert log.archived_json["libelleTraitement"] == "OK"
+
+
 def test_duplicates_automatic_processing(sftp_directory, command):
     employee_record = EmployeeRecordFactory(ready_for_transfer=True)
 
@@ -15,7 +15,7 @@ from django.utils import timezone
 from itou.antivirus.models import Scan
 from itou.approvals.enums import ProlongationReason
 from itou.files.models import File, save_file
-from itou.utils.storage.s3 import TEMPORARY_STORAGE_PREFIX, s3_client
+from itou.utils.storage.s3 import SNAPSHOTS_PREFIX, TEMPORARY_STORAGE_PREFIX, s3_client
 from tests.approvals.factories import ProlongationFactory, ProlongationRequestFactory
 from tests.communications.factories import AnnouncementItemFactory
 from tests.files.factories import FileFactory
@@ -171,6 +171,7 @@ def test_delete_unused_files_from_s3(temporary_bucket, caplog, mocker):
     # create unknown files in the s3
     keys = [
         f"{TEMPORARY_STORAGE_PREFIX}/test.pdf",  # temporary file (will be ignored)
+        f"{SNAPSHOTS_PREFIX}/marche/latest.json",  # API snapshot (will be ignored)
         existing_file.key,  # exists in db
         # files to clean
         "resume/11111111-1111-1111-1111-111111111111.pdf",
@@ -219,7 +220,7 @@ def test_delete_unused_files_from_s3(temporary_bucket, caplog, mocker):
     )
     assert sorted(
         obj["Key"] for obj in client.list_objects_v2(Bucket=settings.AWS_STORAGE_BUCKET_NAME)["Contents"]
-    ) == sorted(keys[:2])
+    ) == sorted(keys[:3])
 
 
 @pytest.mark.parametrize(
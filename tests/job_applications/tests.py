@@ -25,6 +25,7 @@ from itou.employee_record.enums import Status
 from itou.employee_record.models import EmployeeRecord, EmployeeRecordTransition, EmployeeRecordTransitionLog
 from itou.gps.models import FollowUpGroup, FollowUpGroupMembership
 from itou.job_applications.admin_forms import JobApplicationAdminForm
+from itou.job_applications.cache import get_received_state_counts
 from itou.job_applications.enums import (
     ARCHIVABLE_JOB_APPLICATION_STATES,
     AUTO_REJECT_JOB_APPLICATION_DELAY,
@@ -1134,6 +1135,48 @@ class TestJobApplicationQuerySet:
 
         assertQuerySetEqual(JobApplication.objects.all().visible_by_employers(), [recent, old_but_accepted])
 
+    def test_count_by_state(self):
+        company = CompanyFactory()
+        JobApplicationFactory.create_batch(2, to_company=company, state=JobApplicationState.NEW)
+        JobApplicationFactory(to_company=company, state=JobApplicationState.POOL)
+        JobApplicationFactory(state=JobApplicationState.NEW)
+
+        assert company.job_applications_received.count_by_state() == {
+            JobApplicationState.NEW: 2,
+            JobApplicationState.POOL: 1,
+        }
+        assert company.job_applications_received.filter(state=JobApplicationState.POOL).count_by_state() == {
+            JobApplicationState.POOL: 1,
+        }
+        assert JobApplication.objects.order_by("-created_at").count_by_state() == {
+            JobApplicationState.NEW: 3,
+            JobApplicationState.POOL: 1,
+        }
+
+    def test_received_state_counts_cache(self, django_capture_on_commit_callbacks):
+        company = CompanyFactory()
+        job_application = JobApplicationFactory(to_company=company, state=JobApplicationState.NEW)
+        JobApplicationFactory(to_company=company, state=JobApplicationState.NEW, archived_at=timezone.now())
+
+        with assertNumQueries(1):
+            assert get_received_state_counts(company) == {JobApplicationState.NEW: 1}
+        with assertNumQueries(0):
+            assert get_received_state_counts(company) == {JobApplicationState.NEW: 1}
+
+        # Workflow transitions invalidate the counts
+        job_application.process()
+        with assertNumQueries(1):
+            assert get_received_state_counts(company) == {JobApplicationState.PROCESSING: 1}
+
+        # The counts cached before the transaction is committed are invalidated again after the commit.
+        with django_capture_on_commit_callbacks(execute=True):
+            job_application.delete()
+            assert get_received_state_counts(company) == {}
+            # Bulk updates don't invalidate the counts.
+            JobApplication.objects.filter(to_company=company).update(archived_at=None)
+        with assertNumQueries(1):
+            assert get_received_state_counts(company) == {JobApplicationState.NEW: 1}
+
     @pytest.mark.parametrize(
         "state,expected",
         [(state, state in AUTO_REJECT_JOB_APPLICATION_STATES) for state in JobApplicationState],
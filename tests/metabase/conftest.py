@@ -3,8 +3,8 @@ from django.db import connection
 
 from itou.metabase.tables.utils import (
     get_ai_stock_job_seeker_pks,
+    get_city_resolver,
     get_insee_code_to_zrr_status_map,
-    get_post_code_to_insee_cities_map,
     get_qpv_job_seeker_pks,
 )
 
@@ -39,6 +39,6 @@ def pilotage_datastore_db_fixture(mocker):
 @pytest.fixture(autouse=True)
 def clear_pks_caches():
     get_ai_stock_job_seeker_pks.cache_clear()
+    get_city_resolver.cache_clear()
     get_insee_code_to_zrr_status_map.cache_clear()
-    get_post_code_to_insee_cities_map.cache_clear()
     get_qpv_job_seeker_pks.cache_clear()
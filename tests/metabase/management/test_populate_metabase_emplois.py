@@ -1,3 +1,4 @@
+import concurrent.futures
 import datetime
 import urllib
 
@@ -20,6 +21,7 @@ from itou.geo.utils import coords_to_geometry
 from itou.insertion.enums import MobilizationEventKind
 from itou.job_applications.enums import JobApplicationState
 from itou.jobs.models import Rome
+from itou.metabase.management.commands.populate_metabase_emplois import Command
 from itou.metabase.tables import gps, mobilization_events
 from itou.metabase.tables.utils import hash_content
 from itou.prescribers.enums import PrescriberOrganizationKind
@@ -64,6 +66,38 @@ def test_populate_all(respx_mock, settings):
     management.call_command("populate_metabase_emplois", mode="all")
 
 
+class SynchronousExecutor(concurrent.futures.Executor):
+    """Stand-in for the process pool: spawned workers would not see the test database."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@freeze_time("2023-03-10")
+@pytest.mark.django_db(transaction=True)
+def test_populate_all_with_jobs(caplog, mocker, respx_mock, settings):
+    settings.AIRFLOW_BASE_URL = "https://airflow"
+    respx_mock.post(urllib.parse.urljoin(settings.AIRFLOW_BASE_URL, "api/v1/dags/dbt_daily/dagRuns"))
+    JobApplicationFactory.create_batch(2, with_approval=True)
+    executor = mocker.patch("concurrent.futures.ProcessPoolExecutor", side_effect=SynchronousExecutor)
+
+    management.call_command("populate_metabase_emplois", mode="all", jobs=4)
+
+    assert executor.call_args.kwargs["max_workers"] == 4
+    assert executor.call_args.kwargs["max_tasks_per_child"] == 1
+    summary = {message.split(":")[0].strip("'"): message for message in caplog.messages if "max_rss=" in message}
+    assert summary.keys() == Command().MODE_TO_OPERATION.keys()
+    # Referential tables are populated by the main process before starting the workers.
+    assert summary["references"].endswith("max_rss=n/a")
+    assert summary["enums"].endswith("max_rss=n/a")
+    assert not summary["job_applications"].endswith("max_rss=n/a")
+
+
 @freeze_time("2023-03-10")
 @pytest.mark.django_db(transaction=True)
 def test_populate_references(snapshot):
@@ -577,6 +611,44 @@ def test_populate_job_applications(snapshot):
         ]
 
 
+@pytest.mark.django_db(transaction=True)
+def test_populate_job_applications_incremental():
+    company = CompanyFactory(kind=CompanyKind.GEIQ)
+    with freeze_time("2023-02-01"):
+        unchanged_ja, updated_ja, deleted_ja = JobApplicationFactory.create_batch(3, to_company=company)
+        management.call_command("populate_metabase_emplois", mode="job_applications", incremental=True)
+
+    def get_rows():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, "état", "date_mise_à_jour_metabase" FROM candidatures ORDER BY id')
+            return cursor.fetchall()
+
+    assert get_rows() == [
+        (unchanged_ja.pk, "Nouvelle candidature", datetime.date(2023, 2, 1)),
+        (updated_ja.pk, "Nouvelle candidature", datetime.date(2023, 2, 1)),
+        (deleted_ja.pk, "Nouvelle candidature", datetime.date(2023, 2, 1)),
+    ]
+
+    with freeze_time("2023-02-03"):
+        updated_ja.process()
+        updated_ja.save()
+        deleted_ja.delete()
+        created_ja = JobApplicationFactory(to_company=company)
+        management.call_command("populate_metabase_emplois", mode="job_applications", incremental=True)
+
+    # Only the changed rows were rewritten.
+    assert get_rows() == [
+        (unchanged_ja.pk, "Nouvelle candidature", datetime.date(2023, 2, 1)),
+        (updated_ja.pk, "Candidature à l'étude", datetime.date(2023, 2, 3)),
+        (created_ja.pk, "Nouvelle candidature", datetime.date(2023, 2, 3)),
+    ]
+
+    # A full rebuild happens once a week.
+    with freeze_time("2023-02-09"):
+        management.call_command("populate_metabase_emplois", mode="job_applications", incremental=True)
+    assert [row[2] for row in get_rows()] == [datetime.date(2023, 2, 9)] * 3
+
+
 @freeze_time("2023-02-02")
 @pytest.mark.django_db(transaction=True)
 def test_populate_approvals(snapshot):
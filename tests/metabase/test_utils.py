@@ -1,7 +1,27 @@
+import contextlib
+import datetime
+import io
+
+import pandas as pd
 import pytest
+from django.db import connection
+from freezegun import freeze_time
 
+from itou.approvals.enums import ProlongationReason
+from itou.approvals.models import Prolongation
 from itou.geo.utils import coords_to_geometry
-from itou.metabase.tables.utils import get_code_commune, get_qpv_job_seeker_pks, get_zrr_status_for_insee_code
+from itou.institutions.enums import InstitutionKind
+from itou.institutions.models import Institution
+from itou.metabase.dataframes import store_df
+from itou.metabase.db import get_table_with_metabase_columns, get_values_list_fields, inject_chunk
+from itou.metabase.tables import institutions, prolongation_requests, prolongations
+from itou.metabase.tables.utils import (
+    get_code_commune,
+    get_qpv_job_seeker_pks,
+    get_zrr_status_for_insee_code,
+    hash_content,
+    hash_contents,
+)
 from tests.cities.factories import create_test_cities
 from tests.geo.factories import ZRRFactory, create_qpv
 from tests.prescribers.factories import PrescriberOrganizationFactory
@@ -46,6 +66,8 @@ def test_get_zrr_status_for_insee_code_partially_in_zrr():
         # Proper case
         ("62000", "Arras", "62041"),
         ("62000", "Dainville", "62263"),
+        # Typo
+        ("62000", "ARAS", "62041"),
         # All uppercase
         ("73000", "CHAMBERY", "73065"),
         ("73000", "SONNAZ", "73288"),
@@ -58,3 +80,100 @@ def test_get_code_commune(post_code, city, expected_code_insee):
     create_test_cities(selected_departments=[post_code[:2]])
     organization = PrescriberOrganizationFactory.build(insee_city=None, post_code=post_code, city=city)
     assert get_code_commune(organization) == expected_code_insee
+
+
+class FakeCursor:
+    def __init__(self):
+        self.rows = []
+
+    @contextlib.contextmanager
+    def copy(self, query):
+        class Copy:
+            def set_types(copy, types):
+                pass
+
+            def write_row(copy, row):
+                self.rows.append(row)
+
+        yield Copy()
+
+
+@freeze_time("2024-01-02")
+def test_inject_chunk_from_values_or_instances():
+    table = get_table_with_metabase_columns(institutions.TABLE)
+    fields = get_values_list_fields(table.columns)
+    assert fields == ["id", "kind", "department", "name"]
+
+    institution = Institution(pk=12, kind=InstitutionKind.DDETS_IAE, department="2A", name="DDETS")
+    from_instances = FakeCursor()
+    inject_chunk(from_instances, table.columns, [institution], "institutions")
+    from_values = FakeCursor()
+    inject_chunk(from_values, table.columns, [(12, InstitutionKind.DDETS_IAE, "2A", "DDETS")], "institutions", fields)
+
+    assert (
+        list(from_instances.rows)
+        == list(from_values.rows)
+        == [
+            (12, "DDETS IAE", "2A", "2A - Corse-du-Sud", "Corse", "DDETS", datetime.date(2024, 1, 2)),
+        ]
+    )
+
+
+def test_get_values_list_fields():
+    # Some columns need model instances.
+    assert get_values_list_fields(get_table_with_metabase_columns(prolongation_requests.TABLE).columns) is None
+
+    table = get_table_with_metabase_columns(prolongations.TABLE)
+    assert get_values_list_fields(table.columns) == [
+        "id",
+        "approval_id",
+        "start_at",
+        "end_at",
+        "reason",
+        "declared_by_id",
+        "declared_by_siae_id",
+        "prescriber_organization_id",
+        "validated_by_id",
+        "created_at",
+        "request_id",
+    ]
+    assert prolongations.TABLE.get("motif", Prolongation(reason=ProlongationReason.SENIOR)) == "Senior"
+
+
+def test_hash_contents(settings):
+    settings.PILOTAGE_DATA_HASH_SALT = "foobar2000"
+    values = ["1234", None, "", "1234", 42]
+
+    assert hash_contents(values) == [hash_content(value) for value in values]
+    assert hash_contents(values, keep_empty=True) == [
+        hash_content("1234"),
+        None,
+        None,
+        hash_content("1234"),
+        hash_content(42),
+    ]
+
+
+def test_store_df_from_chunks():
+    csv = io.StringIO("id,name,score,Unnamed: 3\n1,a,0.5,\n2,,,\n3,c,1.5,\n")
+    assert store_df(pd.read_csv(csv, chunksize=2), table_name="chunks") == 3
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM chunks ORDER BY id")
+        assert cursor.fetchall() == [(1, "a", 0.5), (2, None, None), (3, "c", 1.5)]
+
+
+def test_store_df_coerces_chunks_to_the_first_one():
+    # Missing values turn the integer and boolean columns of the second chunk into float and object columns.
+    csv = io.StringIO("id,count,flag\n1,10,true\n2,20,false\n3,,\n4,40,true\n")
+    assert store_df(pd.read_csv(csv, chunksize=2), table_name="chunks") == 4
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT * FROM chunks ORDER BY id")
+        assert cursor.fetchall() == [(1, 10, True), (2, 20, False), (3, None, None), (4, 40, True)]
+
+
+def test_store_df_rejects_mismatching_chunk():
+    csv = io.StringIO("id,count\n1,10\n2,20\n3,1.5\n")
+    with pytest.raises(ValueError, match="Column 'count' does not match its type 'bigint' inferred from the first"):
+        store_df(pd.read_csv(csv, chunksize=2), table_name="chunks")
@@ -6,8 +6,10 @@ from itoutils.django.nexus.token import generate_auto_login_token
 from pytest_django.asserts import assertRedirects
 
 from itou.nexus.enums import Service
+from itou.nexus.models import ActivatedService
 from itou.users.enums import IdentityProvider
 from tests.companies.factories import CompanyMembershipFactory
+from tests.nexus.factories import NexusUserFactory
 from tests.users.factories import (
     EmployerFactory,
     ItouStaffFactory,
@@ -100,6 +102,29 @@ class TestDropDownMiddleware:
             "activated_services": [Service.EMPLOIS],
         }
 
+    def test_cached_context(self, client):
+        user = PrescriberFactory(membership=True)
+        client.force_login(user)
+        response = client.get(reverse("dashboard:index"))
+        assert response.wsgi_request.nexus_dropdown == {
+            "proconnect": True,
+            "activated_services": [Service.EMPLOIS],
+        }
+
+        # The status is cached until the user activates a service
+        NexusUserFactory(email=user.email, source=Service.DORA)
+        response = client.get(reverse("dashboard:index"))
+        assert response.wsgi_request.nexus_dropdown == {
+            "proconnect": True,
+            "activated_services": [Service.EMPLOIS],
+        }
+        ActivatedService.objects.activate(user=user, service=Service.PILOTAGE)
+        response = client.get(reverse("dashboard:index"))
+        assert response.wsgi_request.nexus_dropdown == {
+            "proconnect": True,
+            "activated_services": [Service.DORA, Service.EMPLOIS, Service.PILOTAGE],
+        }
+
     def test_nexus_page(self, client):
         user = EmployerFactory()
         CompanyMembershipFactory(user=user)
@@ -3,6 +3,7 @@ import random
 import pytest
 from django.utils import timezone
 from freezegun import freeze_time
+from pytest_django.asserts import assertNumQueries
 
 from itou.nexus.enums import Auth, Service
 from itou.nexus.models import DEFAULT_VALID_SINCE, ActivatedService, NexusRessourceSyncStatus
@@ -10,9 +11,11 @@ from itou.nexus.utils import (
     build_user,
     complete_full_sync,
     dropdown_status,
+    dropdown_status_many,
     get_service_users,
     init_full_sync,
     serialize_user,
+    sync_users,
 )
 from itou.users.enums import IdentityProvider
 from tests.nexus.factories import NexusRessourceSyncStatusFactory, NexusUserFactory
@@ -142,3 +145,49 @@ class TestDropDownStatus:
 
         user.delete()
         assert dropdown_status(email=nexus_user.email)["activated_services"] == [nexus_user.source]
+
+
+class TestDropDownStatusMany:
+    def test_same_as_dropdown_status(self):
+        user = PrescriberFactory(identity_provider=IdentityProvider.DJANGO)
+        ActivatedService.objects.create(user=user, service=Service.PILOTAGE)
+        NexusUserFactory(email=user.email, auth=Auth.PRO_CONNECT, source=Service.DORA)
+        nexus_user = NexusUserFactory(auth=Auth.DJANGO, source=Service.MARCHE)
+        job_seeker = JobSeekerFactory()
+        emails = [user.email, nexus_user.email.upper(), job_seeker.email, "unknown@domain.com"]
+
+        assert dropdown_status_many(emails) == {email: dropdown_status(email=email) for email in emails}
+
+    def test_cache(self):
+        user = EmployerFactory()
+        other_user = PrescriberFactory()
+        emails = [user.email, other_user.email]
+        expected = {email: {"proconnect": True, "activated_services": [Service.EMPLOIS]} for email in emails}
+
+        with assertNumQueries(
+            1  # nexus users
+            + 1  # emplois users
+            + 1  # activated services
+        ):
+            assert dropdown_status_many(emails) == expected
+        with assertNumQueries(0):
+            assert dropdown_status_many(emails) == expected
+
+        # Activating a service invalidates the status of the user
+        ActivatedService.objects.activate(user=user, service=Service.PILOTAGE)
+        expected[user.email] = {"proconnect": True, "activated_services": [Service.EMPLOIS, Service.PILOTAGE]}
+        with assertNumQueries(3):
+            assert dropdown_status_many(emails) == expected
+
+        # So does the sync of a nexus user
+        sync_users([NexusUserFactory.build(email=other_user.email, auth=Auth.DJANGO, source=Service.DORA)])
+        expected[other_user.email] = {"proconnect": True, "activated_services": [Service.DORA, Service.EMPLOIS]}
+        with assertNumQueries(3):
+            assert dropdown_status_many(emails) == expected
+
+        # Completing a full sync ignores the users that were not synced since it started
+        started_at = init_full_sync(Service.DORA)
+        assert complete_full_sync(Service.DORA, started_at) is True
+        expected[other_user.email] = {"proconnect": True, "activated_services": [Service.EMPLOIS]}
+        with assertNumQueries(3):
+            assert dropdown_status_many(emails) == expected
@@ -1,4 +1,5 @@
 import datetime
+import random
 from unittest import mock
 
 import pytest
@@ -17,7 +18,7 @@ from itou.eligibility.models import AdministrativeCriteria
 from itou.institutions.enums import InstitutionKind
 from itou.job_applications.enums import JobApplicationState
 from itou.job_applications.export import _eligible_to_siae_evaluations
-from itou.job_applications.models import JobApplication, JobApplicationQuerySet
+from itou.job_applications.models import JobApplication
 from itou.siae_evaluations import enums as evaluation_enums
 from itou.siae_evaluations.models import (
     Calendar,
@@ -49,7 +50,7 @@ from tests.siae_evaluations.factories import (
     EvaluatedSiaeFactory,
     EvaluationCampaignFactory,
 )
-from tests.users.factories import JobSeekerFactory, PrescriberFactory
+from tests.users.factories import JobSeekerFactory
 
 
 def create_batch_of_job_applications(company, *, size=evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MIN):
@@ -73,51 +74,32 @@ def create_batch_of_job_applications(company, *, size=evaluation_enums.Evaluatio
 
 class TestEvaluationCampaignMiscMethods:
     def test_select_min_max_job_applications(self):
-        company = CompanyFactory()
-        job_seeker = JobSeekerFactory()
-        sender = PrescriberFactory()
-        eligibility_diagnosis = IAEEligibilityDiagnosisFactory(from_prescriber=True, job_seeker=job_seeker)
-
-        def create_job_apps(count):
-            return JobApplicationFactory.create_batch(
-                count,
-                sent_by_prescriber_alone=True,
-                to_company=company,
-                job_seeker=job_seeker,
-                eligibility_diagnosis=eligibility_diagnosis,
-                sender=sender,
-                state=JobApplicationState.ACCEPTED,
-            )
+        rng = random.Random(0)
 
         # zero job application
-        qs = select_min_max_job_applications(JobApplication.objects.filter(to_company=company))
-        assert isinstance(qs, JobApplicationQuerySet)
-        assert 0 == qs.count()
+        assert [] == select_min_max_job_applications([], rng)
 
         # one job applications made by SIAE
-        [job_application] = create_job_apps(1)
-        assert (
-            job_application
-            == select_min_max_job_applications(JobApplication.objects.filter(to_company=company)).first()
-        )
-        assert 1 == select_min_max_job_applications(JobApplication.objects.filter(to_company=company)).count()
+        assert ["job_app"] == select_min_max_job_applications(["job_app"], rng)
 
         # under 10 job applications, 20% is below the minimum value of 2 -> select 2
-        create_job_apps(5)
-        assert (
-            evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MIN
-            == select_min_max_job_applications(JobApplication.objects.filter(to_company=company)).count()
+        assert evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MIN == len(
+            select_min_max_job_applications(list(range(6)), rng)
         )
 
         # from 20 job applications to 100 we have the correct percentage
-        create_job_apps(55)
-        assert 12 == select_min_max_job_applications(JobApplication.objects.filter(to_company=company)).count()
+        selected = select_min_max_job_applications(list(range(61)), rng)
+        assert 12 == len(set(selected))
+        assert set(selected) <= set(range(61))
 
         # Over 100, stop at the max number -> 20
-        create_job_apps(50)
-        assert (
-            evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MAX
-            == select_min_max_job_applications(JobApplication.objects.filter(to_company=company)).count()
+        assert evaluation_enums.EvaluationJobApplicationsBoundariesNumber.MAX == len(
+            select_min_max_job_applications(list(range(111)), rng)
+        )
+
+        # The selection only depends on the state of the random generator.
+        assert select_min_max_job_applications(list(range(61)), random.Random(42)) == select_min_max_job_applications(
+            list(range(61)), random.Random(42)
         )
 
 
@@ -449,14 +431,69 @@ class TestEvaluationCampaignManager:
 
         assert 2 == evaluation_campaign.number_of_siaes_to_select()
 
-    def test_eligible_siaes_under_ratio(self):
+    def test_populate_siaes_under_ratio(self):
         evaluation_campaign = EvaluationCampaignFactory()
 
         for _ in range(6):
             company = CompanyFactory(department="14", with_membership=True, evaluable_kind=True)
             create_batch_of_job_applications(company)
 
-        assert 2 == evaluation_campaign.eligible_siaes_under_ratio().count()
+        evaluation_campaign.populate(timezone.now())
+        assert 2 == EvaluatedSiae.objects.filter(evaluation_campaign=evaluation_campaign).count()
+
+    def test_populate_is_reproducible(self):
+        evaluation_campaign = EvaluationCampaignFactory()
+        for _ in range(6):
+            company = CompanyFactory(department="14", with_membership=True, evaluable_kind=True)
+            create_batch_of_job_applications(company, size=10)
+
+        def selection():
+            return set(
+                EvaluatedJobApplication.objects.filter(
+                    evaluated_siae__evaluation_campaign=evaluation_campaign
+                ).values_list("evaluated_siae__siae_id", "job_application_id")
+            )
+
+        evaluation_campaign.populate(timezone.now(), seed=1234)
+        first_selection = selection()
+        # 2 SIAEs out of 6, 2 job applications out of 10 for each SIAE.
+        assert len(first_selection) == 4
+
+        EvaluatedSiae.objects.filter(evaluation_campaign=evaluation_campaign).delete()
+        EvaluationCampaign.objects.filter(pk=evaluation_campaign.pk).update(evaluations_asked_at=None)
+        evaluation_campaign.refresh_from_db()
+        evaluation_campaign.populate(timezone.now(), seed=1234)
+        assert selection() == first_selection
+
+    def test_populate_several_campaigns(self, django_capture_on_commit_callbacks, mailoutbox):
+        calvados_campaign = EvaluationCampaignFactory()
+        morbihan_campaign = EvaluationCampaignFactory(institution__department="56")
+        ended_campaign = EvaluationCampaignFactory(institution__department="29", evaluations_asked_at=timezone.now())
+        calvados_company = CompanyFactory(department="14", with_membership=True, evaluable_kind=True)
+        create_batch_of_job_applications(calvados_company)
+        morbihan_company = CompanyFactory(department="56", with_membership=True, evaluable_kind=True)
+        create_batch_of_job_applications(morbihan_company)
+
+        with pytest.raises(CampaignAlreadyPopulatedException):
+            EvaluationCampaign.objects.populate(timezone.now())
+        assert not EvaluatedSiae.objects.exists()
+
+        now = timezone.now()
+        with django_capture_on_commit_callbacks(execute=True):
+            EvaluationCampaign.objects.exclude(pk=ended_campaign.pk).populate(now)
+        assertQuerySetEqual(
+            EvaluatedSiae.objects.all(),
+            [(calvados_campaign.pk, calvados_company.pk), (morbihan_campaign.pk, morbihan_company.pk)],
+            transform=lambda evaluated_siae: (evaluated_siae.evaluation_campaign_id, evaluated_siae.siae_id),
+            ordered=False,
+        )
+        assert EvaluatedJobApplication.objects.count() == 4
+        for campaign in [calvados_campaign, morbihan_campaign]:
+            campaign.refresh_from_db()
+            assert campaign.evaluations_asked_at == now
+            assert campaign.percent_set_at == now
+        # One email per selected SIAE, one per campaign.
+        assert len(mailoutbox) == 4
 
     def test_populate(self, snapshot, subtests):
         # integration tests
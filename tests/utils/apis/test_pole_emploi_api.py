@@ -21,6 +21,7 @@ from itou.utils.apis.pole_emploi import (
     PoleEmploiRateLimitException,
     PoleEmploiRoyaumeAgentAPIClient,
     PoleEmploiRoyaumePartenaireApiClient,
+    RateLimiter,
     UserDoesNotExist,
     pole_emploi_agent_api_client,
 )
@@ -225,6 +226,63 @@ class TestPoleEmploiRoyaumePartenaireApiClient:
             self.api_client.mise_a_jour_pass_iae(job_application.approval, "foo", "bar", 42, "DEAD")
         assert ctx.value.error_code == 401
 
+    @respx.mock
+    def test_rate_limiter(self, mocker):
+        clock = [1000.0]
+        mocker.patch("itou.utils.apis.pole_emploi.time.monotonic", side_effect=lambda: clock[0])
+
+        def fake_sleep(seconds):
+            clock[0] += seconds
+
+        sleep_mock = mocker.patch("itou.utils.apis.pole_emploi.time.sleep", side_effect=fake_sleep)
+        self.api_client.rate_limiter = RateLimiter(rate=2)
+        respx.get("https://pe.fake/offresdemploi/v2/referentiel/naturesContrats").respond(
+            200, json=API_REFERENTIEL_NATURE_CONTRATS_RESPONSE_OK
+        )
+        self.api_client._refresh_token()
+
+        # The first request uses the available token, the next ones wait for the bucket to refill.
+        for _ in range(3):
+            self.api_client.referentiel("naturesContrats")
+        assert [call.args for call in sleep_mock.call_args_list] == [(0.5,), (0.5,)]
+        assert clock[0] == 1001.0
+
+        # A rate limited response pauses the following requests for the delay asked by the API.
+        sleep_mock.reset_mock()
+        respx.get("https://pe.fake/offresdemploi/v2/referentiel/naturesContrats").respond(
+            429, headers={"Retry-After": "10"}
+        )
+        with pytest.raises(PoleEmploiRateLimitException) as ctx:
+            self.api_client.referentiel("naturesContrats")
+        assert ctx.value.retry_after == "10"
+        respx.get("https://pe.fake/offresdemploi/v2/referentiel/naturesContrats").respond(
+            200, json=API_REFERENTIEL_NATURE_CONTRATS_RESPONSE_OK
+        )
+        self.api_client.referentiel("naturesContrats")
+        # The rate was halved, and raised again by the response.
+        assert [call.args for call in sleep_mock.call_args_list] == [(0.5,), (10.0,), (1.0,)]
+        assert self.api_client.rate_limiter.rate == 1.1
+
+    def test_rate_limiter_adapts_rate(self, mocker):
+        clock = [1000.0]
+        mocker.patch("itou.utils.apis.pole_emploi.time.monotonic", side_effect=lambda: clock[0])
+        rate_limiter = RateLimiter(rate=8)
+
+        rate_limiter.pause("10")
+        assert rate_limiter.rate == 4
+        # Concurrent rate limited requests during the pause.
+        rate_limiter.pause("10")
+        assert rate_limiter.rate == 4
+
+        for _ in range(3):
+            clock[0] += 10
+            rate_limiter.pause("10")
+        assert rate_limiter.rate == 1  # min_rate
+
+        for _ in range(RateLimiter.RECOVERY_REQUESTS):
+            rate_limiter.recover()
+        assert rate_limiter.rate == 8
+
     @respx.mock
     def test_referentiel(self):
         respx.get("https://pe.fake/offresdemploi/v2/referentiel/naturesContrats").respond(
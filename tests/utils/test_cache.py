@@ -3,7 +3,7 @@ from unittest import mock
 
 from django.core.cache.backends.redis import RedisCacheClient
 
-from itou.utils.cache import FAILSAFE_METHODS
+from itou.utils.cache import FAILSAFE_METHODS, bump_cache_version, get_cache_version
 
 
 class TestFailSafeRedisCache:
@@ -26,3 +26,11 @@ class TestFailSafeRedisCache:
         # Not a cache access.
         actual_keys.remove("get_client")
         assert actual_keys - FAILSAFE_METHODS == set()
+
+
+def test_cache_version():
+    version = get_cache_version("test-version")
+    assert get_cache_version("test-version") == version
+
+    bump_cache_version("test-version")
+    assert get_cache_version("test-version") != version
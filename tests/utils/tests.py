@@ -45,6 +45,7 @@ from itou.users.models import User
 from itou.utils import constants as global_constants, pagination
 from itou.utils.admin import add_support_remark_to_obj, bulk_add_support_remark_to_objs
 from itou.utils.emails import redact_email_address
+from itou.utils.export import iter_in_chunks
 from itou.utils.models import PkSupportRemark, UUIDSupportRemark
 from itou.utils.password_validation import CnilCompositionPasswordValidator
 from itou.utils.perms.middleware import ItouCurrentOrganizationMiddleware
@@ -209,6 +210,48 @@ class TestItouCurrentOrganizationMiddleware:
         assert not request.is_current_organization_admin
         assert not request.from_authorized_prescriber
 
+    def test_cached_memberships(self, mocked_get_response_for_middlewaremixin):
+        company = CompanyMembershipFactory(company__kind=CompanyKind.EI).company
+        employer = company.members.first()
+        ItouCurrentOrganizationMiddleware(mocked_get_response_for_middlewaremixin)(self._get_request(employer))
+
+        # Organizations are retrieved on every request, a bulk update shows up right away
+        Company.objects.filter(pk=company.pk).update(name="Nouveau nom")
+        request = self._get_request(employer)
+        with assertNumQueries(1):  # Retrieve the companies of the cached memberships
+            ItouCurrentOrganizationMiddleware(mocked_get_response_for_middlewaremixin)(request)
+        assert request.current_organization == company
+        assert request.current_organization.name == "Nouveau nom"
+        assert request.organizations == [company]
+        assert request.is_current_organization_admin
+
+        # A membership change invalidates the memberships of its user
+        membership = employer.companymembership_set.get()
+        membership.is_admin = False
+        membership.save(update_fields=["is_admin", "updated_at"])
+        request = self._get_request(employer)
+        with assertNumQueries(
+            3  # Retrieve user memberships
+            + 1  # Check if siaes are active or in grace period
+        ):
+            ItouCurrentOrganizationMiddleware(mocked_get_response_for_middlewaremixin)(request)
+        assert request.current_organization == company
+        assert not request.is_current_organization_admin
+
+        # Companies at the end of their grace period are not returned anymore
+        company.convention.is_active = False
+        company.convention.deactivated_at = timezone.now() - datetime.timedelta(days=365)
+        company.convention.save()
+        request = self._get_request(employer)
+        with assertNumQueries(1):  # Retrieve the companies of the cached memberships
+            response = ItouCurrentOrganizationMiddleware(get_response_for_middlewaremixin)(request)
+        assert request.current_organization is None
+        assertRedirects(
+            response,
+            reverse("logout:warning", kwargs={"kind": "no_organization"}),
+            fetch_redirect_response=False,
+        )
+
     def test_employer_of_inactive_siae(self, mocked_get_response_for_middlewaremixin):
         request = self._get_request(
             CompanyMembershipFactory(company__subject_to_iae_rules=True, company__convention=None).user
@@ -1365,6 +1408,45 @@ class TestPaginator:
         assert pager.display_pager
         assert pager.pages_to_display == range(5, 16)
 
+    def test_keyset_pager(self):
+        from itou.jobs.models import Rome
+
+        Rome.objects.bulk_create(Rome(code=f"A{i:04d}", name=f"Métier {i % 3}") for i in range(8))
+        romes = Rome.objects.order_by("-name", "pk")
+        expected = list(romes)
+
+        with assertNumQueries(2):  # Count and first page
+            page = pagination.keyset_pager(romes, 1, cache_key="romes", items_per_page=3)
+        assert page.object_list == expected[:3]
+        assert page.display_pager
+        assert page.pages_to_display == range(1, 4)
+
+        # The next pages start after the last row of the previous one, whatever happened before it.
+        expected[0].delete()
+        with assertNumQueries(1):  # The count is cached
+            page = pagination.keyset_pager(romes, 2, cache_key="romes", items_per_page=3)
+        assert page.object_list == expected[3:6]
+        with assertNumQueries(1):
+            page = pagination.keyset_pager(romes, 3, cache_key="romes", items_per_page=3)
+        assert page.object_list == expected[6:]
+
+        # Without a cursor, the page is fetched with an offset.
+        with assertNumQueries(2):
+            page = pagination.keyset_pager(romes, 3, cache_key="other romes", items_per_page=3)
+        assert page.object_list == expected[7:]
+
+        # Browsing the first page again refreshes the count.
+        with assertNumQueries(2):
+            page = pagination.keyset_pager(romes, 1, cache_key="romes", items_per_page=3)
+        assert page.object_list == expected[1:4]
+        assert page.paginator.count == 7
+
+    def test_keyset_pager_unordered_queryset(self):
+        from itou.jobs.models import Rome
+
+        with pytest.raises(ValueError):
+            pagination.keyset_pager(Rome.objects.all(), 1, cache_key="romes")
+
 
 def test_yield_sync_diff():
     # NOTE(vperron): not ideal, since I'm using models from a different Django app.
@@ -1989,3 +2071,22 @@ class TestFormatDecimalEuros:
     def test_custom_default(self):
         default = "[zero]"
         assert format_filters.format_decimal_euros(None, default) == default
+
+
+def test_iter_in_chunks():
+    memberships = CompanyMembershipFactory.create_batch(3)
+    queryset = CompanyMembership.objects.prefetch_related("user__emailaddress_set").order_by("pk")
+
+    with assertNumQueries(0):
+        rows = iter_in_chunks(queryset, chunk_size=2)
+    with assertNumQueries(1 + 2):  # Main query and prefetches of the first chunk
+        assert next(rows) == memberships[0]
+        assert next(rows) == memberships[1]
+    with assertNumQueries(2):  # Prefetches of the second chunk
+        last_row = next(rows)
+        assert last_row == memberships[2]
+    with assertNumQueries(0):
+        assert list(last_row.user.emailaddress_set.all()) == []
+        assert list(rows) == []
+
+    assert list(iter_in_chunks([1, 2])) == [1, 2]
@@ -410,6 +410,43 @@ class TestSearchCompany:
             count=1,
         )
 
+    def test_cached_results(self, client, django_capture_on_commit_callbacks):
+        city = create_city_saint_andre()
+        CompanyFactory(name="Entreprise Saint André", department="44", coords=city.coords, post_code="44117")
+        response = client.get(self.URL, {"city": city.slug})
+        assertContains(response, "Entreprise Saint André")
+
+        # Bulk updates do not invalidate the cached results.
+        Company.objects.update(is_searchable=False)
+        response = client.get(self.URL, {"city": city.slug})
+        assertContains(
+            response,
+            '<span>Employeur</span><span class="badge badge-sm rounded-pill ms-2">1</span>',
+            html=True,
+            count=1,
+        )
+        assertContains(response, "Entreprise Saint André")
+
+        # Saving a company does.
+        CompanyFactory(name="Entreprise Guérande", department="44", coords=city.coords, post_code="44117")
+        response = client.get(self.URL, {"city": city.slug})
+        assertContains(
+            response,
+            '<span>Employeur</span><span class="badge badge-sm rounded-pill ms-2">1</span>',
+            html=True,
+            count=1,
+        )
+        assertContains(response, "Entreprise Guérande")
+        assertNotContains(response, "Entreprise Saint André")
+
+        # The results cached before the transaction is committed are invalidated again after the commit.
+        with django_capture_on_commit_callbacks(execute=True):
+            company = CompanyFactory(department="44", coords=city.coords, post_code="44117")
+            client.get(self.URL, {"city": city.slug})
+            Company.objects.filter(pk=company.pk).update(name="Entreprise Basse-Indre")
+        response = client.get(self.URL, {"city": city.slug})
+        assertContains(response, "Entreprise Basse-Indre")
+
     def test_htmx_reloads_departments(self, client):
         vannes = create_city_vannes()
         company_vannes = CompanyFactory(